@@ -0,0 +1,90 @@
+import collections
+import concurrent.futures
+import math
+import os
+import time
+import typing
+
+
+def workerCount(executor) -> int:
+    """Return the number of jobs an executor can run at once, if known."""
+    for attr in ("capacity", "max_workers"):
+        n = getattr(executor, attr, None)
+
+        if n:
+            return n
+
+    return os.cpu_count() or 1
+
+
+class Batcher:
+    """Adaptive chunking of evaluations for an executor.
+
+    Individuals are submitted to a batch function in chunks, so that the cost
+    of a round trip to a worker is shared by all individuals of a chunk. The
+    first chunks hold a single individual each; from then on, the chunk size
+    follows from the measured throughput so that every chunk takes roughly
+    the target time, without making chunks so large that workers would sit
+    idle at the end. The cost estimate is kept from one call to the next.
+    """
+
+    def __init__(
+        self,
+        batch_func: typing.Callable,
+        target: float = 0.1,
+        smoothing: float = 0.5,
+    ):
+        self.batch_func = batch_func
+        self.target = target
+        self.smoothing = smoothing
+        self.cost = None
+
+    def chunk_size(self, remaining: int, workers: int) -> int:
+        if self.cost is None:
+            return 1
+
+        return max(
+            1,
+            min(
+                math.ceil(self.target / self.cost),
+                math.ceil(remaining / (2 * workers)),
+            ),
+        )
+
+    def map(
+        self, executor, individuals, kwargs
+    ) -> typing.Iterator[typing.Tuple[typing.Any, typing.Any]]:
+        """Evaluate individuals, yielding them with their results per chunk."""
+        workers = workerCount(executor)
+        todo = collections.deque(individuals)
+        inflight = {}
+
+        start = time.perf_counter()
+        done = 0
+
+        while todo or inflight:
+            while todo and len(inflight) < 2 * workers:
+                chunk = [
+                    todo.popleft()
+                    for _ in range(min(len(todo), self.chunk_size(len(todo), workers)))
+                ]
+                inflight[executor.submit(self.batch_func, chunk, **kwargs)] = chunk
+
+            finished, _ = concurrent.futures.wait(
+                inflight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for f in finished:
+                chunk = inflight.pop(f)
+                results = f.result()
+                done += len(chunk)
+
+                # Worker time spent per individual, including all overheads.
+                cost = (time.perf_counter() - start) * min(workers, done) / done
+
+                if self.cost is None:
+                    self.cost = cost
+                else:
+                    self.cost += self.smoothing * (cost - self.cost)
+
+                yield from zip(chunk, results)
@@ -0,0 +1,178 @@
+import enum
+import math
+import statistics
+import typing
+
+import numpy
+import pydantic
+
+COUNTERS = ["cycles", "l1d_misses", "llc_misses", "dtlb_misses"]
+
+
+class CacheState(str, enum.Enum):
+    Any = "any"
+    Warm = "warm"
+    Cold = "cold"
+
+    def __str__(self):
+        return self.value
+
+
+class HugePages(str, enum.Enum):
+    Off = "none"
+    Transparent = "transparent"
+    Explicit = "explicit"
+
+    def __str__(self):
+        return self.value
+
+
+class Protocol(pydantic.BaseModel):
+    """Parameters of the repeated measurement of a benchmark.
+
+    Without a target, the benchmark runs the given number of trials. With a
+    target, that is the minimum, and trials continue until the confidence
+    interval of the median runtime is at most the target fraction of the
+    median wide, or until the maximum number of trials or the time limit is
+    reached. For a warm cache, every trial is preceded by an untimed run of
+    the benchmark; for a cold cache, by writing a buffer of the given size,
+    which should be larger than the last level cache. Trials further from
+    the median than the given multiple of the scaled median absolute
+    deviation are rejected as outliers. With counters, the hardware counters
+    of the timed region are read in every trial.
+
+    With the native loop, every batch of repetitions runs in the extension
+    on arrays allocated once, optionally from huge pages, after the given
+    number of untimed warm-up runs; as the arrays stay in place, the cache
+    is then warm for every trial.
+
+    Layouts which the module of specialized kernels at the given path has an
+    entry for, as built by alex-compile, are benchmarked with that entry.
+
+    The kernel is split between the given number of threads, which are pinned
+    to the given CPUs in turn, if any.
+    """
+
+    repetitions: int = 10
+    target: typing.Optional[float] = None
+    max_repetitions: int = 1000
+    time_limit: typing.Optional[float] = None
+    confidence: float = 0.95
+    cache_state: CacheState = CacheState.Any
+    flush_bytes: int = 0
+    outliers: typing.Optional[float] = None
+    counters: bool = False
+    native: bool = False
+    warmup: int = 1
+    huge_pages: HugePages = HugePages.Off
+    specialized: typing.Optional[str] = None
+    threads: int = 1
+    cpus: typing.Tuple[int, ...] = ()
+
+    class Config:
+        frozen = True
+
+
+class Summary(typing.NamedTuple):
+    mean: float
+    dev: float
+    median: float
+    low: float
+    high: float
+    trials: int
+
+
+def medianInterval(
+    samples: typing.List[float], confidence: float
+) -> typing.Tuple[float, float]:
+    """Return a distribution-free confidence interval of the median.
+
+    The bounds are the order statistics of which the ranks enclose the given
+    probability mass of the binomial distribution of the number of samples
+    below the median, in its normal approximation.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    h = z * math.sqrt(n) / 2
+
+    return (
+        ordered[max(0, math.floor(n / 2 - h) - 1)],
+        ordered[min(n - 1, math.ceil(n / 2 + h))],
+    )
+
+
+def outlierMask(samples: typing.List[float], threshold: float) -> numpy.ndarray:
+    """Return which samples are within the threshold of the median.
+
+    The distance is measured in units of the median absolute deviation,
+    scaled to estimate the standard deviation of a normal distribution.
+    """
+    x = numpy.asarray(samples)
+    median = numpy.median(x)
+    mad = 1.4826 * numpy.median(numpy.abs(x - median))
+
+    if mad == 0:
+        return numpy.ones(len(x), dtype=bool)
+
+    return numpy.abs(x - median) <= threshold * mad
+
+
+def summarize(samples: typing.List[float], protocol: Protocol) -> Summary:
+    """Summarize the trials of a benchmark which are not outliers."""
+    x = numpy.asarray(samples)
+
+    if protocol.outliers is not None:
+        x = x[outlierMask(x, protocol.outliers)]
+
+    low, high = medianInterval(x, protocol.confidence)
+
+    return Summary(
+        mean=float(numpy.mean(x)),
+        dev=float(numpy.std(x)),
+        median=float(numpy.median(x)),
+        low=low,
+        high=high,
+        trials=len(x),
+    )
+
+
+def summarizeCounters(
+    samples: typing.List[float],
+    counters: typing.List[typing.Dict[str, typing.Optional[int]]],
+    protocol: Protocol,
+) -> typing.Dict[str, typing.Optional[float]]:
+    """Return the mean of every counter over the trials which are not outliers.
+
+    A counter which was unavailable in any of them has no value.
+    """
+    if protocol.outliers is not None:
+        kept = outlierMask(samples, protocol.outliers)
+        counters = [c for c, k in zip(counters, kept) if k]
+
+    return {
+        n: (
+            float(numpy.mean([c[n] for c in counters]))
+            if counters and all(c[n] is not None for c in counters)
+            else None
+        )
+        for n in COUNTERS
+    }
+
+
+def converged(samples: typing.List[float], protocol: Protocol) -> bool:
+    """Return whether a benchmark has run enough trials."""
+    if len(samples) < protocol.repetitions:
+        return False
+
+    if protocol.target is None or len(samples) >= protocol.max_repetitions:
+        return True
+
+    s = summarize(samples, protocol)
+
+    return s.high - s.low <= protocol.target * s.median
+
+
+def flushCaches(buffer: numpy.ndarray):
+    """Write every line of a buffer, evicting everything else from the caches."""
+    numpy.add(buffer, 1, out=buffer)
@@ -0,0 +1,157 @@
+import typing
+
+import alex.definitions
+import alex.schema
+
+# Width of the elements of every array of a pattern, in floating point values.
+_ARRAYS = {
+    alex.definitions.Pattern.MMijk: (1, 1, 1),
+    alex.definitions.Pattern.MMikj: (1, 1, 1),
+    alex.definitions.Pattern.MMTijk: (1, 1, 1),
+    alex.definitions.Pattern.MMTikj: (1, 1, 1),
+    alex.definitions.Pattern.Jacobi2D: (1, 1),
+    alex.definitions.Pattern.Himeno: (3, 3, 3, 1, 1, 1),
+    alex.definitions.Pattern.Cholesky: (1, 1),
+    alex.definitions.Pattern.Crout: (1, 1, 1),
+}
+
+_PRECISION_BYTES = {
+    alex.definitions.Precision.Single: 4,
+    alex.definitions.Precision.Double: 8,
+}
+
+
+class Rule(typing.NamedTuple):
+    """A range of layout positions which may be reordered freely.
+
+    Layouts which differ only in the order of the dimensions at the positions
+    from begin up to, but not including, end behave identically in every
+    cache of the hierarchy if the rule is exact, and similarly otherwise. An
+    end of None extends the range to the end of the layout.
+    """
+
+    name: str
+    exact: bool
+    begin: int
+    end: typing.Optional[int]
+
+
+def _isPowerOfTwo(x: int) -> bool:
+    return x > 0 and x & (x - 1) == 0
+
+
+def _log2(x: int) -> int:
+    return max(0, x.bit_length() - 1)
+
+
+def _elementSizes(pattern, precision) -> typing.List[int]:
+    return [w * _PRECISION_BYTES[precision] for w in _ARRAYS[pattern]]
+
+
+def indexBits(
+    pattern: alex.definitions.Pattern,
+    caches: typing.Iterable[alex.schema.Cache],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> int:
+    """Return the number of layout positions which reach the given caches.
+
+    The line and the set which an access maps to in any of the caches depend
+    only on the dimensions at this many of the lowest positions, provided
+    that the number of sets of the caches are powers of two.
+    """
+    # Only the factors of two of the element sizes shift index bits upwards.
+    shift = min((s & -s).bit_length() - 1 for s in _elementSizes(pattern, precision))
+    reach = max(c.line * c.sets for c in caches)
+
+    return max(0, (reach - 1).bit_length() - shift)
+
+
+def rules(
+    pattern: alex.definitions.Pattern,
+    hierarchy: alex.schema.CacheHierarchy,
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> typing.List[Rule]:
+    """Return the equivalence rules of layouts of a pattern on a hierarchy.
+
+    The offset rule covers the lowest bits of the index, which only select an
+    element within a cache line: reordering them moves elements within their
+    lines, but never between lines. The arrays are placed at multiples of
+    2^32 - 1 bytes, so the k-th array starts k bytes before a line boundary,
+    and as long as that is less than the size of an element, only the first
+    element of every line straddles a boundary, which is the same element in
+    every layout. The rule is therefore exact if all element sizes are powers
+    of two and there are no more arrays than bytes in the smallest element.
+
+    The tag rule covers the bits of the index above the reach of the set
+    index of every cache. Reordering them moves aligned blocks of the arrays
+    by multiples of that reach, which renames lines without changing the set
+    they map to. However, as the arrays do not start on a line boundary, the
+    line which straddles the boundary of two blocks is split up differently,
+    so the rule is only exact for a single array, and if the reach of every
+    cache is a power of two.
+    """
+    sizes = _elementSizes(pattern, precision)
+    caches = hierarchy.caches.values()
+
+    offset = _log2(min(c.line for c in caches) // max(sizes))
+    offset_exact = (
+        all(_isPowerOfTwo(s) for s in sizes)
+        and all(_isPowerOfTwo(c.line) for c in caches)
+        and len(sizes) <= min(sizes)
+    )
+
+    tag = indexBits(pattern, caches, precision)
+    tag_exact = len(sizes) == 1 and all(_isPowerOfTwo(c.line * c.sets) for c in caches)
+
+    return [
+        Rule(name="offset", exact=offset_exact, begin=0, end=offset),
+        Rule(name="tag", exact=tag_exact, begin=tag, end=None),
+    ]
+
+
+class Canonicalizer:
+    """Map layouts to a representative of their equivalence class.
+
+    The dimensions within the ranges of positions covered by the rules are
+    sorted, so that all layouts which the rules consider equivalent share a
+    representative. Only exact rules are used, unless approximations are
+    explicitly allowed.
+    """
+
+    def __init__(
+        self,
+        pattern: alex.definitions.Pattern,
+        hierarchy: alex.schema.CacheHierarchy,
+        precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+        approximate: bool = False,
+    ):
+        self.rules = [
+            r for r in rules(pattern, hierarchy, precision) if r.exact or approximate
+        ]
+
+    def ranges(self, length: int) -> typing.List[typing.Tuple[int, int]]:
+        """Return the disjoint ranges of positions to sort in a layout."""
+        result = []
+
+        for begin, end in sorted(
+            (r.begin, length if r.end is None else min(r.end, length))
+            for r in self.rules
+        ):
+            if end - begin < 2:
+                continue
+
+            # Overlapping ranges together allow any order of their union.
+            if result and begin < result[-1][1]:
+                result[-1] = (result[-1][0], max(result[-1][1], end))
+            else:
+                result.append((begin, end))
+
+        return result
+
+    def __call__(self, layout) -> typing.Tuple[int, ...]:
+        layout = tuple(layout)
+
+        for begin, end in self.ranges(len(layout)):
+            layout = layout[:begin] + tuple(sorted(layout[begin:end])) + layout[end:]
+
+        return layout
@@ -0,0 +1,92 @@
+import logging
+import os
+import pathlib
+import pickle
+import tempfile
+import typing
+
+import alex.ga
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+def writeCheckpoint(
+    ga: alex.ga.GA, path: pathlib.Path, meta: typing.Optional[dict] = None
+):
+    """Atomically write the state of a genetic algorithm to a file.
+
+    The state is first written to a temporary file in the same directory,
+    which then replaces the checkpoint, so that a crash at any point leaves
+    either the old or the new checkpoint behind.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "meta": meta or {},
+                    "state": ga.get_state(),
+                },
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+    log.debug(
+        "Wrote checkpoint of generation [bold cyan]%d[/] to [bold magenta]%s[/]",
+        ga.generation,
+        path,
+    )
+
+
+def readCheckpoint(
+    ga: alex.ga.GA, path: pathlib.Path, meta: typing.Optional[dict] = None
+):
+    """Restore the state of a genetic algorithm from a checkpoint.
+
+    If meta data is given, it must match that of the checkpoint, which guards
+    against resuming a run with a different problem.
+    """
+    with open(path, "rb") as f:
+        checkpoint = pickle.load(f)
+
+    if checkpoint["version"] != CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Checkpoint {path} has version {checkpoint['version']}, "
+            f"expected {CHECKPOINT_VERSION}"
+        )
+
+    if meta is not None and checkpoint["meta"] != meta:
+        raise ValueError(
+            f"Checkpoint {path} belongs to a different run: {checkpoint['meta']}"
+        )
+
+    ga.set_state(checkpoint["state"])
+
+
+class Checkpointer:
+    """Callback which writes a checkpoint every given number of generations."""
+
+    def __init__(
+        self, path: pathlib.Path, interval: int = 1, meta: typing.Optional[dict] = None
+    ):
+        self.path = path
+        self.interval = interval
+        self.meta = meta
+
+    def __call__(self, ga: alex.ga.GA, final: bool = False):
+        if final or ga.generation % self.interval == 0:
+            writeCheckpoint(ga, self.path, self.meta)
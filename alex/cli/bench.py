@@ -1,18 +1,29 @@
 import argparse
-import concurrent.futures
 import csv
 import hashlib
+import itertools
 import logging
 import pathlib
+import time
 import typing
 
 import numpy
 
 import alex
+import alex.batch
+import alex.benchmark
+import alex.cli.utils
 import alex.fitness
 import alex.logging
 import alex.pattern
+import alex.pool
+import alex.sampling
 import alex.schema
+import alex.specialize
+import alex.store
+import alex.topology
+import alex.trace
+import alex.utils
 
 log = logging.getLogger(__name__)
 
@@ -40,6 +51,10 @@ def evalFitness(
     hierarchy: alex.schema.CacheHierarchy,
     permutation: typing.Tuple[int, ...],
     precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    sampling: typing.Optional[alex.sampling.Sampling] = None,
+    simulator=None,
 ) -> float:
     log.info(
         "Simulating pattern [bold cyan]%s[/] with layout [bold cyan]%s[/]...",
@@ -47,7 +62,36 @@ def evalFitness(
         str(permutation),
     )
 
-    fitness = alex.fitness.evalFitness(permutation, hierarchy, pattern)
+    if sampling is not None:
+        estimate = alex.sampling.sampleFitness(
+            permutation,
+            hierarchy,
+            pattern,
+            sampling,
+            trace_store=trace_store,
+            engine=engine,
+        )
+
+        log.info(
+            "Sampled [bold cyan]%.1f%%[/] of pattern [bold cyan]%s[/] with layout "
+            + "[bold cyan]%s[/], fitness interval is [bold cyan][%f, %f][/]",
+            100 * estimate.fraction,
+            str(pattern),
+            str(permutation),
+            estimate.low,
+            estimate.high,
+        )
+
+        fitness = estimate.fitness
+    else:
+        fitness = alex.fitness.evalFitness(
+            permutation,
+            hierarchy,
+            pattern,
+            trace_store=trace_store,
+            engine=engine,
+            simulator=simulator,
+        )
 
     log.info(
         "Fitness for pattern [bold cyan]%s[/] with layout [bold cyan]%s[/]"
@@ -60,32 +104,181 @@ def evalFitness(
     return fitness
 
 
+def benchLayout(
+    pattern: alex.definitions.Pattern,
+    layout: typing.Tuple[int, ...],
+    protocol: alex.benchmark.Protocol,
+) -> typing.Tuple[typing.List[float], typing.List[typing.Dict]]:
+    """Measure the runtime of a layout in trials, following the protocol.
+
+    Returns the runtime of every trial and, if the protocol reads counters,
+    the counters of every trial.
+    """
+    if protocol.cache_state == alex.benchmark.CacheState.Cold:
+        buffer = numpy.zeros(protocol.flush_bytes // 8)
+
+    if protocol.specialized is not None:
+        entry = alex.specialize.lookup(protocol.specialized, pattern, layout)
+    else:
+        entry = None
+
+    def run():
+        if entry is not None:
+            return entry(list(layout))
+
+        return alex.pattern.runBenchPattern(
+            pattern, layout, threads=protocol.threads, cpus=protocol.cpus
+        )
+
+    results = []
+    counters = []
+    start = time.perf_counter()
+
+    while protocol.native and not alex.benchmark.converged(results, protocol):
+        if (
+            protocol.time_limit is not None
+            and results
+            and time.perf_counter() - start > protocol.time_limit
+        ):
+            log.debug("...stopping after the time limit")
+            break
+
+        trials = alex.pattern.runBenchPatternRepeated(
+            pattern,
+            layout,
+            protocol.repetitions,
+            protocol.warmup,
+            protocol.huge_pages,
+        ).tolist()
+
+        log.debug(
+            "...runtimes for trials [bold cyan]%d[/] to [bold cyan]%d[/] were %s",
+            len(results),
+            len(results) + len(trials) - 1,
+            ", ".join("[bold cyan]%s[/]" % formatNanoseconds(rt) for rt in trials),
+        )
+        results.extend(trials)
+
+    while not protocol.native and not alex.benchmark.converged(results, protocol):
+        if (
+            protocol.time_limit is not None
+            and results
+            and time.perf_counter() - start > protocol.time_limit
+        ):
+            log.debug("...stopping after the time limit")
+            break
+
+        if protocol.cache_state == alex.benchmark.CacheState.Warm:
+            run()
+        elif protocol.cache_state == alex.benchmark.CacheState.Cold:
+            alex.benchmark.flushCaches(buffer)
+
+        if protocol.counters:
+            c = alex.pattern.runBenchPatternCounters(pattern, layout)
+            rt = c.pop("runtime")
+            counters.append(c)
+        else:
+            rt = run()
+
+        log.debug(
+            "...runtime for trial [bold cyan]%d[/] was [bold cyan]%s[/]",
+            len(results),
+            formatNanoseconds(rt),
+        )
+        results.append(rt)
+
+    return results, counters
+
+
 def eval(
     layouts: typing.List[alex.schema.BenchmarkInputElement],
     hierarchy: alex.schema.CacheHierarchy,
     executor=None,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    sampling: typing.Optional[alex.sampling.Sampling] = None,
+    fitness_store: typing.Optional[alex.store.FitnessStore] = None,
+    digest: typing.Optional[str] = None,
 ) -> typing.Mapping[alex.schema.BenchmarkInputElement, float]:
+    known = {}
+
+    if fitness_store is not None:
+        tables = {
+            p: fitness_store.table(
+                digest,
+                p,
+                alex.definitions.Precision.Single,
+                alex.store.methodKey(sampling),
+            )
+            for p in {i.pattern for i in layouts}
+        }
+
+        for i in layouts:
+            f = tables[i.pattern].lookup([tuple(i.layout)]).get(tuple(i.layout))
+
+            if f is not None:
+                known[i] = f
+
+        log.info("Fitness of [bold cyan]%d[/] individuals is already known", len(known))
+
+    todo = [i for i in dict.fromkeys(layouts) if i not in known]
+
+    if trace_store is not None:
+        for i in todo:
+            trace_store.get(
+                i.pattern,
+                alex.utils.bitCounts(i.pattern, i.layout),
+                alex.definitions.Precision.Single,
+            )
+
     if executor is None:
         results = map(
             lambda i: evalFitness(
-                i.pattern, hierarchy, i.layout, alex.definitions.Precision.Single
-            ),
-            layouts,
-        )
-    else:
-        futures = [
-            executor.submit(
-                evalFitness,
                 i.pattern,
                 hierarchy,
                 i.layout,
                 alex.definitions.Precision.Single,
-            )
-            for i in layouts
-        ]
-        results = [f.result() for f in futures]
+                trace_store,
+                engine,
+                sampling,
+            ),
+            todo,
+        )
+        results = dict(zip(todo, results))
+    else:
+        # Layouts are sent to the workers in adaptively sized chunks of the
+        # same pattern, and results are reported as each chunk completes.
+        batcher = alex.batch.Batcher(alex.fitness.evalFitnessBatch)
+        results = {}
+
+        for p in dict.fromkeys(i.pattern for i in todo):
+            for layout, fitness in batcher.map(
+                executor,
+                [i.layout for i in todo if i.pattern == p],
+                {
+                    "hierarchy": hierarchy,
+                    "pattern": p,
+                    "trace_store": trace_store,
+                    "engine": engine,
+                    "sampling": sampling,
+                },
+            ):
+                log.info(
+                    "Fitness for pattern [bold cyan]%s[/] with layout "
+                    + "[bold cyan]%s[/] is [bold cyan]%f[/]",
+                    str(p),
+                    str(layout),
+                    fitness,
+                )
+                results[alex.schema.BenchmarkInputElement(pattern=p, layout=layout)] = (
+                    fitness
+                )
 
-    return dict(zip(layouts, results))
+    if fitness_store is not None:
+        for p, t in tables.items():
+            t.insert({tuple(i.layout): f for i, f in results.items() if i.pattern == p})
+
+    return {**known, **results}
 
 
 def main():
@@ -119,6 +312,8 @@ def main():
         nargs="?",
         const=-1,
     )
+    alex.cli.utils.addDistributedArguments(parser)
+    alex.cli.utils.addDepositArguments(parser)
     parser.add_argument(
         "-v",
         "--verbose",
@@ -128,16 +323,193 @@ def main():
     parser.add_argument(
         "-r",
         "--repetitions",
-        help="number of benchmark repetitions",
+        help="number of benchmark repetitions, or the minimum with --target-ci",
         type=int,
         default=10,
     )
+    parser.add_argument(
+        "--target-ci",
+        type=float,
+        help="repeat until the confidence interval of the median runtime is at "
+        "most this fraction of the median wide",
+    )
+    parser.add_argument(
+        "--max-repetitions",
+        type=int,
+        default=1000,
+        help="maximum number of repetitions with --target-ci",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        help="maximum number of seconds to benchmark every layout for",
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="confidence level of the interval of the median runtime",
+    )
+    parser.add_argument(
+        "--cache-state",
+        type=alex.benchmark.CacheState,
+        choices=list(alex.benchmark.CacheState),
+        default=alex.benchmark.CacheState.Any,
+        help="state of the caches at the start of every trial: warmed up by an "
+        "untimed run, or cold after writing a buffer larger than all caches",
+    )
+    parser.add_argument(
+        "--reject-outliers",
+        type=float,
+        nargs="?",
+        const=3.0,
+        metavar="THRESHOLD",
+        help="ignore trials further from the median than the threshold (default "
+        "3) times the scaled median absolute deviation",
+    )
+    parser.add_argument(
+        "--native-loop",
+        action="store_true",
+        help="run the repetitions of a benchmark in the extension, on arrays "
+        "which are allocated once",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="number of untimed runs before the repetitions of the native loop",
+    )
+    parser.add_argument(
+        "--huge-pages",
+        type=alex.benchmark.HugePages,
+        choices=list(alex.benchmark.HugePages),
+        default=alex.benchmark.HugePages.Off,
+        help="pages to back the arrays of the native loop with; explicit huge "
+        "pages must be reserved in advance",
+    )
+    parser.add_argument(
+        "--counters",
+        action="store_true",
+        help="read hardware performance counters (cycles, L1D, LLC and dTLB "
+        "misses) around every trial",
+    )
+    parser.add_argument(
+        "--specialized",
+        type=pathlib.Path,
+        help="module built by alex-compile, whose specialized kernels are used "
+        "for the layouts it contains",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1],
+        metavar="N",
+        help="numbers of threads to split every benchmark between, each pinned "
+        "to a domain of its own, reporting the runtime for every number",
+    )
+    parser.add_argument(
+        "--trials",
+        type=pathlib.Path,
+        help="CSV file to write the runtime of every trial to",
+    )
+    parser.add_argument(
+        "-J",
+        "--bench-parallel",
+        type=int,
+        nargs="?",
+        const=-1,
+        help="number of layouts to benchmark at once, each pinned to its own "
+        "domain (default: one per domain)",
+    )
+    parser.add_argument(
+        "--pin",
+        type=alex.topology.Domain,
+        choices=list(alex.topology.Domain),
+        default=alex.topology.Domain.Core,
+        help="domain in which every parallel benchmark, or every thread of a "
+        "benchmark, runs alone: a physical core, a last level cache, or a NUMA "
+        "node",
+    )
+    parser.add_argument(
+        "--reserve",
+        type=int,
+        default=0,
+        help="number of domains to keep free of benchmarks",
+    )
     parser.add_argument(
         "--no-simulate", action="store_false", dest="simulate", default=True
     )
+    parser.add_argument(
+        "--trace-store",
+        type=pathlib.Path,
+        help="directory in which to keep recorded pattern traces",
+    )
+    parser.add_argument(
+        "--fitness-store",
+        type=pathlib.Path,
+        help="database in which to keep fitness values across runs",
+    )
+    parser.add_argument(
+        "--engine",
+        type=alex.definitions.Engine,
+        choices=list(alex.definitions.Engine),
+        default=alex.definitions.Engine.PyCacheSim,
+        help="cache simulation engine to use",
+    )
+    parser.add_argument(
+        "--sample",
+        type=alex.sampling.SamplingMethod,
+        choices=list(alex.sampling.SamplingMethod),
+        help="estimate fitness from a sampled simulation",
+    )
+    parser.add_argument(
+        "--sample-fraction",
+        type=float,
+        default=0.1,
+        help="fraction of the cache sets or of the trace to simulate",
+    )
 
     args = parser.parse_args()
 
+    if args.native_loop and (
+        args.counters or args.cache_state == alex.benchmark.CacheState.Cold
+    ):
+        parser.error("--native-loop cannot be combined with --counters or a cold cache")
+
+    if args.specialized is not None and (args.native_loop or args.counters):
+        parser.error(
+            "--specialized cannot be combined with --native-loop or --counters"
+        )
+
+    if (
+        args.sample == alex.sampling.SamplingMethod.Intervals
+        and args.trace_store is None
+    ):
+        parser.error("--sample intervals requires --trace-store")
+
+    args.threads = sorted(set(args.threads))
+
+    if min(args.threads) < 1:
+        parser.error("--threads must be at least one")
+
+    if max(args.threads) > 1 and (
+        args.native_loop
+        or args.counters
+        or args.specialized is not None
+        or args.bench_parallel is not None
+    ):
+        parser.error(
+            "--threads cannot be combined with --native-loop, --counters, "
+            "--specialized or --bench-parallel"
+        )
+
+    if args.listen is not None:
+        try:
+            alex.cli.utils.authKey(args.authkey)
+        except ValueError as e:
+            parser.error(str(e))
+
     logging.basicConfig(
         level=logging.DEBUG if (args.verbose or False) else logging.INFO,
         format="%(message)s",
@@ -148,12 +520,13 @@ def main():
         "Welcome to [bold]ALEX Bench[/] version [bold yellow]%s[/]", alex.__version__
     )
 
+    alex.cli.utils.selectDeposit(parser, args)
+
     log.info("Reading cache configuration from [bold magenta]%s[/]", args.cache)
 
-    log.info(
-        "Cache configuration MD5 sum is [bold green]%s[/]",
-        hashlib.md5(open(args.cache, "rb").read()).hexdigest(),
-    )
+    digest = alex.store.hierarchyDigest(args.cache)
+
+    log.info("Cache configuration MD5 sum is [bold green]%s[/]", digest)
 
     with open(args.cache, "r") as f:
         hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
@@ -179,11 +552,37 @@ def main():
 
     log.info("Total number of individuals is [bold cyan]%d[/]", len(individuals))
 
+    if args.trace_store is not None:
+        log.info("Using trace store in [bold magenta]%s[/]", args.trace_store)
+        trace_store = alex.trace.TraceStore(args.trace_store)
+    else:
+        trace_store = None
+
+    if args.fitness_store is not None:
+        log.info("Using fitness store in [bold magenta]%s[/]", args.fitness_store)
+        fitness_store = alex.store.FitnessStore(args.fitness_store)
+    else:
+        fitness_store = None
+
+    if args.sample is not None:
+        sampling = alex.sampling.Sampling(
+            method=args.sample, fraction=args.sample_fraction
+        )
+        log.info(
+            "Sampling [bold yellow]%s[/] with fraction [bold yellow]%f[/]",
+            args.sample,
+            args.sample_fraction,
+        )
+    else:
+        sampling = None
+
     if args.simulate:
         log.info("Evaluating fitness function...")
 
-        if args.parallel is not None:
-            if args.parallel < 0:
+        if args.parallel is not None or args.listen is not None:
+            if args.listen is not None:
+                log.info("Running evaluation on distributed workers")
+            elif args.parallel < 0:
                 log.info("Running evaluation with automatic process count")
             else:
                 log.info(
@@ -191,64 +590,281 @@ def main():
                     args.parallel,
                 )
 
-            with concurrent.futures.ProcessPoolExecutor(
-                max_workers=None if args.parallel < 0 else args.parallel
+            with alex.cli.utils.makeExecutor(
+                args,
+                [alex.fitness.evalFitnessBatch],
+                {
+                    "hierarchy": hierarchy,
+                    "trace_store": trace_store,
+                    "engine": args.engine,
+                    "sampling": sampling,
+                },
             ) as executor:
-                fitnesses = eval(individuals, hierarchy, executor=executor)
+                fitnesses = eval(
+                    individuals,
+                    hierarchy,
+                    executor=executor,
+                    trace_store=trace_store,
+                    engine=args.engine,
+                    sampling=sampling,
+                    fitness_store=fitness_store,
+                    digest=digest,
+                )
         else:
             log.info("Running evaluation sequentially")
-            fitnesses = eval(individuals, hierarchy)
+            fitnesses = eval(
+                individuals,
+                hierarchy,
+                trace_store=trace_store,
+                engine=args.engine,
+                sampling=sampling,
+                fitness_store=fitness_store,
+                digest=digest,
+            )
     else:
         log.info("Skipping simulation, assuming zero for all individuals.")
         fitnesses = {i: 0 for i in individuals}
 
+    if max(args.threads) > 1:
+        thread_cpus = tuple(
+            c.cpu
+            for c in alex.topology.placements(
+                alex.topology.readTopology(), args.pin, args.reserve
+            )
+        )[: max(args.threads)]
+
+        if not thread_cpus:
+            parser.error("no %s domains are left to run threads on" % args.pin)
+
+        log.info(
+            "Running threads on CPUs [bold yellow]%s[/], one per %s",
+            ", ".join(str(c) for c in thread_cpus),
+            args.pin,
+        )
+
+        if len(thread_cpus) < max(args.threads):
+            log.warning(
+                "Only %d %s domains are available for up to %d threads, so some "
+                + "threads share a domain",
+                len(thread_cpus),
+                args.pin,
+                max(args.threads),
+            )
+    else:
+        thread_cpus = ()
+
+    protocol = alex.benchmark.Protocol(
+        repetitions=args.repetitions,
+        target=args.target_ci,
+        max_repetitions=args.max_repetitions,
+        time_limit=args.time_limit,
+        confidence=args.confidence,
+        cache_state=args.cache_state,
+        flush_bytes=2
+        * max(c.sets * c.ways * c.line for c in hierarchy.caches.values()),
+        outliers=args.reject_outliers,
+        counters=args.counters,
+        native=args.native_loop,
+        warmup=args.warmup,
+        huge_pages=args.huge_pages,
+        specialized=None if args.specialized is None else str(args.specialized),
+        cpus=thread_cpus,
+    )
+
+    log.info(
+        "Benchmark protocol: "
+        + ", ".join(
+            "[yellow]%s[/]: %s" % (str(k), str(v)) for k, v in protocol.dict().items()
+        )
+    )
+
+    specialized = set()
+
+    if args.specialized is not None:
+        log.info("Using specialized kernels from [bold magenta]%s[/]", args.specialized)
+
+        try:
+            alex.specialize.loadModule(args.specialized)
+        except (ImportError, OSError) as e:
+            parser.error("cannot load %s: %s" % (args.specialized, e))
+
+        specialized = {
+            i
+            for i in individuals
+            if alex.specialize.lookup(args.specialized, i.pattern, i.layout) is not None
+        }
+
+        log.info(
+            "Specialized kernels are available for [bold cyan]%d[/] of "
+            + "[bold cyan]%d[/] individuals",
+            len(specialized),
+            len(individuals),
+        )
+
     log.info("Benchmarking true performance...")
 
     runtimes = {}
+    counters = {}
+    trials = {}
+    placement = {}
+
+    def onThreads(threads):
+        if len(args.threads) == 1:
+            return ""
+
+        return " on [bold cyan]%d[/] thread%s" % (threads, "" if threads == 1 else "s")
+
+    def report(i, threads, measurement):
+        results, trial_counters = measurement
+        summary = alex.benchmark.summarize(results, protocol)
 
-    for i in individuals:
         log.info(
-            "Benchmarking pattern [bold cyan]%s[/] with layout [bold cyan]%s[/]...",
+            "...runtime for pattern [bold cyan]%s[/] with layout [bold cyan]%s[/]%s "
+            + "was [bold cyan]%s[/] ([bold cyan]±%s[/]), median [bold cyan]%s[/] "
+            + "in [bold cyan][%s, %s][/] over [bold cyan]%d[/] of "
+            + "[bold cyan]%d[/] trials",
             str(i.pattern),
             str(tuple(i.layout)),
+            onThreads(threads),
+            formatNanoseconds(summary.mean),
+            formatNanoseconds(summary.dev),
+            formatNanoseconds(summary.median),
+            formatNanoseconds(summary.low),
+            formatNanoseconds(summary.high),
+            summary.trials,
+            len(results),
         )
 
-        results = []
+        runtimes[i, threads] = summary
+        trials[i, threads] = (results, trial_counters)
+
+        if args.counters:
+            counters[i, threads] = alex.benchmark.summarizeCounters(
+                results, trial_counters, protocol
+            )
 
-        for j in range(args.repetitions):
-            rt = alex.pattern.runBenchPattern(i.pattern, tuple(i.layout))
-            log.debug(
-                "...runtime for trial [bold cyan]%d[/] was [bold cyan]%s[/]",
-                j,
-                formatNanoseconds(rt),
+            log.info(
+                "...counters were "
+                + ", ".join(
+                    "[yellow]%s[/]: [bold cyan]%s[/]"
+                    % (n, "n/a" if v is None else "%.0f" % v)
+                    for n, v in counters[i, threads].items()
+                )
             )
-            results.append(rt)
 
-        mn = numpy.mean(results)
-        dv = numpy.std(results)
+    jobs = [
+        (i.pattern, tuple(i.layout), protocol.copy(update={"threads": t}))
+        for i in individuals
+        for t in args.threads
+    ]
+
+    if args.bench_parallel is not None:
+        cpus = alex.topology.placements(
+            alex.topology.readTopology(), args.pin, args.reserve
+        )
+
+        if args.bench_parallel > 0:
+            cpus = cpus[: args.bench_parallel]
+
+        if not cpus:
+            parser.error("no %s domains are left to benchmark on" % args.pin)
 
         log.info(
-            "...runtime was [bold cyan]%s[/] ([bold cyan]±%s[/])",
-            formatNanoseconds(mn),
-            formatNanoseconds(dv),
+            "Benchmarking on [bold yellow]%d[/] CPUs, one per %s: %s",
+            len(cpus),
+            args.pin,
+            ", ".join("[yellow]%d[/]" % c.cpu for c in cpus),
         )
 
-        runtimes[i] = (mn, dv)
+        with alex.pool.PinnedPool(cpus) as pool:
+            for (p, layout, q), c, measurement in pool.map(benchLayout, jobs):
+                i = alex.schema.BenchmarkInputElement(pattern=p, layout=layout)
+                placement[i, q.threads] = c
+                report(i, q.threads, measurement)
+    else:
+        for p, layout, q in jobs:
+            log.info(
+                "Benchmarking pattern [bold cyan]%s[/] with layout "
+                + "[bold cyan]%s[/]%s...",
+                str(p),
+                str(layout),
+                onThreads(q.threads),
+            )
+            report(
+                alex.schema.BenchmarkInputElement(pattern=p, layout=layout),
+                q.threads,
+                benchLayout(p, layout, q),
+            )
+
+    if len(args.threads) > 1:
+        for i in dict.fromkeys(individuals):
+            base = runtimes[i, args.threads[0]].mean
+
+            log.info(
+                "Runtime for pattern [bold cyan]%s[/] with layout [bold cyan]%s[/] "
+                + "by number of threads: %s",
+                str(i.pattern),
+                str(tuple(i.layout)),
+                ", ".join(
+                    "[yellow]%d[/]: [bold cyan]%s[/] ([bold cyan]%.2fx[/])"
+                    % (
+                        t,
+                        formatNanoseconds(runtimes[i, t].mean),
+                        base / runtimes[i, t].mean,
+                    )
+                    for t in args.threads
+                ),
+            )
 
     output = [
         alex.schema.BenchmarkOutput(
             pattern=i.pattern,
             layout=i.layout,
             fitness=fitnesses[i],
-            runtime=runtimes[i][0],
-            runtime_dev=runtimes[i][1],
+            runtime=runtimes[i, t].mean,
+            runtime_dev=runtimes[i, t].dev,
+            runtime_median=runtimes[i, t].median,
+            runtime_low=runtimes[i, t].low,
+            runtime_high=runtimes[i, t].high,
+            trials=runtimes[i, t].trials,
+            specialized=i in specialized,
+            threads=t,
+            **(placement[i, t]._asdict() if (i, t) in placement else {}),
+            **counters.get((i, t), {}),
         )
         for i in individuals
+        for t in args.threads
     ]
 
+    if args.counters and all(v is None for c in counters.values() for v in c.values()):
+        log.warning(
+            "Hardware counters are not available, which may be due to the "
+            + "kernel.perf_event_paranoid setting or a virtual machine"
+        )
+
     with open(args.output, "w") as f:
         w = csv.DictWriter(
-            f, fieldnames=["pattern", "layout", "fitness", "runtime", "runtime_dev"]
+            f,
+            fieldnames=[
+                "pattern",
+                "layout",
+                "fitness",
+            ]
+            + (alex.benchmark.COUNTERS if args.counters else [])
+            + [
+                "runtime",
+                "runtime_dev",
+                "runtime_median",
+                "runtime_low",
+                "runtime_high",
+                "trials",
+                "specialized",
+                "threads",
+                "cpu",
+                "core",
+                "cache",
+                "node",
+            ],
         )
 
         w.writeheader()
@@ -261,5 +877,60 @@ def main():
                     "fitness": i.fitness,
                     "runtime": i.runtime,
                     "runtime_dev": i.runtime_dev,
+                    "runtime_median": i.runtime_median,
+                    "runtime_low": i.runtime_low,
+                    "runtime_high": i.runtime_high,
+                    "trials": i.trials,
+                    "specialized": i.specialized,
+                    "threads": i.threads,
+                    "cpu": i.cpu,
+                    "core": i.core,
+                    "cache": i.cache,
+                    "node": i.node,
+                    **(
+                        {n: getattr(i, n) for n in alex.benchmark.COUNTERS}
+                        if args.counters
+                        else {}
+                    ),
                 }
             )
+
+    if args.trials is not None:
+        log.info("Writing trials to [bold magenta]%s[/]", args.trials)
+
+        with open(args.trials, "w") as f:
+            w = csv.DictWriter(
+                f,
+                fieldnames=[
+                    "pattern",
+                    "layout",
+                    "threads",
+                    "trial",
+                    "runtime",
+                    "outlier",
+                ]
+                + (alex.benchmark.COUNTERS if args.counters else []),
+            )
+
+            w.writeheader()
+
+            for i, t in itertools.product(dict.fromkeys(individuals), args.threads):
+                results, trial_counters = trials[i, t]
+                kept = (
+                    alex.benchmark.outlierMask(results, args.reject_outliers)
+                    if args.reject_outliers is not None
+                    else [True] * len(results)
+                )
+
+                for j, (rt, k) in enumerate(zip(results, kept)):
+                    w.writerow(
+                        {
+                            "pattern": i.pattern,
+                            "layout": ",".join(str(x) for x in i.layout),
+                            "threads": t,
+                            "trial": j,
+                            "runtime": rt,
+                            "outlier": not k,
+                            **(trial_counters[j] if trial_counters else {}),
+                        }
+                    )
@@ -0,0 +1,186 @@
+import argparse
+import csv
+import logging
+import pathlib
+
+import alex
+import alex.cli.bench
+import alex.definitions
+import alex.logging
+import alex.specialize
+
+log = logging.getLogger(__name__)
+
+
+def pickLayouts(file, by, top, descending=None, patterns=None):
+    """Return the best layouts of every pattern in a CSV file of rankings.
+
+    Layouts are ranked by the given column, from high to low if descending,
+    or from low to high otherwise. By default, only fitness, of which higher
+    values are better, is ranked from high to low, and all other columns,
+    such as runtimes, from low to high.
+    """
+    if descending is None:
+        descending = by == "fitness"
+
+    ranked = {}
+    r = csv.DictReader(file)
+
+    if by not in (r.fieldnames or []):
+        raise ValueError("input has no column named %s" % by)
+
+    for x in r:
+        p = alex.definitions.Pattern(x["pattern"])
+
+        if patterns is None or p in patterns:
+            ranked.setdefault(p, {}).setdefault(
+                tuple(alex.cli.bench.parseLayout(x["layout"])), float(x[by])
+            )
+
+    return {
+        p: [
+            (layout, layouts[layout])
+            for layout in sorted(layouts, key=layouts.get, reverse=descending)[:top]
+        ]
+        for p, layouts in ranked.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "-i",
+        "--input",
+        type=pathlib.Path,
+        help="CSV file of ranked layouts, such as the output of alex-bench",
+        required=True,
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=pathlib.Path,
+        help="directory to write the module and its source to",
+        required=True,
+    )
+    parser.add_argument(
+        "-n",
+        "--name",
+        default="alex_specialized",
+        help="name of the module to build",
+    )
+    parser.add_argument(
+        "-t",
+        "--pattern",
+        type=alex.definitions.Pattern,
+        choices=list(alex.definitions.Pattern),
+        nargs="+",
+        help="patterns to specialize layouts of (default: all in the input)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="number of best layouts of every pattern to specialize",
+    )
+    parser.add_argument(
+        "--by",
+        default="fitness",
+        help="column to rank layouts by",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["ascending", "descending"],
+        help="order in which to rank layouts (default: descending for fitness, "
+        + "ascending for any other column)",
+    )
+    parser.add_argument(
+        "--precision",
+        type=alex.definitions.Precision,
+        choices=list(alex.definitions.Precision),
+        nargs="+",
+        default=[alex.definitions.Precision.Single],
+        help="precisions to specialize every layout for",
+    )
+    parser.add_argument(
+        "--march",
+        default="native",
+        help="architecture to compile for, or none to use the compiler default",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        help="enable verbose output",
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if (args.verbose or False) else logging.INFO,
+        format="%(message)s",
+        handlers=[alex.logging.LogHandler()],
+    )
+
+    log.info(
+        "Welcome to [bold]ALEX Compile[/] version [bold yellow]%s[/]", alex.__version__
+    )
+
+    log.info("Reading ranked layouts from [bold magenta]%s[/]", args.input)
+
+    with open(args.input, "r") as f:
+        try:
+            ranked = pickLayouts(
+                f,
+                args.by,
+                args.top,
+                descending=None if args.order is None else args.order == "descending",
+                patterns=args.pattern,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+
+    specializations = []
+
+    for p, picked in ranked.items():
+        best = [layout for layout, _ in picked]
+
+        for layout, value in picked:
+            log.info(
+                "Specializing pattern [bold cyan]%s[/] with layout [bold cyan]%s[/] "
+                + "(%s [bold cyan]%f[/])",
+                str(p),
+                str(layout),
+                args.by,
+                value,
+            )
+
+        for layout in best:
+            try:
+                alex.specialize.masks(p, layout)
+            except ValueError as e:
+                parser.error(str(e))
+
+        specializations.extend(
+            alex.specialize.Specialization(pattern=p, layout=layout, precision=q)
+            for layout in best
+            for q in args.precision
+        )
+
+    if not specializations:
+        parser.error("no layouts to specialize")
+
+    log.info(
+        "Building [bold cyan]%d[/] specialized entries into [bold magenta]%s[/]...",
+        len(specializations),
+        args.output,
+    )
+
+    path = alex.specialize.buildModule(
+        args.name,
+        specializations,
+        args.output,
+        march=None if args.march == "none" else args.march,
+    )
+
+    log.info("Module written to [bold magenta]%s[/]", path)
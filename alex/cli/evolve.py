@@ -1,21 +1,30 @@
 import argparse
 import collections
-import concurrent.futures
-import hashlib
 import logging
 import math
+import os
 import pathlib
 import random
 
+import numpy
+
 import alex
+import alex.canonical
+import alex.checkpoint
 import alex.cli.utils
 import alex.definitions
 import alex.fitness
 import alex.ga
+import alex.islands
 import alex.logging
 import alex.pattern
+import alex.sampling
 import alex.schema
 import alex.simulator
+import alex.store
+import alex.strategies
+import alex.surrogate
+import alex.trace
 import alex.utils
 
 log = logging.getLogger(__name__)
@@ -62,6 +71,84 @@ def mutExchangeDifferent(ind):
     return tuple(nind)
 
 
+def occurrenceKeys(population):
+    """Number every element of a population array by its occurrence.
+
+    This is the array form of `alex.utils.enumerateOccurances`: the k-th
+    occurrence of value v in a row of length n gets the key v * n + k, so
+    that the keys of every row are distinct.
+    """
+    n = population.shape[1]
+    onehot = population[:, :, None] == numpy.arange(population.max() + 1)
+    occurrence = numpy.take_along_axis(
+        numpy.cumsum(onehot, axis=1), population[:, :, None], axis=2
+    )[:, :, 0]
+
+    return population * n + occurrence - 1
+
+
+def cxGeneralizedOrderedBatch(pop1, pop2, idx=None, num=None):
+    """Apply `cxGeneralizedOrdered` to every pair of rows of two arrays.
+
+    The segment of the second parent is taken by key, and the child is
+    assembled by a stable sort of the first parent's remaining elements
+    before the insertion point, the segment, and the remaining elements
+    after it. The cut points are random unless given.
+    """
+    rows, n = pop1.shape
+
+    if idx is None:
+        idx = numpy.random.randint(0, n + 1, size=rows)
+
+    if num is None:
+        num = numpy.random.randint(1, n // 2 + 1, size=rows)
+
+    keys1 = occurrenceKeys(pop1)
+    keys2 = occurrenceKeys(pop2)
+
+    window = numpy.arange(n // 2)
+    active = window[None, :] < num[:, None]
+    segment = numpy.take_along_axis(keys2, (idx[:, None] + window[None, :]) % n, axis=1)
+
+    taken = numpy.zeros((rows, keys1.max() + 1), dtype=bool)
+    taken[numpy.nonzero(active)[0], segment[active]] = True
+
+    position = numpy.arange(n)[None, :]
+    order = numpy.concatenate(
+        [
+            numpy.where(
+                numpy.take_along_axis(taken, keys1, axis=1),
+                3 * n,
+                position + (position >= idx[:, None]) * 2 * n,
+            ),
+            numpy.where(active, n + window[None, :], 3 * n),
+        ],
+        axis=1,
+    )
+    values = numpy.concatenate([pop1, segment // n], axis=1)
+
+    return numpy.take_along_axis(
+        values, numpy.argsort(order, axis=1, kind="stable")[:, :n], axis=1
+    )
+
+
+def mutExchangeDifferentBatch(population):
+    """Apply `mutExchangeDifferent` to every row of an array."""
+    rows, n = population.shape
+
+    i = numpy.random.randint(0, n - 2, size=rows)
+    j = numpy.random.randint(i + 1, n)
+
+    position = numpy.arange(n)[None, :]
+    source = numpy.where(
+        (position >= i[:, None]) & (position < j[:, None] - 1),
+        position + 1,
+        numpy.where(position == j[:, None] - 1, i[:, None], position),
+    )
+
+    return numpy.take_along_axis(population, source, axis=1)
+
+
 def initialPop(*mtpl):
     """Generate the initial permutation population.
 
@@ -82,6 +169,36 @@ def initialPop(*mtpl):
     # return [tuple(random.sample(q, k=len(q))) for _ in range(15)]
 
 
+def makeFidelity(name, promote, hierarchy, kwargs):
+    """Build a cheap fidelity level of the full fitness evaluation.
+
+    The reduced fidelity removes the most significant bit of every dimension,
+    the l1 fidelity simulates only the first cache level, and the sets and
+    intervals fidelities simulate a sixteenth of the cache sets or of the
+    trace, respectively.
+    """
+    if name == "reduced":
+        func, kwargs = alex.fitness.evalFitnessReduced, {**kwargs, "shrink": 1}
+    elif name == "l1":
+        func, kwargs = alex.fitness.evalFitness, {
+            **kwargs,
+            "hierarchy": hierarchy.firstLevel(),
+        }
+    elif name in list(alex.sampling.SamplingMethod):
+        func, kwargs = alex.fitness.evalFitness, {
+            **kwargs,
+            "sampling": alex.sampling.Sampling(
+                method=alex.sampling.SamplingMethod(name), fraction=1 / 16
+            ),
+        }
+    else:
+        raise ValueError(f"Unknown fidelity {name}")
+
+    return alex.ga.Fidelity(
+        name=name, fitness_func=func, fitness_func_kwargs=kwargs, promote=promote
+    )
+
+
 def main():
     parser = argparse.ArgumentParser()
 
@@ -111,8 +228,132 @@ def main():
         "-g",
         "--generations",
         type=int,
-        help="number of generations",
-        default=10,
+        help="number of generations (default: 10, or unlimited with a budget)",
+    )
+    parser.add_argument(
+        "--max-evaluations",
+        type=int,
+        help="stop after the given number of fitness evaluations",
+    )
+    parser.add_argument(
+        "--max-cpu-seconds",
+        type=float,
+        help="stop after the given number of CPU seconds spent on fitness "
+        "evaluations, summed over all workers",
+    )
+    parser.add_argument(
+        "--retained",
+        type=int,
+        help="number of individuals retained in every generation",
+        default=20,
+    )
+    parser.add_argument(
+        "--generated",
+        type=int,
+        help="number of offspring generated in every generation",
+        default=20,
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=list(alex.strategies.STRATEGIES),
+        default="generational",
+        help="search strategy by which candidates are proposed and selected",
+    )
+    parser.add_argument(
+        "--mutation-rate",
+        type=float,
+        default=0.3,
+        help="probability of mutating an offspring (generational, mu-plus-lambda)",
+    )
+    parser.add_argument(
+        "--tournament",
+        type=int,
+        default=2,
+        help="number of individuals competing for every parent (mu-plus-lambda)",
+    )
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=0.01,
+        help="initial temperature, as a relative loss of fitness (annealing)",
+    )
+    parser.add_argument(
+        "--cooling",
+        type=float,
+        default=0.95,
+        help="factor by which the temperature falls every generation (annealing)",
+    )
+    parser.add_argument(
+        "--tenure",
+        type=int,
+        default=50,
+        help="number of recent moves which may not be revisited (tabu)",
+    )
+    parser.add_argument(
+        "--fidelity",
+        type=alex.cli.utils.parseFidelity,
+        action="append",
+        default=[],
+        metavar="NAME[:FRACTION]",
+        help="cheap fidelity (reduced, l1, sets, intervals) to screen offspring "
+        "with before the full evaluation, promoting the given fraction (default "
+        "0.5); may be given several times, from the cheapest to the most precise",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="breed all offspring of a generation at once with array operators, "
+        "for very large populations",
+    )
+    parser.add_argument(
+        "--surrogate",
+        action="store_true",
+        help="screen offspring with a model of the fitness, trained on the "
+        "layouts evaluated so far",
+    )
+    parser.add_argument(
+        "--surrogate-pool",
+        type=int,
+        default=4,
+        help="factor by which the surrogate screens more candidates than are "
+        "evaluated",
+    )
+    parser.add_argument(
+        "--surrogate-exploration",
+        type=float,
+        default=0.1,
+        help="fraction of evaluated offspring which the surrogate picks at random",
+    )
+    parser.add_argument(
+        "--steady-state",
+        action="store_true",
+        help="breed new offspring as soon as any evaluation finishes, instead of "
+        "waiting for whole generations",
+    )
+    parser.add_argument(
+        "--islands",
+        type=int,
+        default=1,
+        help="number of independent populations, each evolving in its own process",
+    )
+    parser.add_argument(
+        "--migration-interval",
+        type=int,
+        default=5,
+        help="number of generations between migrations between islands",
+    )
+    parser.add_argument(
+        "--migrants",
+        type=int,
+        default=2,
+        help="number of best individuals which every island sends out",
+    )
+    parser.add_argument(
+        "--topology",
+        type=alex.islands.Topology,
+        choices=list(alex.islands.Topology),
+        default=alex.islands.Topology.Ring,
+        help="islands to which migrants are sent",
     )
     parser.add_argument(
         "-j",
@@ -121,6 +362,8 @@ def main():
         nargs="?",
         const=-1,
     )
+    alex.cli.utils.addDistributedArguments(parser)
+    alex.cli.utils.addDepositArguments(parser)
     parser.add_argument(
         "-l",
         "--log",
@@ -139,10 +382,93 @@ def main():
         help="enable verbose output",
         action="store_true",
     )
+    parser.add_argument(
+        "--trace-store",
+        type=pathlib.Path,
+        help="directory in which to keep recorded pattern traces",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=pathlib.Path,
+        help="file to periodically write the state of the evolution to",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=1,
+        help="number of generations between checkpoints",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue the evolution from the checkpoint, if it exists",
+    )
+    parser.add_argument(
+        "--fitness-store",
+        type=pathlib.Path,
+        help="database in which to keep fitness values across runs",
+    )
+    parser.add_argument(
+        "--canonical",
+        choices=["none", "exact", "approximate"],
+        default="none",
+        help="equivalence rules by which layouts are mapped to a representative "
+        + "before they are evaluated",
+    )
+    parser.add_argument(
+        "--engine",
+        type=alex.definitions.Engine,
+        choices=list(alex.definitions.Engine),
+        default=alex.definitions.Engine.PyCacheSim,
+        help="cache simulation engine to use",
+    )
 
     args = parser.parse_args()
 
-    assert args.generations > 0
+    if args.max_evaluations is not None or args.max_cpu_seconds is not None:
+        budget = alex.ga.Budget(args.max_evaluations, args.max_cpu_seconds)
+    else:
+        budget = None
+
+    if args.generations is None and budget is None:
+        args.generations = 10
+
+    assert args.generations is None or args.generations > 0
+    assert args.checkpoint_interval > 0
+
+    if args.listen is not None:
+        try:
+            alex.cli.utils.authKey(args.authkey)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.resume and args.checkpoint is None:
+        parser.error("--resume requires --checkpoint")
+
+    if args.islands > 1 and (args.checkpoint is not None or args.steady_state):
+        parser.error("--islands cannot be combined with --checkpoint or --steady-state")
+
+    if args.islands > 1 and budget is not None:
+        parser.error("--islands cannot be combined with a budget")
+
+    if args.steady_state and args.strategy not in ["generational", "mu-plus-lambda"]:
+        parser.error("--steady-state requires a strategy which breeds offspring")
+
+    if args.steady_state and args.surrogate:
+        parser.error("--steady-state cannot be combined with --surrogate")
+
+    if args.steady_state and budget is not None:
+        parser.error("--steady-state cannot be combined with a budget")
+
+    if args.steady_state and args.fidelity:
+        parser.error("--steady-state cannot be combined with --fidelity")
+
+    for name, _ in args.fidelity:
+        if name not in ["reduced", "l1"] + list(alex.sampling.SamplingMethod):
+            parser.error("unknown fidelity %s" % name)
+
+        if name == alex.sampling.SamplingMethod.Intervals and args.trace_store is None:
+            parser.error("the intervals fidelity requires --trace-store")
 
     logging.basicConfig(
         level=logging.DEBUG if (args.verbose or False) else logging.INFO,
@@ -152,6 +478,8 @@ def main():
 
     log.info("Welcome to ALEX version [bold yellow]%s[/]", alex.__version__)
 
+    alex.cli.utils.selectDeposit(parser, args)
+
     log.info(
         "Access pattern is [bold yellow]%s[/] with dimension [bold yellow]%s[/]",
         args.pattern,
@@ -160,19 +488,64 @@ def main():
 
     log.info("Reading cache configuration from [bold magenta]%s[/]", args.cache)
 
-    log.info(
-        "Cache configuration MD5 sum is [bold green]%s[/]",
-        hashlib.md5(open(args.cache, "rb").read()).hexdigest(),
-    )
+    digest = alex.store.hierarchyDigest(args.cache)
+
+    log.info("Cache configuration MD5 sum is [bold green]%s[/]", digest)
 
     with open(args.cache, "r") as f:
         hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
 
+    if args.trace_store is not None:
+        log.info("Using trace store in [bold magenta]%s[/]", args.trace_store)
+        trace_store = alex.trace.TraceStore(args.trace_store)
+        trace_store.get(args.pattern, args.bits)
+    else:
+        trace_store = None
+
+    log.info("Simulating caches with the [bold yellow]%s[/] engine", args.engine)
+
+    if args.fitness_store is not None:
+        log.info("Using fitness store in [bold magenta]%s[/]", args.fitness_store)
+        fitness_store = alex.store.FitnessStore(args.fitness_store).table(
+            digest, args.pattern
+        )
+    else:
+        fitness_store = None
+
     genetic_parameters = {
-        "retained_count": 20,
-        "generated_count": 20,
+        "retained_count": args.retained,
+        "generated_count": args.generated,
+    }
+
+    strategy_parameters = {
+        "generational": {"mutation_rate": args.mutation_rate},
+        "mu-plus-lambda": {
+            "tournament": args.tournament,
+            "mutation_rate": args.mutation_rate,
+        },
+        "annealing": {"temperature": args.temperature, "cooling": args.cooling},
+        "tabu": {"tenure": args.tenure},
+    }[args.strategy]
+
+    fitness_func_kwargs = {
+        "hierarchy": hierarchy,
+        "pattern": args.pattern,
+        "trace_store": trace_store,
+        "engine": args.engine,
     }
 
+    fidelities = [
+        makeFidelity(n, p, hierarchy, fitness_func_kwargs) for n, p in args.fidelity
+    ]
+
+    if fidelities:
+        log.info(
+            "Screening offspring with fidelities "
+            + ", ".join(
+                "[yellow]%s[/] (%.3f)" % (f.name, f.promote) for f in fidelities
+            )
+        )
+
     log.info(
         "Genetic parameters: "
         + ", ".join(
@@ -181,16 +554,141 @@ def main():
         )
     )
 
-    ga = alex.ga.GA(
-        initial_population=initialPop(*args.bits),
-        mutation_func=mutExchangeDifferent,
-        crossover_func=cxGeneralizedOrdered,
-        fitness_func=alex.fitness.evalFitness,
-        fitness_func_kwargs={"hierarchy": hierarchy, "pattern": args.pattern},
-        **genetic_parameters,
+    if args.surrogate:
+        log.info(
+            "Screening offspring with a surrogate from a pool of [bold yellow]%d[/] "
+            + "times their number, exploring [bold yellow]%.3f[/] at random",
+            args.surrogate_pool,
+            args.surrogate_exploration,
+        )
+        surrogate = alex.surrogate.Surrogate(
+            pool=args.surrogate_pool, exploration=args.surrogate_exploration
+        )
+    else:
+        surrogate = None
+
+    log.info(
+        "Search strategy is [bold yellow]%s[/] with "
+        + ", ".join(
+            "[yellow]%s[/]: %s" % (str(k), str(v))
+            for k, v in strategy_parameters.items()
+        ),
+        args.strategy,
     )
 
-    log.info("Generation count is [bold yellow]%d[/]", args.generations)
+    if args.canonical != "none":
+        canonical = alex.canonical.Canonicalizer(
+            args.pattern, hierarchy, approximate=args.canonical == "approximate"
+        )
+
+        for r in canonical.rules:
+            log.info(
+                "Layouts are equivalent under any order of positions "
+                + "[bold yellow]%d[/] to [bold yellow]%s[/] (%s, %s)",
+                r.begin,
+                "end" if r.end is None else str(r.end - 1),
+                r.name,
+                "exact" if r.exact else "approximate",
+            )
+    else:
+        canonical = None
+
+    ga_kwargs = {
+        "initial_population": initialPop(*args.bits),
+        "mutation_func": mutExchangeDifferent,
+        "crossover_func": cxGeneralizedOrdered,
+        "fitness_func": alex.fitness.evalFitness,
+        "fitness_func_kwargs": fitness_func_kwargs,
+        "fidelities": fidelities,
+        "fitness_store": fitness_store,
+        "batch_func": alex.fitness.evalFitnessBatch,
+        "canonical": canonical,
+        "strategy": alex.strategies.STRATEGIES[args.strategy](**strategy_parameters),
+        "surrogate": surrogate,
+        "crossover_batch_func": cxGeneralizedOrderedBatch if args.vectorized else None,
+        "mutation_batch_func": mutExchangeDifferentBatch if args.vectorized else None,
+        **genetic_parameters,
+    }
+
+    if args.islands > 1:
+        if args.parallel is None:
+            workers = None
+        else:
+            workers = max(
+                1,
+                (os.cpu_count() if args.parallel < 0 else args.parallel)
+                // args.islands,
+            )
+
+        log.info(
+            "Evolving [bold yellow]%d[/] islands with [bold yellow]%s[/] workers "
+            + "each, migrating [bold yellow]%d[/] individuals every "
+            + "[bold yellow]%d[/] generations in a [bold yellow]%s[/] topology",
+            args.islands,
+            "no" if workers is None else str(workers),
+            args.migrants,
+            args.migration_interval,
+            args.topology,
+        )
+
+        ga = alex.islands.IslandModel(
+            args.islands,
+            ga_kwargs,
+            interval=args.migration_interval,
+            migrants=args.migrants,
+            topology=args.topology,
+            workers=workers,
+        )
+    else:
+        ga = alex.ga.GA(**ga_kwargs)
+
+    remaining = args.generations
+
+    if args.checkpoint is not None:
+        checkpoint_meta = {
+            "cache": digest,
+            "pattern": str(args.pattern),
+            "bits": list(args.bits),
+            "fidelities": [(n, p) for n, p in args.fidelity],
+            "canonical": args.canonical,
+            "strategy": args.strategy,
+            "surrogate": (
+                [args.surrogate_pool, args.surrogate_exploration]
+                if args.surrogate
+                else None
+            ),
+            **genetic_parameters,
+            **strategy_parameters,
+        }
+        checkpointer = alex.checkpoint.Checkpointer(
+            args.checkpoint, args.checkpoint_interval, checkpoint_meta
+        )
+
+        if args.resume and args.checkpoint.is_file():
+            alex.checkpoint.readCheckpoint(ga, args.checkpoint, checkpoint_meta)
+            log.info(
+                "Resuming from generation [bold yellow]%d[/] of checkpoint "
+                + "[bold magenta]%s[/]",
+                ga.generation,
+                args.checkpoint,
+            )
+            if remaining is not None:
+                remaining -= ga.generation
+        else:
+            log.info("Writing checkpoints to [bold magenta]%s[/]", args.checkpoint)
+    else:
+        checkpointer = None
+
+    if args.generations is not None:
+        log.info("Generation count is [bold yellow]%d[/]", args.generations)
+
+    if budget is not None:
+        log.info(
+            "Budget is [bold yellow]%s[/] evaluations and [bold yellow]%s[/] "
+            + "CPU seconds",
+            "unlimited" if budget.evaluations is None else budget.evaluations,
+            "unlimited" if budget.cpu_seconds is None else budget.cpu_seconds,
+        )
 
     log.info(
         "Total solution space has size [bold cyan]%d[/]",
@@ -198,21 +696,53 @@ def main():
         / math.prod(math.factorial(i) for i in args.bits),
     )
 
-    if args.parallel is not None:
-        if args.parallel < 0:
+    if args.islands > 1:
+        ga.run(generations=args.generations)
+    elif args.parallel is not None or args.listen is not None:
+        if args.listen is not None:
+            log.info("Running evolution on distributed workers")
+        elif args.parallel < 0:
             log.info("Running evolution with automatic process count")
         else:
             log.info(
                 "Running evolution with [bold yellow]%d[/] processes", args.parallel
             )
 
-        with concurrent.futures.ProcessPoolExecutor(
-            max_workers=None if args.parallel < 0 else args.parallel
+        with alex.cli.utils.makeExecutor(
+            args,
+            [alex.fitness.evalFitness, alex.fitness.evalFitnessBatch],
+            fitness_func_kwargs,
         ) as executor:
-            ga.run(generations=args.generations, executor=executor)
+            if args.steady_state:
+                log.info("Running steady-state evolution")
+                ga.run_steady_state(
+                    evaluations=remaining * args.generated,
+                    executor=executor,
+                    concurrency=(
+                        os.cpu_count()
+                        if args.parallel is None or args.parallel < 0
+                        else args.parallel
+                    ),
+                    checkpoint=checkpointer,
+                )
+            else:
+                ga.run(
+                    generations=remaining,
+                    executor=executor,
+                    checkpoint=checkpointer,
+                    budget=budget,
+                )
+    elif args.steady_state:
+        log.info("Running steady-state evolution sequentially")
+        ga.run_steady_state(
+            evaluations=remaining * args.generated, checkpoint=checkpointer
+        )
     else:
         log.info("Running evolution sequentially")
-        ga.run(generations=args.generations)
+        ga.run(generations=remaining, checkpoint=checkpointer, budget=budget)
+
+    if checkpointer is not None:
+        checkpointer(ga, final=True)
 
     log.info("Evolution complete!")
 
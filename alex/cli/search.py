@@ -0,0 +1,286 @@
+import argparse
+import csv
+import logging
+import pathlib
+import time
+
+import alex
+import alex.batch
+import alex.canonical
+import alex.cli.utils
+import alex.definitions
+import alex.logging
+import alex.schema
+import alex.search
+import alex.trace
+
+log = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "-c",
+        "--cache",
+        type=pathlib.Path,
+        help="cache hierarchy YAML file to load",
+        required=True,
+    )
+    parser.add_argument(
+        "-b",
+        "--bits",
+        type=alex.cli.utils.parseBits,
+        help="colon-separated bit counts",
+        required=True,
+    )
+    parser.add_argument(
+        "-t",
+        "--pattern",
+        type=alex.definitions.Pattern,
+        choices=list(alex.definitions.Pattern),
+        help="pattern type to use",
+        required=True,
+    )
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument(
+        "--exhaustive",
+        action="store_true",
+        help="evaluate every distinct layout",
+    )
+    mode.add_argument(
+        "--branch-and-bound",
+        action="store_true",
+        help="skip prefixes of which a bound on the fitness is already worse "
+        "than the best layout found so far",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="relative margin by which a bound must fall short of the best "
+        "fitness for its prefix to be skipped",
+    )
+    parser.add_argument(
+        "--split",
+        type=int,
+        help="length of the prefixes by which the search is split into jobs "
+        "(default: enough for four jobs per worker)",
+    )
+    parser.add_argument(
+        "-j",
+        "--parallel",
+        type=int,
+        nargs="?",
+        const=-1,
+    )
+    alex.cli.utils.addDistributedArguments(parser)
+    alex.cli.utils.addDepositArguments(parser)
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=pathlib.Path,
+        help="CSV file to stream the fitness of every evaluated layout to",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        help="enable verbose output",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--trace-store",
+        type=pathlib.Path,
+        help="directory in which to keep recorded pattern traces",
+    )
+    parser.add_argument(
+        "--canonical",
+        choices=["none", "exact", "approximate"],
+        default="none",
+        help="equivalence rules by which only one layout of every class is "
+        + "enumerated",
+    )
+    parser.add_argument(
+        "--engine",
+        type=alex.definitions.Engine,
+        choices=list(alex.definitions.Engine),
+        default=alex.definitions.Engine.PyCacheSim,
+        help="cache simulation engine to use",
+    )
+
+    args = parser.parse_args()
+
+    if args.listen is not None:
+        try:
+            alex.cli.utils.authKey(args.authkey)
+        except ValueError as e:
+            parser.error(str(e))
+
+    logging.basicConfig(
+        level=logging.DEBUG if (args.verbose or False) else logging.INFO,
+        format="%(message)s",
+        handlers=[alex.logging.LogHandler()],
+    )
+
+    log.info(
+        "Welcome to [bold]ALEX Search[/] version [bold yellow]%s[/]", alex.__version__
+    )
+
+    alex.cli.utils.selectDeposit(parser, args)
+
+    log.info(
+        "Access pattern is [bold yellow]%s[/] with dimension [bold yellow]%s[/]",
+        args.pattern,
+        ":".join(str(i) for i in args.bits),
+    )
+
+    log.info("Reading cache configuration from [bold magenta]%s[/]", args.cache)
+
+    with open(args.cache, "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
+
+    if args.trace_store is not None:
+        log.info("Using trace store in [bold magenta]%s[/]", args.trace_store)
+        trace_store = alex.trace.TraceStore(args.trace_store)
+        trace_store.get(args.pattern, args.bits, alignment=alex.search.ALIGNMENT)
+    else:
+        trace_store = None
+
+    log.info("Simulating caches with the [bold yellow]%s[/] engine", args.engine)
+
+    if args.canonical != "none":
+        ranges = alex.canonical.Canonicalizer(
+            args.pattern, hierarchy, approximate=args.canonical == "approximate"
+        ).ranges(sum(args.bits))
+    else:
+        ranges = []
+
+    size = alex.search.spaceSize(args.bits, ranges)
+
+    log.info("Search space has size [bold cyan]%d[/]", size)
+
+    if args.branch_and_bound:
+        bounds = alex.search.bounds(args.pattern, hierarchy)
+
+        if not bounds:
+            log.warning(
+                "No prefix bounds the fitness of [bold cyan]%s[/] on this "
+                + "hierarchy, so the search is exhaustive",
+                args.pattern,
+            )
+
+        for b in bounds:
+            log.info(
+                "Bounding prefixes of length [bold yellow]%d[/] with caches %s",
+                b.depth,
+                ", ".join("[yellow]%s[/]" % n for n in b.hierarchy.caches),
+            )
+    else:
+        bounds = []
+
+    if args.parallel is not None or args.listen is not None:
+        if args.listen is not None:
+            log.info("Running search on distributed workers")
+        else:
+            log.info("Running search in parallel")
+
+        executor = alex.cli.utils.makeExecutor(
+            args,
+            [alex.search.searchSubtree],
+            {
+                "hierarchy": hierarchy,
+                "pattern": args.pattern,
+                "trace_store": trace_store,
+                "engine": args.engine,
+            },
+        )
+    else:
+        log.info("Running search sequentially")
+        executor = None
+
+    split = args.split or 0
+
+    if args.split is None and executor is not None:
+        jobs = 4 * alex.batch.workerCount(executor)
+
+        while split < sum(args.bits) and (
+            sum(1 for _ in alex.search.prefixes(args.bits, split, ranges)) < jobs
+        ):
+            split += 1
+
+    log.info("Splitting the search at prefixes of length [bold yellow]%d[/]", split)
+
+    output = None if args.output is None else open(args.output, "w")
+
+    if output is not None:
+        log.info("Writing results to [bold magenta]%s[/]", args.output)
+        writer = csv.DictWriter(output, fieldnames=["individual", "fitness"])
+        writer.writeheader()
+
+    best = None
+    evaluated = 0
+    bounded = 0
+    pruned = 0
+    start = time.perf_counter()
+
+    try:
+        for r in alex.search.search(
+            args.bits,
+            hierarchy,
+            args.pattern,
+            executor=executor,
+            split=split,
+            bounds=bounds,
+            tolerance=args.tolerance,
+            ranges=ranges,
+            trace_store=trace_store,
+            engine=args.engine,
+        ):
+            evaluated += len(r.results)
+            bounded += r.bounded
+            pruned += r.pruned
+
+            for i, f in r.results:
+                if best is None or f > best[1]:
+                    best = (i, f)
+
+                if output is not None:
+                    writer.writerow(
+                        {"individual": ",".join(str(x) for x in i), "fitness": f}
+                    )
+
+            if output is not None:
+                output.flush()
+
+            log.debug(
+                "Prefix [bold blue]%s[/] done, evaluated [bold cyan]%d[/] of "
+                + "[bold cyan]%d[/] layouts, pruned [bold cyan]%d[/] of "
+                + "[bold cyan]%d[/] prefixes",
+                ",".join(str(x) for x in r.prefix),
+                evaluated,
+                size,
+                pruned,
+                bounded,
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+        if output is not None:
+            output.close()
+
+    log.info(
+        "Search complete, evaluated [bold cyan]%d[/] of [bold cyan]%d[/] layouts "
+        + "and pruned [bold cyan]%d[/] of [bold cyan]%d[/] bounded prefixes in "
+        + "[bold cyan]%.3f[/] sec",
+        evaluated,
+        size,
+        pruned,
+        bounded,
+        time.perf_counter() - start,
+    )
+
+    log.info(
+        f"Optimum is [bold blue]{','.join(str(i) for i in best[0])}[/] "
+        + f"([bold cyan]{best[1]}[/])"
+    )
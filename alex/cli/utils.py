@@ -1,2 +1,80 @@
+import logging
+import os
+
+import alex.core
+import alex.definitions
+import alex.distributed
+import alex.pool
+
+log = logging.getLogger(__name__)
+
+
 def parseBits(s):
     return [int(x) for x in s.split(":")]
+
+
+def parseFidelity(s):
+    name, _, fraction = s.partition(":")
+    return (name, float(fraction) if fraction else 0.5)
+
+
+def parseAddress(s):
+    host, _, port = s.rpartition(":")
+    return (host or "0.0.0.0", int(port))
+
+
+def authKey(s):
+    if s is None:
+        s = os.environ.get("ALEX_AUTHKEY")
+
+    if not s:
+        raise ValueError(
+            "Distributed evaluation requires a shared key, given with --authkey "
+            "or in the ALEX_AUTHKEY environment variable"
+        )
+
+    return s.encode()
+
+
+def addDistributedArguments(parser):
+    parser.add_argument(
+        "--listen",
+        type=parseAddress,
+        metavar="[HOST]:PORT",
+        help="hand out evaluations to alex-worker processes connecting to this "
+        "address instead of running them locally",
+    )
+    parser.add_argument(
+        "--authkey",
+        help="key shared with the workers (default: $ALEX_AUTHKEY)",
+    )
+
+
+def addDepositArguments(parser):
+    parser.add_argument(
+        "--deposit",
+        type=alex.definitions.Deposit,
+        choices=list(alex.definitions.Deposit),
+        help="implementation of the bit deposit in the kernels (default: "
+        "$ALEX_DEPOSIT, or the fastest one on this host)",
+    )
+
+
+def selectDeposit(parser, args):
+    try:
+        deposit, reason = alex.core.select(args.deposit)
+    except ValueError as e:
+        parser.error(str(e))
+
+    log.info("Using the [bold yellow]%s[/] deposit kernels (%s)", deposit, reason)
+
+
+def makeExecutor(args, fitness_funcs, fitness_func_kwargs):
+    if args.listen is not None:
+        return alex.distributed.DistributedExecutor(args.listen, authKey(args.authkey))
+
+    return alex.pool.WarmPool(
+        None if args.parallel is None or args.parallel < 0 else args.parallel,
+        fitness_funcs,
+        fitness_func_kwargs,
+    )
@@ -0,0 +1,81 @@
+import argparse
+import logging
+
+import alex
+import alex.cli.utils
+import alex.distributed
+import alex.logging
+
+log = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument(
+        "-c",
+        "--connect",
+        type=alex.cli.utils.parseAddress,
+        help="address of the coordinator, as host:port",
+        required=True,
+    )
+    parser.add_argument(
+        "-j",
+        "--slots",
+        type=int,
+        help="number of jobs to run at once (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--authkey",
+        help="key shared with the coordinator (default: $ALEX_AUTHKEY)",
+    )
+    parser.add_argument(
+        "--heartbeat",
+        type=float,
+        default=5.0,
+        help="seconds of silence after which a heartbeat is sent",
+    )
+    parser.add_argument(
+        "--retry",
+        type=float,
+        default=60.0,
+        help="seconds to keep trying to reach the coordinator",
+    )
+    alex.cli.utils.addDepositArguments(parser)
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        help="enable verbose output",
+        action="store_true",
+    )
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if (args.verbose or False) else logging.INFO,
+        format="%(message)s",
+        handlers=[alex.logging.LogHandler()],
+    )
+
+    log.info(
+        "Welcome to [bold]ALEX Worker[/] version [bold yellow]%s[/]", alex.__version__
+    )
+
+    alex.cli.utils.selectDeposit(parser, args)
+
+    try:
+        authkey = alex.cli.utils.authKey(args.authkey)
+    except ValueError as e:
+        parser.error(str(e))
+
+    return (
+        0
+        if alex.distributed.serve(
+            args.connect,
+            authkey,
+            slots=args.slots,
+            heartbeat=args.heartbeat,
+            retry=args.retry,
+        )
+        else 1
+    )
@@ -0,0 +1,107 @@
+import importlib
+import os
+import typing
+
+import alex.definitions
+
+ENVIRONMENT = "ALEX_DEPOSIT"
+
+_deposit: typing.Optional[alex.definitions.Deposit] = None
+_module = None
+
+
+def cpuInfo(path: str = "/proc/cpuinfo") -> typing.Dict[str, str]:
+    """Return the fields describing the first processor of the host."""
+    info = {}
+
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    break
+
+                key, _, value = line.partition(":")
+                info[key.strip()] = value.strip()
+    except OSError:
+        pass
+
+    return info
+
+
+def bestDeposit(
+    info: typing.Optional[typing.Dict[str, str]] = None,
+) -> alex.definitions.Deposit:
+    """Return the fastest implementation of the bit deposit on a host.
+
+    The BMI2 instruction is used where it exists, except on AMD processors
+    before Zen 3, which implement it in microcode taking a number of cycles
+    proportional to the number of bits in the mask; there, and where the
+    instruction does not exist, the lookup table is faster.
+    """
+    if info is None:
+        info = cpuInfo()
+
+    if "bmi2" not in info.get("flags", "").split():
+        return alex.definitions.Deposit.Table
+
+    if info.get("vendor_id") == "AuthenticAMD" and int(info.get("cpu family", 0)) < 25:
+        return alex.definitions.Deposit.Table
+
+    return alex.definitions.Deposit.Native
+
+
+def select(
+    deposit: typing.Optional[alex.definitions.Deposit] = None,
+) -> typing.Tuple[alex.definitions.Deposit, str]:
+    """Choose the variant of the extension to use, and why it was chosen.
+
+    An explicitly given variant takes precedence over one named in the
+    ALEX_DEPOSIT environment variable, which in turn takes precedence over
+    the best variant for the host. The choice is exported to the environment,
+    so that it holds in worker processes as well. Once the extension has been
+    loaded, a different variant can no longer be chosen.
+    """
+    global _deposit
+
+    if deposit is not None:
+        reason = "requested"
+    elif os.environ.get(ENVIRONMENT):
+        try:
+            deposit = alex.definitions.Deposit(os.environ[ENVIRONMENT])
+        except ValueError:
+            raise ValueError(
+                "$%s must be one of %s"
+                % (ENVIRONMENT, ", ".join(str(x) for x in alex.definitions.Deposit))
+            )
+
+        reason = "set in $" + ENVIRONMENT
+    else:
+        deposit = bestDeposit()
+        reason = "best for this host"
+
+    if _module is not None and deposit != _deposit:
+        raise RuntimeError(
+            "the extension is already loaded with the %s deposit" % _deposit
+        )
+
+    _deposit = alex.definitions.Deposit(deposit)
+    os.environ[ENVIRONMENT] = str(_deposit)
+
+    return _deposit, reason
+
+
+def module():
+    """Return the chosen variant of the extension, loading it if needed."""
+    global _module
+
+    if _module is None:
+        if _deposit is None:
+            select()
+
+        _module = importlib.import_module("__alex_core_%s" % _deposit)
+
+    return _module
+
+
+def __getattr__(name: str):
+    return getattr(module(), name)
@@ -14,6 +14,10 @@ class Pattern(str, enum.Enum):
     def __str__(self):
         return self.value
 
+    @property
+    def dimensions(self):
+        return 3 if self == Pattern.Himeno else 2
+
 
 class Precision(str, enum.Enum):
     Single = "single"
@@ -21,3 +25,20 @@ class Precision(str, enum.Enum):
 
     def __str__(self):
         return self.value
+
+
+class Engine(str, enum.Enum):
+    PyCacheSim = "pycachesim"
+    Native = "native"
+
+    def __str__(self):
+        return self.value
+
+
+class Deposit(str, enum.Enum):
+    Native = "pdep"
+    Table = "table"
+    Generic = "generic"
+
+    def __str__(self):
+        return self.value
@@ -0,0 +1,339 @@
+import collections
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing.connection
+import os
+import threading
+import time
+import typing
+
+log = logging.getLogger(__name__)
+
+Address = typing.Tuple[str, int]
+
+
+class _Job:
+    def __init__(self, id, fn, args, kwargs):
+        self.id = id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = concurrent.futures.Future()
+        self.attempts = 0
+
+
+class DistributedExecutor(concurrent.futures.Executor):
+    """Executor which runs jobs on worker processes connected over TCP.
+
+    Workers, started with alex-worker on any number of hosts, connect to the
+    coordinator and announce how many jobs they can run at once. Every worker
+    is served by its own thread, which keeps it supplied with jobs from a
+    shared queue and collects its results. Messages are pickled and the
+    connections are authenticated with a shared key, so workers and the
+    coordinator must trust each other.
+
+    Workers send heartbeats while they are busy; a worker which has been
+    silent for longer than the timeout, or whose connection breaks, is
+    considered lost, and its unfinished jobs are put back at the front of
+    the queue for other workers. A job which has been lost with more than the
+    given number of workers fails, so that a job which crashes its worker
+    cannot take down all of them. If a job completes more than once, only the
+    first result is used.
+    """
+
+    def __init__(
+        self,
+        address: Address,
+        authkey: bytes,
+        timeout: float = 30.0,
+        retries: int = 3,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self._listener = multiprocessing.connection.Listener(
+            address, family="AF_INET", backlog=64, authkey=authkey
+        )
+        self._ids = itertools.count()
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._shutdown = False
+        self._workers = {}
+        self._threads = []
+        self._outstanding = set()
+
+        self._acceptor = threading.Thread(target=self._accept, daemon=True)
+        self._acceptor.start()
+
+        log.info(
+            "Waiting for workers on [bold magenta]%s:%d[/]", *self._listener.address
+        )
+
+    @property
+    def address(self) -> Address:
+        return self._listener.address
+
+    @property
+    def capacity(self) -> int:
+        """Return the number of jobs the connected workers can run at once."""
+        with self._cond:
+            return sum(self._workers.values())
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new jobs after shutdown")
+
+            job = _Job(next(self._ids), fn, args, kwargs)
+            self._queue.append(job)
+            self._outstanding.add(job.future)
+            self._cond.notify_all()
+
+        job.future.add_done_callback(self._outstanding.discard)
+
+        return job.future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._cond:
+            if cancel_futures:
+                for job in self._queue:
+                    job.future.cancel()
+
+                self._queue.clear()
+
+            outstanding = list(self._outstanding)
+
+        if wait:
+            concurrent.futures.wait(outstanding)
+
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+
+        self._listener.close()
+
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError) as e:
+                with self._cond:
+                    if self._shutdown:
+                        return
+
+                log.warning("Rejected worker connection: %s", e)
+                continue
+
+            t = threading.Thread(target=self._serve, args=(conn,), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _serve(self, conn):
+        inflight = {}
+
+        try:
+            kind, name, slots = conn.recv()
+            assert kind == "hello"
+        except (EOFError, OSError, ValueError, AssertionError):
+            conn.close()
+            return
+
+        log.info(
+            "Worker [bold cyan]%s[/] connected with [bold cyan]%d[/] slots", name, slots
+        )
+
+        with self._cond:
+            self._workers[name] = slots
+
+        last = time.monotonic()
+
+        try:
+            while True:
+                with self._cond:
+                    if self._shutdown and not inflight:
+                        conn.send(("stop",))
+                        break
+
+                    while len(inflight) < slots and self._queue:
+                        job = self._queue.popleft()
+
+                        if job.future.done() or not (
+                            job.future.running()
+                            or job.future.set_running_or_notify_cancel()
+                        ):
+                            continue
+
+                        inflight[job.id] = job
+                        conn.send(("job", job.id, job.fn, job.args, job.kwargs))
+
+                if conn.poll(0.05):
+                    message = conn.recv()
+                    last = time.monotonic()
+
+                    if message[0] == "result":
+                        _, id, ok, value = message
+                        job = inflight.pop(id)
+
+                        with self._cond:
+                            if not job.future.done():
+                                if ok:
+                                    job.future.set_result(value)
+                                else:
+                                    job.future.set_exception(value)
+
+                            self._cond.notify_all()
+                elif time.monotonic() - last > self.timeout:
+                    log.warning("Worker [bold cyan]%s[/] timed out", name)
+                    break
+        except (EOFError, OSError) as e:
+            log.warning("Lost connection to worker [bold cyan]%s[/]: %s", name, e)
+        finally:
+            conn.close()
+
+            with self._cond:
+                del self._workers[name]
+
+                pending = []
+
+                for j in inflight.values():
+                    if j.future.done():
+                        continue
+
+                    j.attempts += 1
+
+                    if j.attempts > self.retries:
+                        j.future.set_exception(
+                            RuntimeError(
+                                f"Job was lost with {j.attempts} workers, giving up"
+                            )
+                        )
+                    else:
+                        pending.append(j)
+
+                if pending:
+                    log.warning(
+                        "Redispatching [bold cyan]%d[/] jobs of worker "
+                        + "[bold cyan]%s[/]",
+                        len(pending),
+                        name,
+                    )
+
+                self._queue.extendleft(reversed(pending))
+                self._cond.notify_all()
+
+
+def _call(fn, args, kwargs):
+    return fn(*args, **kwargs)
+
+
+def serve(
+    address: Address,
+    authkey: bytes,
+    slots: typing.Optional[int] = None,
+    heartbeat: float = 5.0,
+    retry: float = 60.0,
+):
+    """Run jobs for a coordinator until it tells the worker to stop.
+
+    Jobs are run in a pool of the given number of processes, and results are
+    sent back as soon as they are available. A heartbeat is sent whenever the
+    worker has been silent for the given interval, which tells the
+    coordinator that long jobs are still making progress.
+    """
+    slots = slots or os.cpu_count()
+    name = "{}:{}".format(os.uname().nodename, os.getpid())
+    deadline = time.monotonic() + retry
+
+    while True:
+        try:
+            conn = multiprocessing.connection.Client(
+                address, family="AF_INET", authkey=authkey
+            )
+            break
+        except ConnectionRefusedError:
+            if time.monotonic() > deadline:
+                raise
+
+            time.sleep(1.0)
+
+    log.info(
+        "Connected to coordinator [bold magenta]%s:%d[/] with [bold cyan]%d[/] slots",
+        *address,
+        slots,
+    )
+
+    lock = threading.Lock()
+    last = [time.monotonic()]
+    stopped = threading.Event()
+    broken = threading.Event()
+
+    def send(message):
+        with lock:
+            conn.send(message)
+            last[0] = time.monotonic()
+
+    def done(id, future):
+        try:
+            message = ("result", id, True, future.result())
+        except concurrent.futures.process.BrokenProcessPool:
+            # The job, or another one, has killed its process; the coordinator
+            # has to treat the whole worker as lost.
+            broken.set()
+            stopped.set()
+            return
+        except Exception as e:
+            message = ("result", id, False, e)
+
+        try:
+            send(message)
+        except OSError:
+            stopped.set()
+
+    def beat():
+        while not stopped.wait(heartbeat / 4):
+            if time.monotonic() - last[0] > heartbeat:
+                try:
+                    send(("heartbeat",))
+                except OSError:
+                    stopped.set()
+
+    send(("hello", name, slots))
+
+    threading.Thread(target=beat, daemon=True).start()
+
+    count = 0
+
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=slots)
+
+    try:
+        while not stopped.is_set():
+            if conn.poll(0.1):
+                message = conn.recv()
+
+                if message[0] == "stop":
+                    break
+
+                _, id, fn, args, kwargs = message
+                future = pool.submit(_call, fn, args, kwargs)
+                future.add_done_callback(lambda f, id=id: done(id, f))
+                count += 1
+    except (EOFError, OSError):
+        log.warning("Lost connection to coordinator")
+    except concurrent.futures.process.BrokenProcessPool:
+        broken.set()
+    finally:
+        stopped.set()
+        conn.close()
+        pool.shutdown(wait=not broken.is_set(), cancel_futures=True)
+
+    if broken.is_set():
+        log.error("Worker process pool broke down after [bold cyan]%d[/] jobs", count)
+        return False
+
+    log.info("Worker finished after [bold cyan]%d[/] jobs", count)
+
+    return True
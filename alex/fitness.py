@@ -1,15 +1,141 @@
+import typing
+
 import alex.definitions
 import alex.pattern
+import alex.reuse
+import alex.sampling
 import alex.schema
+import alex.trace
+import alex.utils
 
 
 def evalFitness(
-    individual, hierarchy: alex.schema.CacheHierarchy, pattern: alex.definitions.Pattern
+    individual,
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    sampling: typing.Optional[alex.sampling.Sampling] = None,
+    simulator=None,
+    alignment: typing.Optional[int] = None,
+):
+    if sampling is not None:
+        return alex.sampling.sampleFitness(
+            individual,
+            hierarchy,
+            pattern,
+            sampling,
+            trace_store=trace_store,
+            engine=engine,
+        ).fitness
+
+    simulator = alex.pattern.runPattern(
+        pattern,
+        hierarchy,
+        individual,
+        trace_store=trace_store,
+        engine=engine,
+        simulator=simulator,
+        alignment=alignment,
+    )
+
+    return fitnessFromStats(simulator.stats())
+
+
+def evalFitnessBatch(
+    individuals,
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    sampling: typing.Optional[alex.sampling.Sampling] = None,
+    simulator=None,
+) -> typing.List[float]:
+    """Evaluate a number of layouts at once, sharing one simulator."""
+    if sampling is not None:
+        return [
+            evalFitness(
+                i,
+                hierarchy,
+                pattern,
+                trace_store=trace_store,
+                engine=engine,
+                sampling=sampling,
+            )
+            for i in individuals
+        ]
+
+    return [
+        fitnessFromStats(x)
+        for x in alex.pattern.runPatternBatch(
+            pattern,
+            hierarchy,
+            individuals,
+            trace_store=trace_store,
+            engine=engine,
+            simulator=simulator,
+        )
+    ]
+
+
+def evalFitnessReduced(
+    individual,
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    shrink: int = 1,
+    **kwargs,
 ):
-    simulator = alex.pattern.runPattern(pattern, hierarchy, individual)
+    """Evaluate a layout on a smaller problem of the same shape.
+
+    The given number of most significant bits is removed from every
+    dimension, which makes the simulation several times cheaper while
+    keeping the order of the remaining bits.
+    """
+    return evalFitness(
+        alex.utils.shrinkLayout(individual, shrink), hierarchy, pattern, **kwargs
+    )
+
+
+def fitnessTerms(
+    stats: typing.List[typing.Dict[str, typing.Any]],
+) -> typing.Tuple[int, int]:
+    """Return the number of accesses and the number of cycles spent on them."""
+    l1 = stats[0]
+
+    cycles = sum(x["HIT_count"] * x["latency"] for x in stats)
+
+    return (l1["STORE_count"] + l1["LOAD_count"], cycles)
+
+
+def fitnessFromStats(stats: typing.List[typing.Dict[str, typing.Any]]) -> float:
+    accesses, cycles = fitnessTerms(stats)
+
+    return accesses / cycles
+
+
+def evalFitnessMulti(
+    individual,
+    hierarchies: typing.List[alex.schema.CacheHierarchy],
+    pattern: alex.definitions.Pattern,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+) -> typing.List[float]:
+    """Estimate the fitness of a layout on several LRU hierarchies at once.
+
+    The pattern is run only once to compute a reuse profile for all cache
+    geometries in the hierarchies, from which the fitness on each hierarchy
+    is then derived without any further simulation.
+    """
+    profile = alex.reuse.profilePattern(
+        pattern,
+        alex.reuse.geometries(hierarchies),
+        individual,
+        trace_store=trace_store,
+    )
 
-    l1 = simulator._sim.first_level
+    return [fitnessFromProfile(profile, h) for h in hierarchies]
 
-    cycles = sum(x.stats()["HIT_count"] * x.latency for x in simulator._sim.levels())
 
-    return (l1.backend.STORE_count + l1.backend.LOAD_count) / cycles
+def fitnessFromProfile(
+    profile: alex.reuse.ReuseProfile, hierarchy: alex.schema.CacheHierarchy
+) -> float:
+    return fitnessFromStats(alex.reuse.estimateStats(profile, hierarchy))
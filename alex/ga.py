@@ -1,13 +1,19 @@
 import collections
+import concurrent.futures
 import csv
+import itertools
 import logging
+import math
 import random
 import time
 
 import numpy
 import numpy.random
 
+import alex.batch
 import alex.signal
+import alex.strategies
+import alex.surrogate
 
 log = logging.getLogger(__name__)
 
@@ -23,6 +29,44 @@ GenerationRecord = collections.namedtuple(
         "dev_fitness",
         "species_size",
         "runtime",
+        "evaluations",
+        "cpu_seconds",
+        "fidelity",
+        "surrogate",
+    ],
+    defaults=[0, 0.0, (), None],
+)
+
+
+Budget = collections.namedtuple(
+    "Budget",
+    [
+        "evaluations",
+        "cpu_seconds",
+    ],
+    defaults=[None, None],
+)
+
+
+Fidelity = collections.namedtuple(
+    "Fidelity",
+    [
+        "name",
+        "fitness_func",
+        "fitness_func_kwargs",
+        "promote",
+    ],
+)
+
+
+FidelityRecord = collections.namedtuple(
+    "FidelityRecord",
+    [
+        "name",
+        "evaluated",
+        "promoted",
+        "threshold",
+        "cost",
     ],
 )
 
@@ -37,6 +81,14 @@ class GA:
         mutation_func,
         initial_population,
         fitness_func_kwargs=None,
+        fidelities=None,
+        fitness_store=None,
+        batch_func=None,
+        canonical=None,
+        strategy=None,
+        surrogate=None,
+        crossover_batch_func=None,
+        mutation_batch_func=None,
     ):
         self.generation = 0
         self.retained_count = retained_count
@@ -46,10 +98,35 @@ class GA:
         self.fitness_func_kwargs = fitness_func_kwargs or dict()
         self.crossover_func = crossover_func
         self.mutation_func = mutation_func
+        self.crossover_batch_func = crossover_batch_func
+        self.mutation_batch_func = mutation_batch_func
         self.generation_log = []
         self.last_generation_time = None
-
-        self.population = initial_population
+        self.fidelities = fidelities or []
+        self.fidelity_caches = [dict() for _ in self.fidelities]
+        self.fidelity_records = ()
+        self.fitness_store = fitness_store
+        self.batcher = None if batch_func is None else alex.batch.Batcher(batch_func)
+        self.canonical = canonical
+        self.strategy = strategy or alex.strategies.Generational()
+        self.evaluations = 0
+        self.cpu_seconds = 0.0
+        self.surrogate = surrogate
+        self.surrogate_record = None
+
+        self.population = self.canonicalize(initial_population)
+
+    def canonicalize(self, population):
+        """Replace individuals by the representatives of their classes.
+
+        All individuals are mapped to their representative as soon as they
+        are created, so that the fitness caches are keyed by representatives
+        and equivalent individuals are never evaluated twice.
+        """
+        if self.canonical is None:
+            return population
+
+        return [self.canonical(x) for x in population]
 
     def get_fitness(self, i):
         if i not in self.fitness_cache:
@@ -61,21 +138,183 @@ class GA:
         if population is None:
             population = self.population
 
-        todo = [x for x in population if x not in self.fitness_cache]
+        self.recall_fitness(population)
 
-        if executor is None:
-            results = map(
-                lambda i: self.fitness_func(i, **self.fitness_func_kwargs), todo
+        results = self.resolve_fitness(
+            executor,
+            population,
+            self.fitness_cache,
+            self.fitness_func,
+            self.fitness_func_kwargs,
+            self.batcher,
+        )
+
+        if self.fitness_store is not None:
+            self.fitness_store.insert(results)
+
+        self.evaluations += len(results)
+
+        return len(results)
+
+    def recall_fitness(self, population):
+        """Fill the fitness cache with the values known to the fitness store."""
+        if self.fitness_store is not None:
+            self.fitness_cache.update(
+                self.fitness_store.lookup(
+                    x for x in dict.fromkeys(population) if x not in self.fitness_cache
+                )
             )
+
+    def resolve_fitness(self, executor, population, cache, func, kwargs, batcher=None):
+        """Evaluate the individuals of which the fitness is not yet cached.
+
+        The time spent is added to the CPU time of the search, which, with an
+        executor, is the elapsed time multiplied by the number of workers that
+        were kept busy.
+        """
+        todo = list(dict.fromkeys(x for x in population if x not in cache))
+
+        t1 = time.perf_counter()
+        c1 = time.process_time()
+
+        if executor is not None and batcher is not None:
+            results = {}
+
+            for i, f in batcher.map(executor, todo, kwargs):
+                cache[i] = results[i] = f
         else:
-            futures = [
-                executor.submit(self.fitness_func, i, **self.fitness_func_kwargs)
-                for i in todo
-            ]
-            results = [f.result() for f in futures]
+            if executor is None:
+                results = map(lambda i: func(i, **kwargs), todo)
+            else:
+                futures = [executor.submit(func, i, **kwargs) for i in todo]
+                results = [f.result() for f in futures]
+
+            results = dict(zip(todo, results))
+            cache.update(results)
+
+        if executor is None:
+            self.cpu_seconds += time.process_time() - c1
+        elif todo:
+            self.cpu_seconds += (time.perf_counter() - t1) * min(
+                len(todo), alex.batch.workerCount(executor)
+            )
+
+        return results
+
+    def resolve_offspring_fitness(self, executor, offspring):
+        """Evaluate offspring through the ladder of fidelities.
+
+        This is successive halving: every candidate is scored at the cheapest
+        fidelity, and only the best fraction of them, but never fewer than the
+        number of retained individuals, is promoted to the next fidelity. The
+        survivors of the last fidelity are evaluated with the full fitness
+        function, and only they are eligible for the next population.
+        Candidates of which the full fitness is already known skip the ladder.
+        Returns every offspring which is eligible, including duplicates, so
+        that the population keeps its size when there are few distinct
+        offspring.
+        """
+        self.recall_fitness(offspring)
+
+        known = [x for x in dict.fromkeys(offspring) if x in self.fitness_cache]
+        candidates = [x for x in dict.fromkeys(offspring) if x not in known]
+        records = []
+
+        for f, cache in zip(self.fidelities, self.fidelity_caches):
+            t1 = time.perf_counter()
+            evaluated = len(
+                self.resolve_fitness(
+                    executor, candidates, cache, f.fitness_func, f.fitness_func_kwargs
+                )
+            )
+            ranked = sorted(candidates, key=lambda x: cache[x], reverse=True)
+            count = max(self.retained_count, math.ceil(f.promote * len(ranked)))
+            candidates = ranked[:count]
+            t2 = time.perf_counter()
+
+            records.append(
+                FidelityRecord(
+                    name=f.name,
+                    evaluated=evaluated,
+                    promoted=len(candidates),
+                    threshold=cache[candidates[-1]] if candidates else math.nan,
+                    cost=t2 - t1,
+                )
+            )
+
+        t1 = time.perf_counter()
+        evaluated = self.resolve_population_fitness(executor, candidates)
+        t2 = time.perf_counter()
+
+        records.append(
+            FidelityRecord(
+                name="full",
+                evaluated=evaluated,
+                promoted=len(candidates),
+                threshold=math.nan,
+                cost=t2 - t1,
+            )
+        )
+
+        self.fidelity_records = tuple(records)
+        eligible = set(known) | set(candidates)
+
+        return [x for x in offspring if x in eligible]
+
+    def propose_offspring(self):
+        """Propose the offspring of a generation, screened by the surrogate.
+
+        With a surrogate, the strategy proposes a pool of several times the
+        usual number of offspring. The usual offspring of which the fitness is
+        already known cost nothing and are kept, and the surrogate chooses
+        which of the unknown candidates in the pool take the places of the
+        others. Returns the offspring and the predicted fitness of the chosen
+        ones.
+        """
+        offspring = self.canonicalize(self.strategy.propose(self))
+
+        if self.surrogate is None:
+            return offspring, {}
+
+        self.surrogate.train(self.fitness_cache)
+
+        pool = list(
+            dict.fromkeys(
+                offspring
+                + [
+                    x
+                    for _ in range(self.surrogate.pool - 1)
+                    for x in self.canonicalize(self.strategy.propose(self))
+                ]
+            )
+        )
+
+        self.recall_fitness(pool)
+
+        known = [x for x in offspring if x in self.fitness_cache]
+        unknown = [x for x in pool if x not in self.fitness_cache]
+        chosen, predictions = self.surrogate.screen(
+            unknown, len(offspring) - len(known)
+        )
 
-        for i, f in zip(todo, results):
-            self.fitness_cache[i] = f
+        self.surrogate_record = alex.surrogate.SurrogateRecord(
+            scored=len(unknown) if predictions else 0,
+            rejected=len(unknown) - len(chosen) if predictions else 0,
+            accuracy=math.nan,
+        )
+
+        return known + chosen, predictions
+
+    def assess_surrogate(self, predictions):
+        """Record how well the predictions ranked the evaluated offspring."""
+        evaluated = [x for x in predictions if x in self.fitness_cache]
+
+        self.surrogate_record = self.surrogate_record._replace(
+            accuracy=alex.surrogate.rankCorrelation(
+                [predictions[x] for x in evaluated],
+                [self.fitness_cache[x] for x in evaluated],
+            )
+        )
 
     def process_generation(self, n, executor):
         self.resolve_population_fitness(executor)
@@ -97,6 +336,10 @@ class GA:
                 dev_fitness=numpy.std(fitnesses),
                 species_size=len(self.fitness_cache),
                 runtime=t2 - self.last_generation_time,
+                evaluations=self.evaluations,
+                cpu_seconds=self.cpu_seconds,
+                fidelity=self.fidelity_records,
+                surrogate=self.surrogate_record,
             )
         )
 
@@ -109,6 +352,23 @@ class GA:
         dlt_max = tg.max_fitness - lg.max_fitness if dlt else tg.max_fitness
         dlt_spc = tg.species_size - lg.species_size if dlt else tg.species_size
 
+        for r in tg.fidelity:
+            log.debug(
+                f"Fidelity [bold yellow]{r.name}[/] evaluated "
+                + f"[bold cyan]{r.evaluated:5d}[/], promoted "
+                + f"[bold cyan]{r.promoted:5d}[/] at [bold cyan]{r.threshold:8.6f}[/] "
+                + f"in [bold cyan]{r.cost:7.3f}[/] sec",
+                extra={"highlight": False},
+            )
+
+        if tg.surrogate is not None:
+            log.info(
+                f"Surrogate scored [bold cyan]{tg.surrogate.scored:5d}[/], "
+                + f"rejected [bold cyan]{tg.surrogate.rejected:5d}[/], rank "
+                + f"correlation [bold cyan]{tg.surrogate.accuracy:+6.3f}[/]",
+                extra={"highlight": False},
+            )
+
         log.info(
             f"Generation [bold cyan]{n:5d}[/], "
             + f"size [bold cyan]{tg.size:5d}[/]"
@@ -127,13 +387,70 @@ class GA:
             extra={"highlight": False},
         )
 
-    def run(self, generations=1, executor=None):
+    def get_state(self):
+        """Return everything needed to continue the evolution exactly."""
+        return {
+            "generation": self.generation,
+            "population": self.population,
+            "fitness_cache": self.fitness_cache,
+            "fidelity_caches": self.fidelity_caches,
+            "fidelity_records": self.fidelity_records,
+            "generation_log": self.generation_log,
+            "strategy": self.strategy,
+            "evaluations": self.evaluations,
+            "cpu_seconds": self.cpu_seconds,
+            "surrogate": self.surrogate,
+            "surrogate_record": self.surrogate_record,
+            "random": random.getstate(),
+            "numpy": numpy.random.get_state(),
+        }
+
+    def set_state(self, state):
+        self.generation = state["generation"]
+        self.population = state["population"]
+        self.fitness_cache = state["fitness_cache"]
+        self.fidelity_caches = state["fidelity_caches"]
+        self.fidelity_records = state["fidelity_records"]
+        self.generation_log = state["generation_log"]
+        self.strategy = state["strategy"]
+        self.evaluations = state["evaluations"]
+        self.cpu_seconds = state["cpu_seconds"]
+        self.surrogate = state["surrogate"]
+        self.surrogate_record = state["surrogate_record"]
+        random.setstate(state["random"])
+        numpy.random.set_state(state["numpy"])
+
+    def exhausted(self, budget):
+        """Return whether the search has used up the given budget."""
+        return budget is not None and (
+            (budget.evaluations is not None and self.evaluations >= budget.evaluations)
+            or (
+                budget.cpu_seconds is not None
+                and self.cpu_seconds >= budget.cpu_seconds
+            )
+        )
+
+    def run(self, generations=1, executor=None, checkpoint=None, budget=None):
+        """Evolve for a number of generations, or until the budget is used up.
+
+        Either limit may be None, in which case only the other one applies.
+        The budget is checked between generations, so the last generation
+        may exceed it.
+        """
         with alex.signal.CatchSigInt() as s:
-            for c in range(generations):
+            for c in (
+                range(generations) if generations is not None else itertools.count()
+            ):
                 if self.last_generation_time is None:
                     self.last_generation_time = time.perf_counter()
 
-                self.process_generation(self.generation, executor)
+                # A run which was interrupted and resumed has already
+                # processed its current generation.
+                if (
+                    not self.generation_log
+                    or self.generation_log[-1].generation != self.generation
+                ):
+                    self.process_generation(self.generation, executor)
 
                 self.last_generation_time = time.perf_counter()
 
@@ -141,28 +458,155 @@ class GA:
                     log.warning("Stopping evolutionary process due to interrupt")
                     break
 
-                offspring = [
-                    self.crossover_func(*random.sample(self.population, k=2))
-                    for _ in range(self.generated_count)
-                ]
+                if self.exhausted(budget):
+                    log.info(
+                        "Stopping evolutionary process after [bold cyan]%d[/] "
+                        + "evaluations and [bold cyan]%.1f[/] CPU seconds",
+                        self.evaluations,
+                        self.cpu_seconds,
+                    )
+                    break
 
-                mutated_offspring = [
-                    x if random.random() < 0.7 else self.mutation_func(x)
-                    for x in offspring
-                ]
+                offspring, predictions = self.propose_offspring()
 
-                self.resolve_population_fitness(executor, mutated_offspring)
+                if self.fidelities:
+                    candidates = self.resolve_offspring_fitness(executor, offspring)
+                else:
+                    self.resolve_population_fitness(executor, offspring)
+                    candidates = offspring
 
-                self.population = sorted(
-                    mutated_offspring, key=lambda x: self.get_fitness(x), reverse=True
-                )[: self.retained_count]
+                if self.surrogate is not None:
+                    self.assess_surrogate(predictions)
+
+                self.population = self.strategy.select(self, candidates)
 
                 self.generation += 1
 
+                if checkpoint is not None:
+                    checkpoint(self)
+
+            return s.valid()
+
+    def breed(self):
+        return self.canonicalize([self.strategy.breed(self)])[0]
+
+    def insert(self, i):
+        """Add an evaluated individual to the population, if it is fit enough."""
+        if i not in self.population:
+            self.population = sorted(
+                self.population + [i], key=lambda x: self.get_fitness(x), reverse=True
+            )[: self.retained_count]
+
+    def run_steady_state(
+        self, evaluations, executor=None, concurrency=1, checkpoint=None
+    ):
+        """Evolve without a barrier between generations.
+
+        Up to the given number of offspring are evaluated concurrently, and
+        every result is inserted into the population as soon as it is known,
+        after which a new offspring is bred from the population in its place.
+        Offspring which are already known or already being evaluated are not
+        submitted again. A generation is logged and checkpointed every time
+        that the number of settled offspring reaches a multiple of the number
+        of generated individuals. The time every offspring spends in the
+        executor is added to the CPU time of the search.
+        """
+        if self.fidelities:
+            raise ValueError("Steady-state evolution does not support fidelities")
+
+        if self.surrogate is not None:
+            raise ValueError("Steady-state evolution does not support a surrogate")
+
+        with alex.signal.CatchSigInt() as s:
+            if self.last_generation_time is None:
+                self.last_generation_time = time.perf_counter()
+
+            if (
+                not self.generation_log
+                or self.generation_log[-1].generation != self.generation
+            ):
+                self.process_generation(self.generation, executor)
+
+            self.last_generation_time = time.perf_counter()
+
+            futures = {}
+            submitted = {}
+            bred = 0
+            settled = 0
+
+            def settle():
+                nonlocal settled
+                settled += 1
+
+                if settled % self.generated_count == 0:
+                    self.generation += 1
+                    self.process_generation(self.generation, executor)
+                    self.last_generation_time = time.perf_counter()
+
+                    if checkpoint is not None:
+                        checkpoint(self)
+
+            while settled < evaluations:
+                while s.valid() and bred < evaluations and len(futures) < concurrency:
+                    i = self.breed()
+                    bred += 1
+
+                    self.recall_fitness([i])
+
+                    if i in self.fitness_cache:
+                        self.insert(i)
+                    elif i in futures.values():
+                        pass
+                    elif executor is None:
+                        self.resolve_population_fitness(None, [i])
+                        self.insert(i)
+                    else:
+                        f = executor.submit(
+                            self.fitness_func, i, **self.fitness_func_kwargs
+                        )
+                        futures[f] = i
+                        submitted[f] = time.perf_counter()
+                        continue
+
+                    settle()
+
+                if not futures:
+                    if not s.valid():
+                        log.warning("Stopping evolutionary process due to interrupt")
+                        break
+
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                for f in done:
+                    i = futures.pop(f)
+                    self.fitness_cache[i] = f.result()
+                    self.evaluations += 1
+                    self.cpu_seconds += time.perf_counter() - submitted.pop(f)
+
+                    if self.fitness_store is not None:
+                        self.fitness_store.insert({i: self.fitness_cache[i]})
+
+                    self.insert(i)
+                    settle()
+
     def results(self):
         return [(i, self.get_fitness(i)) for i in self.fitness_cache.keys()]
 
     def write_log(self, file):
+        """Write the generation log as CSV.
+
+        With a ladder of fidelities, every fidelity, as well as the full one,
+        adds columns with the number of evaluations, the number of promoted
+        individuals, the promotion threshold, and the time spent. With a
+        surrogate, columns are added with the number of candidates it scored
+        and rejected, and the rank correlation of its predictions.
+        """
+        levels = [f.name for f in self.fidelities] + ["full"] if self.fidelities else []
+
         writer = csv.DictWriter(
             file,
             fieldnames=[
@@ -174,12 +618,31 @@ class GA:
                 "dev_fitness",
                 "species_size",
                 "runtime",
-            ],
+                "evaluations",
+                "cpu_seconds",
+            ]
+            + [f"{n}_{k}" for n in levels for k in FidelityRecord._fields[1:]]
+            + (
+                [f"surrogate_{k}" for k in alex.surrogate.SurrogateRecord._fields]
+                if self.surrogate is not None
+                else []
+            ),
         )
         writer.writeheader()
 
         for i in self.generation_log:
-            writer.writerow(i._asdict())
+            row = i._asdict()
+
+            for r in row.pop("fidelity"):
+                row.update({f"{r.name}_{k}": v for k, v in r._asdict().items()})
+                del row[f"{r.name}_name"]
+
+            r = row.pop("surrogate")
+
+            if r is not None:
+                row.update({f"surrogate_{k}": v for k, v in r._asdict().items()})
+
+            writer.writerow(row)
 
     def write_ranking(self, file):
         writer = csv.DictWriter(file, fieldnames=["individual", "fitness"])
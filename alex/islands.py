@@ -0,0 +1,255 @@
+import concurrent.futures
+import csv
+import enum
+import logging
+import math
+import multiprocessing
+import queue
+import random
+import typing
+
+import numpy
+
+import alex.ga
+import alex.signal
+
+log = logging.getLogger(__name__)
+
+
+class Topology(str, enum.Enum):
+    Ring = "ring"
+    Complete = "complete"
+
+    def __str__(self):
+        return self.value
+
+
+def neighbours(topology: Topology, index: int, count: int) -> typing.List[int]:
+    """Return the islands to which an island sends its migrants."""
+    if count < 2:
+        return []
+    elif topology == Topology.Ring:
+        return [(index + 1) % count]
+    else:
+        return [j for j in range(count) if j != index]
+
+
+def _runIsland(
+    index,
+    ga_kwargs,
+    generations,
+    interval,
+    migrants,
+    targets,
+    seed,
+    workers,
+    inboxes,
+    results,
+):
+    random.seed(seed + index)
+    numpy.random.seed(seed + index)
+
+    # Migrants which are never picked up must not keep the island alive.
+    for q in inboxes:
+        q.cancel_join_thread()
+
+    ga = alex.ga.GA(**ga_kwargs)
+
+    if workers is None:
+        executor = None
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        with alex.signal.CatchSigInt() as s:
+            done = 0
+
+            while done < generations and s.valid():
+                count = min(interval, generations - done)
+
+                if not ga.run(generations=count, executor=executor):
+                    break
+
+                done += count
+
+                if done >= generations:
+                    break
+
+                best = sorted(
+                    ga.population, key=lambda x: ga.get_fitness(x), reverse=True
+                )[:migrants]
+
+                for j in targets:
+                    inboxes[j].put([(i, ga.get_fitness(i)) for i in best])
+
+                while True:
+                    try:
+                        arrivals = inboxes[index].get_nowait()
+                    except queue.Empty:
+                        break
+
+                    for i, f in arrivals:
+                        ga.fitness_cache.setdefault(i, f)
+                        ga.insert(i)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    results.put(
+        (
+            index,
+            {
+                "generation_log": ga.generation_log,
+                "fitness_cache": ga.fitness_cache,
+                "population": ga.population,
+            },
+        )
+    )
+
+
+class IslandModel:
+    """A number of genetic algorithms which evolve in separate processes.
+
+    Every island is an independent GA with its own pool of worker processes.
+    Every given number of generations, each island sends copies of its best
+    individuals, along with their fitness, to its neighbours in the topology,
+    and takes in the migrants which have arrived for it so far. Migration
+    does not wait for the other islands, so that a slow island never holds up
+    a fast one.
+    """
+
+    def __init__(
+        self,
+        islands: int,
+        ga_kwargs: dict,
+        interval: int = 5,
+        migrants: int = 2,
+        topology: Topology = Topology.Ring,
+        workers: typing.Optional[int] = None,
+        seed: int = 0,
+    ):
+        self.islands = islands
+        self.ga_kwargs = ga_kwargs
+        self.interval = interval
+        self.migrants = migrants
+        self.topology = topology
+        self.workers = workers
+        self.seed = seed
+
+        self.island_logs = [[] for _ in range(islands)]
+        self.populations = [[] for _ in range(islands)]
+        self.fitness_cache = {}
+
+    def run(self, generations=1):
+        context = multiprocessing.get_context()
+        inboxes = [context.Queue() for _ in range(self.islands)]
+        results = context.Queue()
+
+        processes = [
+            context.Process(
+                target=_runIsland,
+                args=(
+                    i,
+                    self.ga_kwargs,
+                    generations,
+                    self.interval,
+                    self.migrants,
+                    neighbours(self.topology, i, self.islands),
+                    self.seed,
+                    self.workers,
+                    inboxes,
+                    results,
+                ),
+            )
+            for i in range(self.islands)
+        ]
+
+        for p in processes:
+            p.start()
+
+        # On an interrupt, the islands stop after their current generation and
+        # send back what they have, which must still be collected.
+        with alex.signal.CatchSigInt():
+            for _ in processes:
+                i, r = results.get()
+
+                self.island_logs[i] = r["generation_log"]
+                self.populations[i] = r["population"]
+                self.fitness_cache.update(r["fitness_cache"])
+
+                log.info(
+                    "Island [bold cyan]%d[/] finished with best fitness "
+                    + "[bold cyan]%f[/]",
+                    i,
+                    max(r["fitness_cache"][x] for x in r["population"]),
+                )
+
+            for p in processes:
+                p.join()
+
+    def global_log(self) -> typing.List[alex.ga.GenerationRecord]:
+        """Combine the island logs into one record per generation."""
+        records = []
+
+        for g in range(max(len(x) for x in self.island_logs)):
+            r = [x[g] for x in self.island_logs if g < len(x)]
+            size = sum(x.size for x in r)
+            mean = sum(x.size * x.mean_fitness for x in r) / size
+            square = sum(x.size * (x.dev_fitness**2 + x.mean_fitness**2) for x in r)
+
+            records.append(
+                alex.ga.GenerationRecord(
+                    generation=g,
+                    size=size,
+                    min_fitness=min(x.min_fitness for x in r),
+                    max_fitness=max(x.max_fitness for x in r),
+                    mean_fitness=mean,
+                    dev_fitness=math.sqrt(max(0.0, square / size - mean**2)),
+                    species_size=sum(x.species_size for x in r),
+                    runtime=max(x.runtime for x in r),
+                    evaluations=sum(x.evaluations for x in r),
+                    cpu_seconds=sum(x.cpu_seconds for x in r),
+                )
+            )
+
+        return records
+
+    def results(self):
+        return list(self.fitness_cache.items())
+
+    def write_log(self, file):
+        """Write the log of every island, followed by the global log.
+
+        The island column holds the index of the island, or "all" for the
+        records which combine all islands.
+        """
+        fields = [
+            "generation",
+            "size",
+            "min_fitness",
+            "max_fitness",
+            "mean_fitness",
+            "dev_fitness",
+            "species_size",
+            "runtime",
+            "evaluations",
+            "cpu_seconds",
+        ]
+        writer = csv.DictWriter(file, fieldnames=["island"] + fields)
+        writer.writeheader()
+
+        for i, records in enumerate(self.island_logs):
+            for r in records:
+                writer.writerow({"island": i, **{k: getattr(r, k) for k in fields}})
+
+        for r in self.global_log():
+            writer.writerow({"island": "all", **{k: getattr(r, k) for k in fields}})
+
+    def write_ranking(self, file):
+        writer = csv.DictWriter(file, fieldnames=["individual", "fitness"])
+        writer.writeheader()
+
+        for i, v in sorted(
+            self.fitness_cache.items(), key=lambda x: x[1], reverse=True
+        ):
+            writer.writerow({"individual": ",".join(str(x) for x in i), "fitness": v})
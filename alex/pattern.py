@@ -1,9 +1,13 @@
 import typing
 
-import __alex_core
+import numpy
+
+import alex.core
 import alex.definitions
 import alex.schema
 import alex.simulator
+import alex.trace
+import alex.utils
 
 
 def runPattern(
@@ -11,23 +15,146 @@ def runPattern(
     hierarchy: alex.schema.CacheHierarchy,
     permutation: typing.List[int],
     precision: alex.definitions.Precision = alex.definitions.Precision.Single,
-) -> alex.simulator.CacheSimulator:
-    sim = alex.simulator.CacheSimulator(hierarchy)
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    simulator: typing.Union[
+        None, alex.simulator.CacheSimulator, alex.simulator.NativeCacheSimulator
+    ] = None,
+    alignment: typing.Optional[int] = None,
+) -> typing.Union[alex.simulator.CacheSimulator, alex.simulator.NativeCacheSimulator]:
+    """Run a pattern on a simulated cache hierarchy.
+
+    If a simulator of the hierarchy for the given engine is passed, it is
+    reset and reused instead of building a new one. If an alignment is given,
+    every array starts at a multiple of it instead of the default placement.
+    """
+    kwargs = {} if alignment is None else {"alignment": alignment}
+
+    if simulator is None:
+        sim = alex.simulator.makeSimulator(hierarchy, engine)
+    else:
+        sim = simulator
+        sim.reset()
+
+    if trace_store is not None:
+        trace = trace_store.get(
+            pattern, alex.utils.bitCounts(pattern, permutation), precision, alignment
+        )
 
-    getattr(__alex_core, "_{}_{}_sim_entry".format(str(pattern), str(precision)))(
-        sim._sim.first_level.backend, permutation
-    )
+        for addresses, ops, lengths in trace.replay(permutation):
+            sim.process(addresses, ops, lengths)
+    elif engine == alex.definitions.Engine.Native:
+        getattr(alex.core, "_{}_{}_native_entry".format(str(pattern), str(precision)))(
+            sim._sim, permutation, **kwargs
+        )
+    else:
+        getattr(alex.core, "_{}_{}_sim_entry".format(str(pattern), str(precision)))(
+            sim._sim.first_level.backend, permutation, **kwargs
+        )
 
-    sim._sim.force_write_back()
+    sim.force_write_back()
 
     return sim
 
 
+def runPatternBatch(
+    pattern: alex.definitions.Pattern,
+    hierarchy: alex.schema.CacheHierarchy,
+    permutations: typing.List[typing.List[int]],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    simulator: typing.Union[
+        None, alex.simulator.CacheSimulator, alex.simulator.NativeCacheSimulator
+    ] = None,
+) -> typing.List[typing.List[typing.Dict[str, typing.Any]]]:
+    """Run a pattern for a number of layouts, and return the statistics of each.
+
+    All layouts share a single simulator. With the native engine and without
+    a trace store, the loop over the layouts runs natively as well.
+    """
+    if simulator is None:
+        simulator = alex.simulator.makeSimulator(hierarchy, engine)
+
+    if trace_store is None and engine == alex.definitions.Engine.Native:
+        return [
+            simulator.convertStats(x)
+            for x in getattr(
+                alex.core,
+                "_{}_{}_native_batch_entry".format(str(pattern), str(precision)),
+            )(simulator._sim, permutations)
+        ]
+
+    return [
+        runPattern(
+            pattern,
+            hierarchy,
+            p,
+            precision=precision,
+            trace_store=trace_store,
+            engine=engine,
+            simulator=simulator,
+        ).stats()
+        for p in permutations
+    ]
+
+
 def runBenchPattern(
     pattern: alex.definitions.Pattern,
     permutation: typing.List[int],
     precision: alex.definitions.Precision = alex.definitions.Precision.Single,
-) -> alex.simulator.CacheSimulator:
+    threads: int = 1,
+    cpus: typing.Sequence[int] = (),
+) -> int:
+    """Benchmark a layout, and return the runtime in nanoseconds.
+
+    With more than one thread, the outer loop of the kernel is split between
+    the threads. Given CPUs, the threads are pinned to them in turn, even if
+    there is only one.
+    """
+    if threads == 1 and not cpus:
+        return getattr(
+            alex.core, "_{}_{}_bench_entry".format(str(pattern), str(precision))
+        )(permutation)
+
+    return getattr(
+        alex.core, "_{}_{}_bench_threaded_entry".format(str(pattern), str(precision))
+    )(permutation, threads, list(cpus))
+
+
+def runBenchPatternRepeated(
+    pattern: alex.definitions.Pattern,
+    permutation: typing.List[int],
+    repetitions: int,
+    warmup: int = 1,
+    huge_pages: str = "none",
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> numpy.ndarray:
+    """Benchmark a layout repeatedly without returning to Python in between.
+
+    The arrays are allocated once, page aligned, from a mapping which is
+    backed by normal pages, transparent huge pages or explicit huge pages,
+    and all pages are touched before the untimed warm-up runs. Returns the
+    runtime of every timed repetition in nanoseconds.
+    """
+    return getattr(
+        alex.core,
+        "_{}_{}_bench_repeated_entry".format(str(pattern), str(precision)),
+    )(permutation, repetitions, warmup, str(huge_pages))
+
+
+def runBenchPatternCounters(
+    pattern: alex.definitions.Pattern,
+    permutation: typing.List[int],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> typing.Dict[str, typing.Optional[int]]:
+    """Benchmark a layout, reading hardware counters around the timed region.
+
+    Returns the runtime in nanoseconds and the value of every counter in
+    `alex.benchmark.COUNTERS`, which is None if the counter is unsupported or
+    not permitted, e.g. by the kernel.perf_event_paranoid setting.
+    """
     return getattr(
-        __alex_core, "_{}_{}_bench_entry".format(str(pattern), str(precision))
+        alex.core,
+        "_{}_{}_bench_counters_entry".format(str(pattern), str(precision)),
     )(permutation)
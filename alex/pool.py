@@ -0,0 +1,135 @@
+import concurrent.futures
+import os
+import typing
+
+import alex.definitions
+import alex.simulator
+import alex.topology
+
+_fitness_func_kwargs = None
+_simulator = None
+
+
+def _initialize(fitness_func_kwargs):
+    global _fitness_func_kwargs, _simulator
+
+    _fitness_func_kwargs = fitness_func_kwargs
+
+    if "hierarchy" in fitness_func_kwargs:
+        _simulator = alex.simulator.makeSimulator(
+            fitness_func_kwargs["hierarchy"],
+            fitness_func_kwargs.get("engine", alex.definitions.Engine.PyCacheSim),
+        )
+
+
+def _evaluate(fn, args, kwargs):
+    return fn(*args, **_fitness_func_kwargs, **kwargs, simulator=_simulator)
+
+
+class WarmPool(concurrent.futures.ProcessPoolExecutor):
+    """Process pool whose workers keep the arguments of fitness functions.
+
+    The fixed keyword arguments of the fitness functions, such as the cache
+    hierarchy, are sent to every worker once when it starts, and every worker
+    builds a simulator of the hierarchy which it resets and reuses for every
+    evaluation. Submitting one of the fitness functions with the same fixed
+    arguments, compared by identity, then only sends the remaining arguments,
+    such as the layout, to the workers. Any other work is submitted as usual.
+    """
+
+    def __init__(
+        self,
+        max_workers: typing.Optional[int],
+        fitness_funcs: typing.Iterable[typing.Callable],
+        fitness_func_kwargs: typing.Dict[str, typing.Any],
+    ):
+        super().__init__(
+            max_workers=max_workers,
+            initializer=_initialize,
+            initargs=(fitness_func_kwargs,),
+        )
+
+        self.max_workers = max_workers or os.cpu_count()
+        self.fitness_funcs = list(fitness_funcs)
+        self.fitness_func_kwargs = fitness_func_kwargs
+
+    def submit(self, fn, /, *args, **kwargs):
+        if any(fn is f for f in self.fitness_funcs) and all(
+            k in kwargs and kwargs[k] is v for k, v in self.fitness_func_kwargs.items()
+        ):
+            return super().submit(
+                _evaluate,
+                fn,
+                args,
+                {k: v for k, v in kwargs.items() if k not in self.fitness_func_kwargs},
+            )
+
+        return super().submit(fn, *args, **kwargs)
+
+
+def _pin(cpu):
+    os.sched_setaffinity(0, {cpu})
+
+
+class PinnedPool:
+    """Worker processes which are each pinned to a CPU of their own.
+
+    Every worker runs one job at a time, and jobs are only handed to idle
+    workers, so that the placement of a job is known when it starts and no
+    two jobs ever share a CPU.
+    """
+
+    def __init__(self, cpus: typing.List[alex.topology.Cpu]):
+        self.workers = [
+            (
+                c,
+                concurrent.futures.ProcessPoolExecutor(
+                    1, initializer=_pin, initargs=(c.cpu,)
+                ),
+            )
+            for c in cpus
+        ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def shutdown(self):
+        for _, e in self.workers:
+            e.shutdown()
+
+    def map(
+        self, fn: typing.Callable, jobs: typing.Iterable[typing.Tuple]
+    ) -> typing.Iterator[typing.Tuple[typing.Tuple, alex.topology.Cpu, typing.Any]]:
+        """Run a function on every tuple of arguments, in order of completion.
+
+        Yields the arguments of every job with the CPU it ran on and its result.
+        """
+        jobs = iter(jobs)
+        idle = list(self.workers)
+        inflight = {}
+
+        while True:
+            while idle:
+                args = next(jobs, None)
+
+                if args is None:
+                    break
+
+                c, e = idle.pop(0)
+                inflight[e.submit(fn, *args)] = (args, c, e)
+
+            if not inflight:
+                break
+
+            done, _ = concurrent.futures.wait(
+                inflight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+
+            for f in done:
+                args, c, e = inflight.pop(f)
+                idle.append((c, e))
+
+                yield args, c, f.result()
@@ -0,0 +1,187 @@
+import typing
+
+import numpy
+
+import alex.core
+import alex.definitions
+import alex.schema
+import alex.trace
+import alex.utils
+
+Geometry = typing.Tuple[int, int, int]
+
+
+def levelChain(hierarchy: alex.schema.CacheHierarchy) -> typing.List[str]:
+    """Return the names of the caches on the load path, starting at L1."""
+    chain = []
+    p = hierarchy.memory.first
+
+    while p is not None:
+        chain.append(p)
+        p = hierarchy.caches[p].load_from
+
+    return chain
+
+
+def geometries(
+    hierarchies: typing.Iterable[alex.schema.CacheHierarchy],
+) -> typing.List[Geometry]:
+    """Return the (line, sets, depth) geometries needed to model hierarchies.
+
+    Caches which differ only in their number of ways share a geometry, the
+    depth of which is the largest number of ways among them.
+    """
+    depths: typing.Dict[typing.Tuple[int, int], int] = {}
+
+    for h in hierarchies:
+        for n in levelChain(h):
+            c = h.caches[n]
+            depths[(c.line, c.sets)] = max(depths.get((c.line, c.sets), 0), c.ways)
+
+    return sorted((line, sets, depth) for (line, sets), depth in depths.items())
+
+
+class ReuseProfile:
+    """LRU stack distance histograms of one pattern and layout.
+
+    For every cache geometry, the histograms count the line accesses of loads
+    and stores by their stack distance, i.e. the number of distinct lines in
+    the same set touched since the line was last used. An access hits in an
+    LRU cache of that geometry if and only if its distance is smaller than the
+    number of ways, so a single profile describes caches of any associativity
+    up to the depth of the geometry, or of any associativity at all if the
+    depth is zero.
+    """
+
+    def __init__(self, loads: int, stores: int, histograms):
+        self.loads = loads
+        self.stores = stores
+        self.histograms = {(h["line"], h["sets"]): h for h in histograms}
+
+    def geometries(self) -> typing.List[Geometry]:
+        return [(h["line"], h["sets"], h["depth"]) for h in self.histograms.values()]
+
+    def touches(self, line: int, sets: int, op: str) -> int:
+        h = self.histograms[(line, sets)]
+        return int(h[op].sum()) + h[op + "_cold"] + h[op + "_far"]
+
+    def misses(self, line: int, sets: int, ways: int, op: str) -> int:
+        h = self.histograms[(line, sets)]
+
+        if h["depth"] > 0 and ways > h["depth"]:
+            raise ValueError(
+                f"Profile of {sets} sets of {line} byte lines only covers up to "
+                f"{h['depth']} ways, not {ways}"
+            )
+
+        return int(h[op][ways:].sum()) + h[op + "_cold"] + h[op + "_far"]
+
+    def missRatioCurve(self, line: int, sets: int = 1) -> numpy.ndarray:
+        """Return the miss ratio for 0, 1, 2, ... ways of the given geometry.
+
+        With a single set and unbounded depth, this is the miss ratio curve of
+        a fully associative cache as a function of its capacity in lines.
+        """
+        h = self.histograms[(line, sets)]
+        n = max(len(h["load"]), len(h["store"]))
+
+        hist = numpy.zeros(n + 1, dtype=numpy.uint64)
+        hist[: len(h["load"])] += h["load"]
+        hist[: len(h["store"])] += h["store"]
+        hist[n] = sum(
+            h[f"{op}_{k}"] for op in ("load", "store") for k in ("cold", "far")
+        )
+
+        misses = hist[::-1].cumsum()[::-1]
+
+        return misses / misses[0]
+
+
+def profilePattern(
+    pattern: alex.definitions.Pattern,
+    geometries: typing.List[Geometry],
+    permutation: typing.Tuple[int, ...],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+) -> ReuseProfile:
+    sd = alex.core.StackDistance(geometries)
+
+    if trace_store is None:
+        getattr(alex.core, "_{}_{}_reuse_entry".format(str(pattern), str(precision)))(
+            sd, permutation
+        )
+    else:
+        trace = trace_store.get(
+            pattern, alex.utils.bitCounts(pattern, permutation), precision
+        )
+
+        for addresses, ops, lengths in trace.replay(permutation):
+            sd.process(addresses, ops, lengths)
+
+    return ReuseProfile(sd.loads(), sd.stores(), sd.histograms())
+
+
+def estimateStats(
+    profile: ReuseProfile, hierarchy: alex.schema.CacheHierarchy
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """Estimate the simulator statistics of a hierarchy from a reuse profile.
+
+    Every level is modelled as an inclusive LRU cache which sees the line
+    misses of the level above it. Write-backs of dirty lines are ignored, as
+    is the fact that pycachesim does not promote lines on store hits, so the
+    result is an approximation of what the simulators report; it is exact for
+    the first level loads of a hierarchy without stores.
+    """
+    stats = []
+    previous = None
+
+    for i, n in enumerate(levelChain(hierarchy)):
+        c = hierarchy.caches[n]
+        misses = sum(
+            profile.misses(c.line, c.sets, c.ways, op) for op in ("load", "store")
+        )
+
+        if previous is not None:
+            misses = min(misses, previous)
+
+        if i == 0:
+            load_misses = profile.misses(c.line, c.sets, c.ways, "load")
+            store_misses = profile.misses(c.line, c.sets, c.ways, "store")
+
+            stats.append(
+                {
+                    "name": n,
+                    "LOAD_count": profile.loads
+                    + (store_misses if c.write_allocate else 0),
+                    "STORE_count": profile.stores,
+                    "HIT_count": profile.touches(c.line, c.sets, "load") - load_misses,
+                    "MISS_count": misses,
+                    "latency": c.latency,
+                }
+            )
+        else:
+            stats.append(
+                {
+                    "name": n,
+                    "LOAD_count": previous,
+                    "STORE_count": 0,
+                    "HIT_count": previous - misses,
+                    "MISS_count": misses,
+                    "latency": c.latency,
+                }
+            )
+
+        previous = misses
+
+    stats.append(
+        {
+            "name": "MEM",
+            "LOAD_count": previous,
+            "STORE_count": 0,
+            "HIT_count": previous,
+            "MISS_count": 0,
+            "latency": hierarchy.memory.latency,
+        }
+    )
+
+    return stats
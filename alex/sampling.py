@@ -0,0 +1,207 @@
+import enum
+import math
+import random
+import statistics
+import typing
+
+import pydantic
+
+import alex.core
+import alex.definitions
+import alex.fitness
+import alex.schema
+import alex.simulator
+import alex.trace
+import alex.utils
+
+
+class SamplingMethod(str, enum.Enum):
+    Sets = "sets"
+    Intervals = "intervals"
+
+    def __str__(self):
+        return self.value
+
+
+class Sampling(pydantic.BaseModel):
+    """Parameters of a sampled simulation.
+
+    With set sampling, only the accesses to a random fraction of the cache
+    sets are simulated, split into a number of independent groups. With
+    interval sampling, a number of evenly spaced intervals of the trace which
+    together cover a fraction of it are simulated; as the trace follows the
+    program order, these correspond to ranges of outer loop iterations. Each
+    interval starts from a cold cache which is first warmed up by replaying
+    the accesses just before the interval, unless the previous interval ends
+    within the warm-up window, in which case the simulation just carries on.
+    """
+
+    method: SamplingMethod = SamplingMethod.Sets
+    fraction: float = 0.1
+    groups: int = 8
+    warmup: int = 1 << 16
+    seed: int = 0
+    confidence: float = 0.95
+
+    class Config:
+        frozen = True
+
+
+class Estimate(typing.NamedTuple):
+    fitness: float
+    low: float
+    high: float
+    fraction: float
+
+
+def _difference(after, before):
+    return [
+        {k: (v - b[k] if k not in ("name", "latency") else v) for k, v in a.items()}
+        for a, b in zip(after, before)
+    ]
+
+
+def _ratioEstimate(
+    terms: typing.List[typing.Tuple[float, float]], fraction: float, confidence: float
+) -> Estimate:
+    """Combine the fitness terms of sampled groups into a ratio estimate.
+
+    The confidence interval follows from the usual linearised variance of a
+    ratio estimator over the groups, with a finite population correction and
+    a normal approximation of its distribution.
+    """
+    accesses = sum(a for a, _ in terms)
+    cycles = sum(c for _, c in terms)
+    fitness = accesses / cycles
+
+    if len(terms) < 2 or fraction >= 1.0:
+        return Estimate(fitness, fitness, fitness, min(fraction, 1.0))
+
+    mean = cycles / len(terms)
+    variance = (
+        (1.0 - fraction)
+        * sum((a - fitness * c) ** 2 for a, c in terms)
+        / ((len(terms) - 1) * len(terms) * mean**2)
+    )
+
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    delta = z * math.sqrt(variance)
+
+    return Estimate(fitness, fitness - delta, fitness + delta, fraction)
+
+
+def _sampleSets(pattern, individual, hierarchy, sampling, precision, trace_store):
+    lines = {c.line for c in hierarchy.caches.values()}
+    base = min(c.sets for c in hierarchy.caches.values())
+
+    if len(lines) != 1 or any(c.sets % base for c in hierarchy.caches.values()):
+        raise ValueError(
+            "Set sampling requires a single line size and set counts which are "
+            "all multiples of the smallest one"
+        )
+
+    count = min(base, max(sampling.groups, math.ceil(sampling.fraction * base)))
+    groups = min(sampling.groups, count)
+
+    group_of = [-1] * base
+
+    for i, s in enumerate(random.Random(sampling.seed).sample(range(base), count)):
+        group_of[s] = i % groups
+
+    sims = [alex.simulator.NativeCacheSimulator(hierarchy) for _ in range(groups)]
+    sampler = alex.core.SetSampler(
+        [x._sim for x in sims], (lines.pop() - 1).bit_length(), group_of
+    )
+
+    if trace_store is None:
+        getattr(alex.core, "_{}_{}_sampled_entry".format(str(pattern), str(precision)))(
+            sampler, individual
+        )
+    else:
+        trace = trace_store.get(
+            pattern, alex.utils.bitCounts(pattern, individual), precision
+        )
+
+        for buffers in trace.replay(individual):
+            sampler.process(*buffers)
+
+    terms = []
+
+    for g, sim in enumerate(sims):
+        sim.force_write_back()
+        accesses, cycles = alex.fitness.fitnessTerms(sim.stats())
+        terms.append((accesses - sampler.extra(g, 0) - sampler.extra(g, 1), cycles))
+
+    return terms, count / base
+
+
+def _sampleIntervals(
+    pattern, individual, hierarchy, sampling, precision, engine, trace_store
+):
+    if trace_store is None:
+        raise ValueError("Interval sampling requires a trace store")
+
+    trace = trace_store.get(
+        pattern, alex.utils.bitCounts(pattern, individual), precision
+    )
+
+    total = len(trace)
+    stride = total / sampling.groups
+    length = max(1, min(int(stride), int(sampling.fraction * total / sampling.groups)))
+
+    offset = random.Random(sampling.seed).uniform(0, stride - length)
+
+    terms = []
+    sim = None
+    position = 0
+
+    for k in range(sampling.groups):
+        start = int(offset + k * stride)
+
+        if sim is None or start - sampling.warmup > position:
+            sim = alex.simulator.makeSimulator(hierarchy, engine)
+            position = max(0, start - sampling.warmup)
+
+        for buffers in trace.replay(individual, position, start):
+            sim.process(*buffers)
+
+        before = sim.stats()
+
+        for buffers in trace.replay(individual, start, start + length):
+            sim.process(*buffers)
+
+        position = start + length
+
+        if position >= total:
+            sim.force_write_back()
+
+        terms.append(alex.fitness.fitnessTerms(_difference(sim.stats(), before)))
+
+    return terms, sampling.groups * length / total
+
+
+def sampleFitness(
+    individual,
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    sampling: Sampling,
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> Estimate:
+    """Estimate the fitness of a layout from a sampled simulation.
+
+    Set sampling always runs on the native engine, and replays the trace if
+    a trace store is given. Interval sampling needs a trace store to jump to
+    the intervals, and uses the given engine.
+    """
+    if sampling.method == SamplingMethod.Sets:
+        terms, fraction = _sampleSets(
+            pattern, individual, hierarchy, sampling, precision, trace_store
+        )
+    else:
+        terms, fraction = _sampleIntervals(
+            pattern, individual, hierarchy, sampling, precision, engine, trace_store
+        )
+
+    return _ratioEstimate(terms, fraction, sampling.confidence)
@@ -48,6 +48,37 @@ class CacheHierarchy(pydantic.BaseModel):
     def fromYamlFile(f):
         return CacheHierarchy(**yaml.safe_load(f))
 
+    def firstLevel(self) -> "CacheHierarchy":
+        """Return a hierarchy of only the first level, backed by main memory."""
+        return self.firstLevels(1)
+
+    def firstLevels(self, count: int) -> "CacheHierarchy":
+        """Return a hierarchy of the given number of levels, backed by memory.
+
+        The levels are those on the load path, starting at the first level.
+        """
+        chain = [self.memory.first]
+
+        while len(chain) < count and self.caches[chain[-1]].load_from is not None:
+            chain.append(self.caches[chain[-1]].load_from)
+
+        return CacheHierarchy(
+            caches={
+                n: self.caches[n].copy(
+                    update={
+                        k: (
+                            getattr(self.caches[n], k)
+                            if getattr(self.caches[n], k) in chain
+                            else None
+                        )
+                        for k in ("load_from", "store_to", "victims_to")
+                    }
+                )
+                for n in chain
+            },
+            memory=self.memory.copy(update={"last": chain[-1]}),
+        )
+
 
 class BenchmarkInputElement(pydantic.BaseModel):
     pattern: alex.definitions.Pattern
@@ -63,6 +94,20 @@ class BenchmarkOutput(pydantic.BaseModel):
     fitness: float
     runtime: float
     runtime_dev: float
+    runtime_median: typing.Optional[float] = None
+    runtime_low: typing.Optional[float] = None
+    runtime_high: typing.Optional[float] = None
+    trials: typing.Optional[int] = None
+    specialized: bool = False
+    threads: int = 1
+    cycles: typing.Optional[float] = None
+    l1d_misses: typing.Optional[float] = None
+    llc_misses: typing.Optional[float] = None
+    dtlb_misses: typing.Optional[float] = None
+    cpu: typing.Optional[int] = None
+    core: typing.Optional[int] = None
+    cache: typing.Optional[int] = None
+    node: typing.Optional[int] = None
 
     class Config:
         frozen = True
@@ -0,0 +1,347 @@
+import concurrent.futures
+import functools
+import logging
+import typing
+
+import alex.batch
+import alex.canonical
+import alex.definitions
+import alex.fitness
+import alex.reuse
+import alex.schema
+import alex.trace
+
+log = logging.getLogger(__name__)
+
+# Searches place every array at a multiple of this many bytes, so that every
+# array starts on a line boundary and the bounds below are sound.
+ALIGNMENT = 1 << 32
+
+
+class Bound(typing.NamedTuple):
+    """Hierarchy which bounds the fitness of all layouts sharing a prefix.
+
+    The bounding hierarchy consists of the first levels of the real one, and
+    the set of every access in those levels only depends on the dimensions at
+    the given number of lowest positions of the layout. Every access which
+    misses in all of them is charged the latency of the fastest level below.
+
+    The bound is computed from a single completion of the prefix, which is
+    only sound if whether two accesses share a line does not depend on the
+    completion either. Then the bounded levels see the same accesses for all
+    layouts with the prefix, up to a renaming of their lines, and the fitness
+    in the bounding hierarchy is at least the real fitness of every such
+    layout. This holds if every array starts on a line boundary and all
+    elements are powers of two in size, so that no element straddles two
+    lines, which the bounds function checks for the placement of the arrays
+    used by searches.
+    """
+
+    depth: int
+    hierarchy: alex.schema.CacheHierarchy
+
+
+class SubtreeResult(typing.NamedTuple):
+    prefix: typing.Tuple[int, ...]
+    results: typing.List[typing.Tuple[typing.Tuple[int, ...], float]]
+    bounded: int
+    pruned: int
+
+
+def arrayPlacement(
+    pattern: alex.definitions.Pattern,
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+    alignment: typing.Optional[int] = None,
+) -> typing.List[typing.Tuple[int, int]]:
+    """Return the base address and element size of every array of a pattern.
+
+    The arrays are placed exactly as the simulated pointers place them with
+    the given alignment, which is read from a trace of the smallest instance
+    of the pattern.
+    """
+    _, _, arrays = alex.trace.recordTrace(
+        pattern, [1] * pattern.dimensions, precision, alignment
+    )
+
+    return [(int(base), int(size)) for base, size in arrays]
+
+
+def linesFollowPrefix(
+    arrays: typing.List[typing.Tuple[int, int]],
+    caches: typing.Iterable[alex.schema.Cache],
+) -> bool:
+    """Return whether accesses share lines independently of the completion.
+
+    An element which straddles two lines shares one of them with the
+    elements just below or above it in memory, and which elements these are
+    depends on all positions of the layout. Elements straddle no line if
+    every array starts on a line boundary, and the elements are powers of two
+    in size and no larger than a line.
+    """
+    line = max(c.line for c in caches)
+
+    return all(
+        base % line == 0 and size & (size - 1) == 0 and size <= line
+        for base, size in arrays
+    )
+
+
+def bounds(
+    pattern: alex.definitions.Pattern,
+    hierarchy: alex.schema.CacheHierarchy,
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> typing.List[Bound]:
+    """Return the bounding hierarchies of a hierarchy, from shallow to deep.
+
+    Only levels of which the line size and the number of sets are powers of
+    two, and all levels above which are too, can be bounded by a prefix, and
+    only if the arrays of the pattern are placed such that lines are shared
+    independently of the completion of the prefix. By default, the simulated
+    pointers place arrays at multiples of 2^32 - 1 bytes, where this does not
+    hold, so the bounds only apply to searches, which align the arrays.
+    """
+    chain = alex.reuse.levelChain(hierarchy)
+    arrays = arrayPlacement(pattern, precision, ALIGNMENT)
+    result = []
+
+    for n in range(1, len(chain)):
+        levels = [hierarchy.caches[c] for c in chain[:n]]
+
+        if any(c.sets & (c.sets - 1) or c.line & (c.line - 1) for c in levels):
+            break
+
+        if not linesFollowPrefix(arrays, levels):
+            break
+
+        truncated = hierarchy.firstLevels(n)
+        latency = min(
+            [hierarchy.caches[c].latency for c in chain[n:]]
+            + [hierarchy.memory.latency]
+        )
+
+        result.append(
+            Bound(
+                depth=alex.canonical.indexBits(pattern, levels, precision),
+                hierarchy=truncated.copy(
+                    update={
+                        "memory": truncated.memory.copy(update={"latency": latency})
+                    }
+                ),
+            )
+        )
+
+    return result
+
+
+def _allowed(prefix, counts, ranges):
+    """Return the dimensions which may follow a prefix.
+
+    Within a range of positions of which the order does not matter, only
+    layouts in which the dimensions are sorted are enumerated.
+    """
+    p = len(prefix)
+    ordered = any(b < p < e for b, e in ranges)
+
+    return [
+        d
+        for d in range(len(counts))
+        if counts[d] > 0 and not (ordered and d < prefix[-1])
+    ]
+
+
+def _complete(prefix, counts):
+    return tuple(prefix) + tuple(
+        d for d in range(len(counts)) for _ in range(counts[d])
+    )
+
+
+def _remaining(bits, prefix):
+    return [b - sum(1 for x in prefix if x == d) for d, b in enumerate(bits)]
+
+
+def prefixes(
+    bits: typing.List[int],
+    depth: int,
+    ranges: typing.List[typing.Tuple[int, int]] = (),
+) -> typing.Iterator[typing.Tuple[int, ...]]:
+    """Enumerate the distinct prefixes of the given length, in order."""
+
+    def walk(prefix, counts):
+        if len(prefix) == depth or not any(counts):
+            yield tuple(prefix)
+            return
+
+        for d in _allowed(prefix, counts, ranges):
+            counts[d] -= 1
+            yield from walk(prefix + [d], counts)
+            counts[d] += 1
+
+    yield from walk([], list(bits))
+
+
+def searchSubtree(
+    prefix: typing.Tuple[int, ...],
+    bits: typing.List[int],
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    bounds: typing.List[Bound] = (),
+    incumbent: float = 0.0,
+    tolerance: float = 0.0,
+    ranges: typing.List[typing.Tuple[int, int]] = (),
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+    simulator=None,
+) -> SubtreeResult:
+    """Evaluate all layouts starting with a prefix, depth first.
+
+    Whenever the prefix grows to the depth of a bound, the fitness of the
+    prefix in the bounding hierarchy is computed, and the subtree is skipped
+    if even that is lower than the best fitness found so far, reduced by the
+    given relative tolerance. Without bounds, this is an exhaustive search.
+    All layouts are simulated with the arrays placed at multiples of the
+    search alignment, so their fitness may differ slightly from that of the
+    default placement.
+    """
+    depths = {b.depth: b for b in bounds}
+    results = []
+    bounded = 0
+    pruned = 0
+
+    def walk(prefix, counts):
+        nonlocal incumbent, bounded, pruned
+
+        if not any(counts):
+            fitness = alex.fitness.evalFitness(
+                tuple(prefix),
+                hierarchy,
+                pattern,
+                trace_store=trace_store,
+                engine=engine,
+                simulator=simulator,
+                alignment=ALIGNMENT,
+            )
+            results.append((tuple(prefix), fitness))
+            incumbent = max(incumbent, fitness)
+            return
+
+        if incumbent > 0.0 and len(prefix) in depths:
+            bounded += 1
+            bound = alex.fitness.evalFitness(
+                _complete(prefix, counts),
+                depths[len(prefix)].hierarchy,
+                pattern,
+                trace_store=trace_store,
+                engine=engine,
+                alignment=ALIGNMENT,
+            )
+
+            if bound < incumbent * (1.0 - tolerance):
+                pruned += 1
+                return
+
+        for d in _allowed(prefix, counts, ranges):
+            counts[d] -= 1
+            walk(prefix + [d], counts)
+            counts[d] += 1
+
+    walk(list(prefix), _remaining(bits, prefix))
+
+    return SubtreeResult(tuple(prefix), results, bounded, pruned)
+
+
+def search(
+    bits: typing.List[int],
+    hierarchy: alex.schema.CacheHierarchy,
+    pattern: alex.definitions.Pattern,
+    executor=None,
+    split: int = 0,
+    bounds: typing.List[Bound] = (),
+    tolerance: float = 0.0,
+    ranges: typing.List[typing.Tuple[int, int]] = (),
+    trace_store: typing.Optional[alex.trace.TraceStore] = None,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+) -> typing.Iterator[SubtreeResult]:
+    """Search the space of layouts, yielding the results of every subtree.
+
+    The space is split into the subtrees of all prefixes of the given length,
+    which are searched in parallel if an executor is given. Every subtree is
+    searched with the best fitness known at the time it is submitted, so the
+    results of early subtrees help to prune later ones.
+    """
+    kwargs = {
+        "hierarchy": hierarchy,
+        "pattern": pattern,
+        "trace_store": trace_store,
+        "engine": engine,
+    }
+    best = 0.0
+
+    if executor is None:
+        for p in prefixes(bits, split, ranges):
+            r = searchSubtree(
+                p,
+                bits,
+                bounds=bounds,
+                incumbent=best,
+                tolerance=tolerance,
+                ranges=ranges,
+                **kwargs,
+            )
+            best = max([best] + [x for _, x in r.results])
+            yield r
+
+        return
+
+    workers = alex.batch.workerCount(executor)
+    todo = prefixes(bits, split, ranges)
+    inflight = set()
+
+    while True:
+        while len(inflight) < 2 * workers:
+            p = next(todo, None)
+
+            if p is None:
+                break
+
+            inflight.add(
+                executor.submit(
+                    searchSubtree,
+                    p,
+                    bits,
+                    bounds=bounds,
+                    incumbent=best,
+                    tolerance=tolerance,
+                    ranges=ranges,
+                    **kwargs,
+                )
+            )
+
+        if not inflight:
+            break
+
+        done, inflight = concurrent.futures.wait(
+            inflight, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+
+        for f in done:
+            r = f.result()
+            best = max([best] + [x for _, x in r.results])
+            yield r
+
+
+def spaceSize(
+    bits: typing.List[int], ranges: typing.List[typing.Tuple[int, int]] = ()
+) -> int:
+    """Return the number of distinct layouts which a search enumerates."""
+
+    @functools.lru_cache(maxsize=None)
+    def count(counts, last):
+        if not any(counts):
+            return 1
+
+        return sum(
+            count(counts[:d] + (counts[d] - 1,) + counts[d + 1 :], d)
+            for d in _allowed([last] * (sum(bits) - sum(counts)), counts, ranges)
+        )
+
+    return count(tuple(bits), None)
@@ -1,8 +1,44 @@
+import typing
+
 import cachesim
 
+import alex.core
+import alex.definitions
 import alex.schema
 
 
+def levelOrder(hierarchy: alex.schema.CacheHierarchy) -> typing.List[str]:
+    """Return the cache names in the order in which pycachesim visits them."""
+    order = []
+    p = hierarchy.memory.first
+
+    while p is not None:
+        c = hierarchy.caches[p]
+        order.append(p)
+
+        if c.victims_to is not None and c.victims_to != c.load_from:
+            order.append(c.victims_to)
+
+        if (
+            c.store_to is not None
+            and c.store_to != c.load_from
+            and c.store_to != c.victims_to
+        ):
+            order.append(c.store_to)
+
+        p = c.load_from
+
+    return order
+
+
+def _makeHierarchy(levels, first, order):
+    return alex.core.Hierarchy(levels, first, order)
+
+
+def _replay(cache, addresses, ops, lengths):
+    alex.core._replay_sim_entry(cache, addresses, ops, lengths)
+
+
 class CacheSimulator:
     def __init__(self, hierarchy: alex.schema.CacheHierarchy):
         caches = {}
@@ -38,3 +74,117 @@ class CacheSimulator:
         memory.store_from(caches[hierarchy.memory.last])
 
         self._sim = cachesim.CacheSimulator(caches[hierarchy.memory.first], memory)
+
+    def process(self, addresses, ops, lengths):
+        _replay(self._sim.first_level.backend, addresses, ops, lengths)
+
+    def force_write_back(self):
+        self._sim.force_write_back()
+
+    def reset(self):
+        """Invalidate all cached lines and reset the statistics.
+
+        Dirty lines are not written back first, so this should only be used
+        after force_write_back.
+        """
+        self._sim.mark_all_invalid()
+
+    def stats(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        return [dict(x.stats(), latency=x.latency) for x in self._sim.levels()]
+
+
+class NativeCacheSimulator:
+    """Cache hierarchy simulated by the native engine in the core module.
+
+    This produces exactly the same statistics as the pycachesim-based
+    simulator, but accepts whole buffers of accesses at a time.
+    """
+
+    def __init__(self, hierarchy: alex.schema.CacheHierarchy):
+        for n, d in hierarchy.caches.items():
+            if d.write_combining:
+                raise ValueError(
+                    f"Cache {n} uses write combining, which the native engine "
+                    "does not support"
+                )
+
+        names = list(hierarchy.caches.keys())
+
+        def index(n):
+            return -1 if n is None else names.index(n)
+
+        self.order = levelOrder(hierarchy)
+        self.hierarchy = hierarchy
+
+        self._sim = _makeHierarchy(
+            [
+                (
+                    n,
+                    d.sets,
+                    d.ways,
+                    d.line,
+                    d.write_back,
+                    d.write_allocate,
+                    index(d.load_from),
+                    index(d.store_to),
+                    index(d.victims_to),
+                )
+                for n, d in hierarchy.caches.items()
+            ],
+            index(hierarchy.memory.first),
+            [index(n) for n in self.order],
+        )
+
+    def process(self, addresses, ops, lengths):
+        self._sim.process(addresses, ops, lengths)
+
+    def force_write_back(self):
+        self._sim.force_write_back()
+
+    def reset(self):
+        self._sim.reset()
+
+    def stats(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        return self.convertStats(self._sim.stats())
+
+    def convertStats(
+        self, levels: typing.List[typing.Dict[str, typing.Any]]
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        """Turn raw native level statistics into the pycachesim format."""
+        raw = {x["name"]: x for x in levels}
+
+        out = [
+            dict(raw[n], latency=self.hierarchy.caches[n].latency) for n in self.order
+        ]
+
+        last = raw[self.hierarchy.memory.last]
+        victims = self.hierarchy.caches[self.hierarchy.memory.last].victims_to
+
+        loads = {k: last[f"MISS_{k}"] for k in ("count", "byte")}
+
+        if victims is not None:
+            for k in loads:
+                loads[k] -= raw[victims][f"HIT_{k}"]
+
+        memory = {"name": "MEM", "latency": self.hierarchy.memory.latency}
+
+        for k in ("count", "byte"):
+            memory[f"LOAD_{k}"] = loads[k]
+            memory[f"HIT_{k}"] = loads[k]
+            memory[f"STORE_{k}"] = last[f"EVICT_{k}"]
+            memory[f"EVICT_{k}"] = 0
+            memory[f"MISS_{k}"] = 0
+
+        out.append(memory)
+
+        return out
+
+
+def makeSimulator(
+    hierarchy: alex.schema.CacheHierarchy,
+    engine: alex.definitions.Engine = alex.definitions.Engine.PyCacheSim,
+) -> typing.Union[CacheSimulator, NativeCacheSimulator]:
+    if engine == alex.definitions.Engine.Native:
+        return NativeCacheSimulator(hierarchy)
+    else:
+        return CacheSimulator(hierarchy)
@@ -0,0 +1,140 @@
+import functools
+import importlib.util
+import pathlib
+import sys
+import tempfile
+import typing
+
+import alex.definitions
+
+CORE = pathlib.Path(__file__).resolve().parent.parent / "core"
+
+TEMPLATE = """#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include "specialized.hpp"
+
+PYBIND11_MODULE({name}, m)
+{{
+    pybind11::dict table;
+
+{entries}
+    m.attr("entries") = table;
+}}
+"""
+
+ENTRY = """    table[pybind11::make_tuple(
+        "{pattern}", "{precision}", pybind11::make_tuple({layout})
+    )] = pybind11::cpp_function(
+        &specialized_bench_entry<entries::{pattern}, {type}, {masks}>
+    );
+"""
+
+
+class Specialization(typing.NamedTuple):
+    pattern: alex.definitions.Pattern
+    layout: typing.Tuple[int, ...]
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single
+
+
+def masks(pattern: alex.definitions.Pattern, layout: typing.Sequence[int]) -> list:
+    """Return the bit mask of every dimension of a pattern in a layout."""
+    if any(x < 0 or x >= pattern.dimensions for x in layout):
+        raise ValueError(
+            "layout %s has bits outside the %d dimensions of pattern %s"
+            % (tuple(layout), pattern.dimensions, pattern)
+        )
+
+    return [
+        sum(1 << j for j, x in enumerate(layout) if x == d)
+        for d in range(pattern.dimensions)
+    ]
+
+
+def generateSource(name: str, specializations: typing.Iterable[Specialization]) -> str:
+    """Generate the source of a module with a benchmark entry for every layout.
+
+    The entries are collected in a dictionary named `entries`, keyed by the
+    pattern, the precision and the layout.
+    """
+    return TEMPLATE.format(
+        name=name,
+        entries="".join(
+            ENTRY.format(
+                pattern=str(s.pattern),
+                precision=str(s.precision),
+                layout=", ".join(str(x) for x in s.layout),
+                type=(
+                    "double"
+                    if s.precision == alex.definitions.Precision.Double
+                    else "float"
+                ),
+                masks=", ".join("0x%xUL" % m for m in masks(s.pattern, s.layout)),
+            )
+            for s in dict.fromkeys(specializations)
+        ),
+    )
+
+
+def buildModule(
+    name: str,
+    specializations: typing.Iterable[Specialization],
+    directory: pathlib.Path,
+    march: typing.Optional[str] = "native",
+) -> pathlib.Path:
+    """Generate and compile a module of specialized benchmark entries.
+
+    The module is built for the given architecture, by default that of the
+    building machine, and placed in the given directory along with its source.
+    Returns the path of the compiled module.
+    """
+    import setuptools
+    from pybind11.setup_helpers import Pybind11Extension, build_ext
+
+    directory.mkdir(parents=True, exist_ok=True)
+    source = directory / (name + ".cpp")
+    source.write_text(generateSource(name, specializations))
+
+    extension = Pybind11Extension(
+        name,
+        [str(source)],
+        include_dirs=[str(CORE)],
+        cxx_std=20,
+        extra_compile_args=["-Wall", "-Wextra", "-Werror", "-DNDEBUG"]
+        + ([] if march is None else ["-march=" + march]),
+    )
+
+    with tempfile.TemporaryDirectory() as temp:
+        distribution = setuptools.Distribution(
+            {"ext_modules": [extension], "cmdclass": {"build_ext": build_ext}}
+        )
+        command = distribution.get_command_obj("build_ext")
+        command.build_lib = str(directory)
+        command.build_temp = temp
+        distribution.run_command("build_ext")
+
+        return pathlib.Path(command.get_ext_fullpath(name))
+
+
+@functools.lru_cache(maxsize=None)
+def loadModule(path: pathlib.Path):
+    """Load a compiled module of specialized benchmark entries."""
+    name = path.name.split(".")[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules.setdefault(name, module)
+
+    return module
+
+
+def lookup(
+    path: pathlib.Path,
+    pattern: alex.definitions.Pattern,
+    layout: typing.Sequence[int],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+) -> typing.Optional[typing.Callable[[typing.List[int]], int]]:
+    """Return the specialized benchmark entry of a layout, if the module has one."""
+    return loadModule(pathlib.Path(path)).entries.get(
+        (str(pattern), str(precision), tuple(layout))
+    )
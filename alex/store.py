@@ -0,0 +1,152 @@
+import hashlib
+import pathlib
+import sqlite3
+import typing
+
+import alex.definitions
+import alex.sampling
+import alex.utils
+
+STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fitness (
+    hierarchy TEXT NOT NULL,
+    pattern TEXT NOT NULL,
+    precision TEXT NOT NULL,
+    bits TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    method TEXT NOT NULL,
+    fitness REAL NOT NULL,
+    PRIMARY KEY (hierarchy, pattern, precision, bits, layout, method)
+) WITHOUT ROWID
+"""
+
+
+def hierarchyDigest(path: pathlib.Path) -> str:
+    """Return the MD5 sum of a cache hierarchy YAML file."""
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def methodKey(sampling: typing.Optional[alex.sampling.Sampling] = None) -> str:
+    """Describe how a fitness was computed, so that estimates are kept apart.
+
+    All simulation engines agree exactly, so they share the exact method;
+    sampled estimates are keyed by their full sampling parameters.
+    """
+    return "exact" if sampling is None else sampling.json()
+
+
+def _formatLayout(layout) -> str:
+    return ",".join(str(x) for x in layout)
+
+
+class FitnessStore:
+    """On-disk fitness database which outlives a single run.
+
+    Fitness values are kept in an SQLite database in write-ahead logging mode,
+    so that any number of processes can read it while another one writes.
+    Values are keyed by the MD5 sum of the cache hierarchy file, the pattern,
+    the precision, the bit counts, the layout and the evaluation method.
+    """
+
+    def __init__(self, path: pathlib.Path, timeout: float = 60.0):
+        self.path = pathlib.Path(path)
+        self.timeout = timeout
+        self._connection = None
+
+    def __getstate__(self):
+        return {"path": self.path, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self.timeout = state["timeout"]
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=self.timeout)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+
+            with self._connection:
+                self._connection.execute(_SCHEMA)
+                version = self._connection.execute("PRAGMA user_version").fetchone()
+
+                if version[0] == 0:
+                    self._connection.execute(f"PRAGMA user_version={STORE_VERSION}")
+                elif version[0] != STORE_VERSION:
+                    raise ValueError(
+                        f"Fitness store {self.path} has version {version[0]}, "
+                        f"expected {STORE_VERSION}"
+                    )
+
+        return self._connection
+
+    def table(
+        self,
+        hierarchy: str,
+        pattern: alex.definitions.Pattern,
+        precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+        method: str = "exact",
+    ) -> "FitnessTable":
+        return FitnessTable(self, hierarchy, pattern, precision, method)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class FitnessTable:
+    """The part of a fitness store for one hierarchy, pattern and method."""
+
+    def __init__(
+        self,
+        store: FitnessStore,
+        hierarchy: str,
+        pattern: alex.definitions.Pattern,
+        precision: alex.definitions.Precision,
+        method: str,
+    ):
+        self.store = store
+        self.key = (hierarchy, str(pattern), str(precision))
+        self.pattern = alex.definitions.Pattern(pattern)
+        self.method = method
+
+    def _bits(self, layout) -> str:
+        return ":".join(str(x) for x in alex.utils.bitCounts(self.pattern, layout))
+
+    def lookup(self, layouts: typing.Iterable[typing.Tuple[int, ...]]):
+        """Return the known fitness values of the given layouts."""
+        result = {}
+        cursor = self.store.connection.cursor()
+
+        for i in layouts:
+            row = cursor.execute(
+                "SELECT fitness FROM fitness WHERE hierarchy = ? AND pattern = ? "
+                "AND precision = ? AND bits = ? AND layout = ? AND method = ?",
+                (*self.key, self._bits(i), _formatLayout(i), self.method),
+            ).fetchone()
+
+            if row is not None:
+                result[i] = row[0]
+
+        return result
+
+    def insert(self, fitnesses: typing.Mapping[typing.Tuple[int, ...], float]):
+        """Record fitness values, in a single transaction."""
+        if not fitnesses:
+            return
+
+        with self.store.connection as c:
+            c.executemany(
+                "INSERT OR REPLACE INTO fitness VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (*self.key, self._bits(i), _formatLayout(i), self.method, f)
+                    for i, f in fitnesses.items()
+                ],
+            )
@@ -0,0 +1,189 @@
+import collections
+import math
+import random
+
+import numpy
+
+
+class Strategy:
+    """How a search proposes candidates and chooses its next population.
+
+    Every generation, the candidates proposed by the strategy are evaluated,
+    and the strategy then picks the next population from them. Strategies
+    use the crossover and mutation functions of the GA, and get fitness
+    values through it, so that every evaluation goes through its caches.
+    Any state of a strategy is checkpointed along with the GA.
+
+    If the GA has batch crossover and mutation functions, which work on the
+    rows of a 2-D array, all candidates of a generation are bred at once.
+    """
+
+    def propose(self, ga):
+        raise NotImplementedError
+
+    def select(self, ga, candidates):
+        raise NotImplementedError
+
+    def mutants(self, ga, individual, count):
+        if ga.mutation_batch_func is None:
+            return [ga.mutation_func(individual) for _ in range(count)]
+
+        return [
+            tuple(x)
+            for x in ga.mutation_batch_func(
+                numpy.tile(numpy.array(individual), (count, 1))
+            ).tolist()
+        ]
+
+
+class Generational(Strategy):
+    """Replace the population by the best of its offspring.
+
+    Offspring are bred by crossover of two random individuals, followed by
+    a mutation with the given probability, and the best of them form the
+    next population, which does not include their parents.
+    """
+
+    def __init__(self, mutation_rate: float = 0.3):
+        self.mutation_rate = mutation_rate
+
+    def parents(self, ga):
+        return random.sample(ga.population, k=2)
+
+    def breed(self, ga):
+        x = ga.crossover_func(*self.parents(ga))
+
+        return ga.mutation_func(x) if random.random() < self.mutation_rate else x
+
+    def parent_indices(self, ga, count):
+        n = len(ga.population)
+        first = numpy.random.randint(0, n, size=count)
+
+        return first, (first + numpy.random.randint(1, n, size=count)) % n
+
+    def propose(self, ga):
+        if ga.crossover_batch_func is None:
+            return [self.breed(ga) for _ in range(ga.generated_count)]
+
+        population = numpy.array(ga.population)
+        first, second = self.parent_indices(ga, ga.generated_count)
+        offspring = ga.crossover_batch_func(population[first], population[second])
+        mutate = numpy.random.random(len(offspring)) < self.mutation_rate
+        offspring[mutate] = ga.mutation_batch_func(offspring[mutate])
+
+        return [tuple(x) for x in offspring.tolist()]
+
+    def select(self, ga, candidates):
+        return sorted(candidates, key=ga.get_fitness, reverse=True)[: ga.retained_count]
+
+
+class MuPlusLambda(Generational):
+    """The (mu + lambda) scheme with tournament selection.
+
+    Both parents of every offspring are the fittest of a number of random
+    individuals, and the next population is the best of the parents and the
+    offspring together. When breeding in batches, the individuals of a
+    tournament are drawn with replacement.
+    """
+
+    def __init__(self, tournament: int = 2, mutation_rate: float = 0.3):
+        super().__init__(mutation_rate)
+        self.tournament = tournament
+
+    def parents(self, ga):
+        k = min(self.tournament, len(ga.population))
+
+        return [
+            max(random.sample(ga.population, k=k), key=ga.get_fitness) for _ in range(2)
+        ]
+
+    def parent_indices(self, ga, count):
+        fitness = numpy.array([ga.get_fitness(x) for x in ga.population])
+        entrants = numpy.random.randint(
+            0, len(ga.population), size=(2, count, self.tournament)
+        )
+        winners = numpy.argmax(fitness[entrants], axis=2)
+
+        return tuple(
+            numpy.take_along_axis(entrants, winners[:, :, None], axis=2)[:, :, 0]
+        )
+
+    def select(self, ga, candidates):
+        return super().select(ga, list(dict.fromkeys(ga.population + candidates)))
+
+
+class SimulatedAnnealing(Strategy):
+    """Simulated annealing of a single individual.
+
+    Every generation proposes mutations of the current individual, which are
+    considered in turn: an improvement is always accepted, and a change for
+    the worse with a probability which falls exponentially with the relative
+    loss of fitness over the temperature. The temperature is multiplied by
+    the cooling factor after every generation.
+    """
+
+    def __init__(self, temperature: float = 0.01, cooling: float = 0.95):
+        self.temperature = temperature
+        self.cooling = cooling
+
+    def propose(self, ga):
+        current = max(ga.population, key=ga.get_fitness)
+
+        return self.mutants(ga, current, ga.generated_count)
+
+    def select(self, ga, candidates):
+        current = max(ga.population, key=ga.get_fitness)
+
+        for x in candidates:
+            loss = (ga.get_fitness(current) - ga.get_fitness(x)) / ga.get_fitness(
+                current
+            )
+
+            if loss <= 0 or random.random() < math.exp(-loss / self.temperature):
+                current = x
+
+        self.temperature *= self.cooling
+
+        return [current]
+
+
+class TabuSearch(Strategy):
+    """Tabu search over the mutations of a single individual.
+
+    Every generation moves to the best proposed mutation of the current
+    individual, even if it is worse, unless it has been visited within the
+    given number of recent moves. A visited individual is still accepted if
+    it is better than any seen so far.
+    """
+
+    def __init__(self, tenure: int = 50):
+        self.tenure = tenure
+        self.tabu = collections.deque(maxlen=tenure)
+        self.best = None
+
+    def propose(self, ga):
+        current = max(ga.population, key=ga.get_fitness)
+
+        if self.best is None:
+            self.best = ga.get_fitness(current)
+            self.tabu.append(current)
+
+        return self.mutants(ga, current, ga.generated_count)
+
+    def select(self, ga, candidates):
+        for x in sorted(dict.fromkeys(candidates), key=ga.get_fitness, reverse=True):
+            if x not in self.tabu or ga.get_fitness(x) > self.best:
+                self.tabu.append(x)
+                self.best = max(self.best, ga.get_fitness(x))
+
+                return [x]
+
+        return ga.population
+
+
+STRATEGIES = {
+    "generational": Generational,
+    "mu-plus-lambda": MuPlusLambda,
+    "annealing": SimulatedAnnealing,
+    "tabu": TabuSearch,
+}
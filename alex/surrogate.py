@@ -0,0 +1,144 @@
+import collections
+import itertools
+import math
+import random
+import typing
+
+import numpy
+
+SurrogateRecord = collections.namedtuple(
+    "SurrogateRecord",
+    [
+        "scored",
+        "rejected",
+        "accuracy",
+    ],
+)
+
+
+def pairwiseFeatures(individuals: typing.List[typing.Tuple[int, ...]]) -> numpy.ndarray:
+    """Encode layouts by the relative order of the bits of their dimensions.
+
+    The k-th position of a layout with dimension d holds bit k of d. For every
+    pair of bits of different dimensions, a feature is one if the bit of the
+    lower dimension is at a lower position than the other. These features
+    determine the layout, and a position of a bit is their linear function.
+    """
+    layouts = numpy.array(individuals, dtype=numpy.int64)
+    counts = numpy.bincount(layouts[0])
+    offsets = numpy.concatenate(([0], numpy.cumsum(counts)))
+
+    # Sorting positions by dimension lists the positions of the bits of every
+    # dimension in order, one dimension after the other.
+    order = numpy.argsort(layouts, axis=1, kind="stable")
+    positions = [order[:, offsets[d] : offsets[d + 1]] for d in range(len(counts))]
+
+    return numpy.concatenate(
+        [
+            (positions[a][:, :, None] < positions[b][:, None, :]).reshape(
+                len(layouts), -1
+            )
+            for a, b in itertools.combinations(range(len(counts)), 2)
+        ]
+        + [numpy.ones((len(layouts), 1), dtype=bool)],
+        axis=1,
+    ).astype(numpy.float64)
+
+
+def rankCorrelation(x: typing.List[float], y: typing.List[float]) -> float:
+    """Return the Spearman rank correlation of two sequences."""
+    if len(x) < 2:
+        return math.nan
+
+    rx = numpy.argsort(numpy.argsort(x))
+    ry = numpy.argsort(numpy.argsort(y))
+
+    if numpy.std(rx) == 0 or numpy.std(ry) == 0:
+        return math.nan
+
+    return float(numpy.corrcoef(rx, ry)[0, 1])
+
+
+class Surrogate:
+    """Online model which predicts the fitness of layouts.
+
+    The model is a ridge regression on the pairwise features of layouts,
+    trained on every fitness value as it enters the fitness cache. Once it
+    has seen enough of them, it screens offspring: of a pool of candidates
+    several times larger than a generation, the ones with the highest
+    predicted fitness are evaluated, along with a fraction of random others
+    so that the model keeps learning about the rest of the space.
+    """
+
+    def __init__(
+        self,
+        pool: int = 4,
+        exploration: float = 0.1,
+        warmup: int = 32,
+        regularization: float = 1.0,
+    ):
+        self.pool = pool
+        self.exploration = exploration
+        self.warmup = warmup
+        self.regularization = regularization
+        self.trained = 0
+        self.gram = None
+        self.moment = None
+        self.weights = None
+
+    @property
+    def ready(self) -> bool:
+        return self.weights is not None and self.trained >= self.warmup
+
+    def train(self, cache: typing.Dict[typing.Tuple[int, ...], float]):
+        """Update the model with the entries added to a cache since last time.
+
+        Fitness caches only ever grow, and dictionaries keep their order, so
+        the new entries are the ones past the number already trained on.
+        """
+        new = list(itertools.islice(cache.items(), self.trained, None))
+
+        if not new:
+            return
+
+        x = pairwiseFeatures([i for i, _ in new])
+        y = numpy.array([f for _, f in new])
+
+        if self.gram is None:
+            self.gram = numpy.zeros((x.shape[1], x.shape[1]))
+            self.moment = numpy.zeros(x.shape[1])
+
+        self.gram += x.T @ x
+        self.moment += x.T @ y
+        self.trained += len(new)
+        self.weights = numpy.linalg.solve(
+            self.gram + self.regularization * numpy.eye(len(self.moment)),
+            self.moment,
+        )
+
+    def predict(
+        self, individuals: typing.List[typing.Tuple[int, ...]]
+    ) -> numpy.ndarray:
+        return pairwiseFeatures(individuals) @ self.weights
+
+    def screen(
+        self, candidates: typing.List[typing.Tuple[int, ...]], count: int
+    ) -> typing.Tuple[typing.List[typing.Tuple[int, ...]], typing.Dict]:
+        """Choose the candidates to evaluate, with their predicted fitness.
+
+        Until the model has seen enough fitness values, the first candidates
+        are chosen, so that the screening costs nothing in the meantime.
+        """
+        if not self.ready or len(candidates) <= count:
+            return candidates[:count], {}
+
+        predictions = self.predict(candidates)
+        ranked = [candidates[i] for i in numpy.argsort(-predictions, kind="stable")]
+        explore = min(round(self.exploration * count), count)
+        chosen = ranked[: count - explore] + random.sample(
+            ranked[count - explore :], explore
+        )
+
+        selected = set(chosen)
+
+        return chosen, {x: p for x, p in zip(candidates, predictions) if x in selected}
@@ -0,0 +1,113 @@
+import enum
+import os
+import pathlib
+import typing
+
+
+class Domain(str, enum.Enum):
+    Core = "core"
+    Cache = "cache"
+    Node = "node"
+
+    def __str__(self):
+        return self.value
+
+
+class Cpu(typing.NamedTuple):
+    """Location of a logical CPU in the machine.
+
+    Every domain is identified by the lowest numbered CPU in it, except for
+    NUMA nodes, which have their own numbers.
+    """
+
+    cpu: int
+    core: int
+    cache: int
+    node: int
+
+    def domain(self, domain: Domain) -> int:
+        return getattr(self, str(domain))
+
+
+def parseCpuList(text: str) -> typing.List[int]:
+    """Parse a list of CPUs in the sysfs format, such as 0-3,8,10-11."""
+    result = []
+
+    for part in text.strip().split(","):
+        if not part:
+            continue
+
+        first, _, last = part.partition("-")
+        result.extend(range(int(first), int(last or first) + 1))
+
+    return result
+
+
+def _readCpuList(path: pathlib.Path) -> typing.List[int]:
+    return parseCpuList(path.read_text())
+
+
+def readTopology(
+    root: pathlib.Path = pathlib.Path("/sys/devices/system"),
+    cpus: typing.Optional[typing.Iterable[int]] = None,
+) -> typing.List[Cpu]:
+    """Read the location of the given CPUs from sysfs.
+
+    By default, these are all CPUs this process may run on. The cache domain
+    of a CPU is the set of CPUs sharing its last level cache, such as an L3
+    slice or an AMD CCX. Missing information, as in some containers, is
+    replaced by treating every CPU as its own core and cache domain on node
+    zero.
+    """
+    nodes = {}
+
+    for n in sorted((root / "node").glob("node[0-9]*")):
+        try:
+            for c in _readCpuList(n / "cpulist"):
+                nodes[c] = int(n.name[4:])
+        except OSError:
+            pass
+
+    result = []
+
+    for c in sorted(os.sched_getaffinity(0) if cpus is None else cpus):
+        path = root / "cpu" / f"cpu{c}"
+
+        try:
+            core = min(_readCpuList(path / "topology" / "thread_siblings_list"))
+        except (OSError, ValueError):
+            core = c
+
+        cache = c
+        level = 0
+
+        for index in (path / "cache").glob("index[0-9]*"):
+            try:
+                if (index / "type").read_text().strip() == "Instruction":
+                    continue
+
+                if int((index / "level").read_text()) > level:
+                    level = int((index / "level").read_text())
+                    cache = min(_readCpuList(index / "shared_cpu_list"))
+            except (OSError, ValueError):
+                pass
+
+        result.append(Cpu(cpu=c, core=core, cache=cache, node=nodes.get(c, 0)))
+
+    return result
+
+
+def placements(
+    cpus: typing.List[Cpu], domain: Domain, reserve: int = 0
+) -> typing.List[Cpu]:
+    """Choose one CPU in each domain of the given kind to run a worker on.
+
+    The first domains, in which the operating system and the coordinating
+    process usually run, are left free in the given number.
+    """
+    domains = {}
+
+    for c in sorted(cpus):
+        domains.setdefault(c.domain(domain), c)
+
+    return [domains[d] for d in sorted(domains)][reserve:]
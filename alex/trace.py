@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import typing
+
+import numpy
+
+import alex.core
+import alex.definitions
+
+log = logging.getLogger(__name__)
+
+TRACE_VERSION = 1
+
+
+def recordTrace(
+    pattern: alex.definitions.Pattern,
+    bits: typing.Sequence[int],
+    precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+    alignment: typing.Optional[int] = None,
+) -> typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    """Record the trace of a pattern, along with the placement of its arrays.
+
+    Unless an alignment is given, the arrays are placed as the simulated
+    pointers place them by default.
+    """
+    kwargs = {} if alignment is None else {"alignment": alignment}
+
+    return getattr(
+        alex.core, "_{}_{}_trace_entry".format(str(pattern), str(precision))
+    )([i for (i, j) in enumerate(bits) for _ in range(j)], **kwargs)
+
+
+def _depositTables(mask: typing.List[int]) -> typing.List[numpy.ndarray]:
+    """Build lookup tables which scatter the bits of a logical index.
+
+    Bit k of the logical index ends up in bit mask[k] of the address index;
+    every table handles one byte of the logical index at once.
+    """
+    tables = []
+
+    for lo in range(0, len(mask), 8):
+        table = numpy.zeros(256, dtype=numpy.uint64)
+
+        for k, p in enumerate(mask[lo : lo + 8]):
+            table[(numpy.arange(256) >> k) & 1 == 1] |= numpy.uint64(1 << p)
+
+        tables.append(table)
+
+    return tables
+
+
+class Trace:
+    """A compressed, layout-independent trace of a single access pattern.
+
+    The trace is stored as a series of blocks, each of which repeats a small
+    number of access sites a number of times with a constant stride per site.
+    Every site describes the array being accessed, whether the access is a
+    load or a store, and the logical index into the array. The arrays
+    themselves are described by their base address and their element size,
+    exactly as they are laid out by the simulated pointers.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self.path = pathlib.Path(path)
+
+        with open(self.path / "meta.json", "r") as f:
+            self.meta = json.load(f)
+
+        self.sites = numpy.load(self.path / "sites.npy", mmap_mode="r")
+        self.blocks = numpy.load(self.path / "blocks.npy", mmap_mode="r")
+        self.arrays = numpy.load(self.path / "arrays.npy")
+
+        self.dimensions = self.meta["dimensions"]
+
+        lengths = self.blocks[:, 0] * self.blocks[:, 1]
+        self.ends = numpy.cumsum(lengths)
+        self.starts = self.ends - lengths
+
+    def __len__(self):
+        return int(self.ends[-1]) if len(self.ends) > 0 else 0
+
+    def replay(
+        self,
+        permutation: typing.Sequence[int],
+        start: int = 0,
+        stop: typing.Optional[int] = None,
+        chunk_size: int = 1 << 20,
+    ) -> typing.Iterator[typing.Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]]:
+        """Turn the trace into concrete accesses for a given layout.
+
+        This yields tuples of contiguous address, operation and length arrays
+        covering the accesses with indices between start and stop, in chunks
+        of at most chunk_size accesses.
+        """
+        if stop is None or stop > len(self):
+            stop = len(self)
+
+        tables = [
+            _depositTables([j for j, p in enumerate(permutation) if p == d])
+            for d in range(self.dimensions)
+        ]
+
+        for lo in range(start, stop, chunk_size):
+            yield self._expand(tables, lo, min(lo + chunk_size, stop))
+
+    def _expand(self, tables, lo, hi):
+        first = numpy.searchsorted(self.ends, lo, side="right")
+        last = numpy.searchsorted(self.ends, hi - 1, side="right")
+
+        blocks = numpy.arange(first, last + 1)
+        counts = numpy.minimum(self.ends[blocks], hi) - numpy.maximum(
+            self.starts[blocks], lo
+        )
+
+        block = numpy.repeat(blocks, counts)
+        offset = numpy.arange(lo, hi, dtype=numpy.int64) - self.starts[block]
+
+        period = self.blocks[block, 0]
+        repetition = offset // period
+        site = self.blocks[block, 2] + offset % period
+
+        rows = self.sites[site]
+
+        index = numpy.zeros(hi - lo, dtype=numpy.uint64)
+
+        for d, table in enumerate(tables):
+            logical = rows[:, 2 + d] + repetition * rows[:, 5 + d]
+
+            for k, t in enumerate(table):
+                index |= t[(logical >> (8 * k)) & 0xFF]
+
+        array = self.arrays[rows[:, 0]]
+        addresses = array[:, 0].astype(numpy.uint64) + index * array[:, 1].astype(
+            numpy.uint64
+        )
+
+        return (
+            addresses,
+            rows[:, 1].astype(numpy.uint8),
+            array[:, 1].astype(numpy.uint32),
+        )
+
+
+class TraceStore:
+    """On-disk collection of traces, generated on first use.
+
+    Traces are keyed by pattern, bit counts and precision, and are kept as
+    memory-mapped NumPy files so that they can be shared by many worker
+    processes without being copied.
+    """
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = pathlib.Path(directory)
+        self._traces = {}
+
+    def __getstate__(self):
+        return {"directory": self.directory}
+
+    def __setstate__(self, state):
+        self.directory = state["directory"]
+        self._traces = {}
+
+    def path(
+        self,
+        pattern: alex.definitions.Pattern,
+        bits: typing.Sequence[int],
+        precision: alex.definitions.Precision,
+        alignment: typing.Optional[int] = None,
+    ) -> pathlib.Path:
+        name = "{}-{}-{}".format(
+            str(pattern), "_".join(str(i) for i in bits), str(precision)
+        )
+
+        if alignment is not None:
+            name += "-{}".format(alignment)
+
+        return self.directory / name
+
+    def get(
+        self,
+        pattern: alex.definitions.Pattern,
+        bits: typing.Sequence[int],
+        precision: alex.definitions.Precision = alex.definitions.Precision.Single,
+        alignment: typing.Optional[int] = None,
+    ) -> Trace:
+        key = (str(pattern), tuple(bits), str(precision), alignment)
+
+        if key not in self._traces:
+            path = self.path(pattern, bits, precision, alignment)
+
+            if not (path / "meta.json").is_file():
+                self._generate(path, pattern, bits, precision, alignment)
+
+            self._traces[key] = Trace(path)
+
+        return self._traces[key]
+
+    def _generate(self, path, pattern, bits, precision, alignment):
+        log.info(
+            "Recording trace for pattern [bold cyan]%s[/] with dimension "
+            "[bold cyan]%s[/]...",
+            str(pattern),
+            ":".join(str(i) for i in bits),
+        )
+
+        sites, blocks, arrays = recordTrace(pattern, bits, precision, alignment)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = pathlib.Path(tempfile.mkdtemp(dir=self.directory, prefix=".tmp-"))
+
+        numpy.save(tmp / "sites.npy", sites)
+        numpy.save(tmp / "blocks.npy", blocks)
+        numpy.save(tmp / "arrays.npy", arrays)
+
+        with open(tmp / "meta.json", "w") as f:
+            json.dump(
+                {
+                    "version": TRACE_VERSION,
+                    "pattern": str(pattern),
+                    "bits": list(bits),
+                    "precision": str(precision),
+                    "dimensions": len(bits),
+                    "accesses": int((blocks[:, 0] * blocks[:, 1]).sum()),
+                },
+                f,
+            )
+
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # Another process has finished recording the same trace first.
+            shutil.rmtree(tmp)
+
+        log.info(
+            "Trace contains [bold cyan]%d[/] accesses in [bold cyan]%d[/] blocks",
+            int((blocks[:, 0] * blocks[:, 1]).sum()),
+            len(blocks),
+        )
@@ -10,3 +10,21 @@ def enumerateOccurances(i):
         c[x] += 1
 
     return r
+
+
+def bitCounts(pattern, i):
+    c = collections.Counter(i)
+
+    return tuple(c[d] for d in range(pattern.dimensions))
+
+
+def shrinkLayout(layout, bits):
+    """Remove the given number of most significant bits of every dimension.
+
+    The relative order of the remaining bits is preserved, so the result is
+    the layout of the same shape on a smaller problem. Every dimension keeps
+    at least one bit.
+    """
+    c = collections.Counter(layout)
+
+    return tuple(d for (d, k) in enumerateOccurances(layout) if k < max(1, c[d] - bits))
@@ -9,18 +9,36 @@ from pybind11.setup_helpers import Pybind11Extension, build_ext
 def build(setup_kwargs: Dict[str, Any]) -> None:
     cachesim_backend_file = Path(cachesim.backend.__file__)
 
+    # One variant of the extension for every implementation of the bit
+    # deposit: the BMI2 instruction, a byte lookup table, and a portable loop.
+    # The variant to use is chosen when the extension is first used, see
+    # alex.core.
+    variants = {
+        "pdep": ["-mbmi2"],
+        "table": ["-DALEX_PDEP_TABLE"],
+        "generic": [],
+    }
+
     ext_modules = [
         Pybind11Extension(
-            "__alex_core",
+            f"__alex_core_{name}",
             ["core/main.cpp"],
             include_dirs=[str(cachesim_backend_file.parent), "core/"],
             library_dirs=[str(cachesim_backend_file.parent)],
             runtime_library_dirs=[str(cachesim_backend_file.parent)],
             libraries=[f":{cachesim_backend_file.name}"],
             cxx_std=20,
-            extra_compile_args=["-Wall", "-Wextra", "-Werror", "-mbmi2", "-DNDEBUG"],
+            extra_compile_args=[
+                "-Wall",
+                "-Wextra",
+                "-Werror",
+                "-DNDEBUG",
+                f"-DALEX_MODULE=__alex_core_{name}",
+            ]
+            + flags,
             depends=glob.glob("core/**/*.hpp", recursive=True),
-        ),
+        )
+        for name, flags in variants.items()
     ]
 
     setup_kwargs.update(
@@ -0,0 +1,134 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <type_traits>
+
+namespace alex::arrays {
+/*
+ * Position in an array which is moved one element at a time along any of
+ * its dimensions, so that loop nests can walk through an array without
+ * computing the address of every access from scratch. Cursors on a const
+ * array can only load.
+ *
+ * This cursor keeps the logical index and defers to the array for every
+ * access, which suits arrays that must see the index, such as traced ones.
+ */
+template <std::size_t N, typename A>
+class index_cursor
+{
+public:
+    using value_type = typename std::remove_const_t<A>::value_type;
+
+    index_cursor(A & _a, const std::array<std::size_t, N> & _i)
+        : a(&_a)
+        , i(_i)
+    {
+    }
+
+    inline value_type load() const
+    {
+        return a->load(i);
+    }
+
+    inline void store(const value_type & v) const
+    {
+        a->store(v, i);
+    }
+
+    inline index_cursor & advance(std::size_t d)
+    {
+        ++i[d];
+        return *this;
+    }
+
+    inline index_cursor & retreat(std::size_t d)
+    {
+        --i[d];
+        return *this;
+    }
+
+    inline index_cursor next(std::size_t d) const
+    {
+        return index_cursor(*this).advance(d);
+    }
+
+    inline index_cursor prev(std::size_t d) const
+    {
+        return index_cursor(*this).retreat(d);
+    }
+
+private:
+    A * a;
+    std::array<std::size_t, N> i;
+};
+
+/*
+ * Cursor on an array of which the index of every dimension is deposited in
+ * the bits of a mask; the array provides its masks through mask(d) and its
+ * pointer as ptr. The cursor keeps the deposited index of every dimension as
+ * well as their combined offset, so an access deposits nothing. Moving along
+ * a dimension with mask m steps its deposited index x with the masked
+ * increment (x - m) & m or the masked decrement (x - 1) & m, which carry
+ * through the bits outside the mask, and combines it with the cached offset
+ * of all other dimensions, which is the offset without the bits of m.
+ */
+template <std::size_t N, typename A>
+class masked_cursor
+{
+public:
+    using value_type = typename std::remove_const_t<A>::value_type;
+
+    masked_cursor(A & _a, std::size_t _o)
+        : a(&_a)
+        , o(_o)
+    {
+        for (std::size_t d = 0; d < N; ++d) {
+            x[d] = o & a->mask(d);
+        }
+    }
+
+    inline value_type load() const
+    {
+        return a->ptr.load(o);
+    }
+
+    inline void store(const value_type & v) const
+    {
+        a->ptr.store(o, v);
+    }
+
+    inline masked_cursor & advance(std::size_t d)
+    {
+        const std::size_t m = a->mask(d);
+
+        x[d] = (x[d] - m) & m;
+        o = (o & ~m) | x[d];
+        return *this;
+    }
+
+    inline masked_cursor & retreat(std::size_t d)
+    {
+        const std::size_t m = a->mask(d);
+
+        x[d] = (x[d] - 1) & m;
+        o = (o & ~m) | x[d];
+        return *this;
+    }
+
+    inline masked_cursor next(std::size_t d) const
+    {
+        return masked_cursor(*this).advance(d);
+    }
+
+    inline masked_cursor prev(std::size_t d) const
+    {
+        return masked_cursor(*this).retreat(d);
+    }
+
+private:
+    A * a;
+    std::size_t o;
+    std::array<std::size_t, N> x;
+};
+}
@@ -0,0 +1,112 @@
+#pragma once
+
+#include <array>
+#include <bit>
+#include <concepts>
+#include <cstddef>
+#include <utility>
+
+#include "arrays/cursor.hpp"
+#include "concepts/pointer.hpp"
+#include "utils/deposit.hpp"
+
+namespace alex::arrays {
+/*
+ * Array with the same layout as shuffle_rt, but with the mask of every
+ * dimension given as a template parameter, as it would be in production code
+ * with a layout chosen in advance.
+ */
+template <concepts::pointer T, std::size_t... M>
+class shuffle_ct
+{
+public:
+    static constexpr std::size_t N = sizeof...(M);
+
+    using pointer_type = T;
+    using value_type = typename pointer_type::value_type;
+
+    shuffle_ct(T && _p)
+        : ptr(std::forward<T>(_p))
+    {
+    }
+
+    template <std::unsigned_integral... I>
+    inline typename T::value_type load(const I &... is) const
+    {
+        return load(std::array<std::size_t, N>{is...});
+    }
+
+    inline typename T::value_type load(const std::array<std::size_t, N> & i
+    ) const
+    {
+        return ptr.load(get_index(i));
+    }
+
+    template <std::unsigned_integral... I>
+    inline void store(const typename T::value_type & v, const I &... is)
+    {
+        return store(v, std::array<std::size_t, N>{is...});
+    }
+
+    inline void store(
+        const typename T::value_type & v, const std::array<std::size_t, N> & i
+    )
+    {
+        ptr.store(get_index(i), v);
+    }
+
+    std::array<std::size_t, N> get_size() const
+    {
+        return {(std::size_t(1) << std::popcount(M))...};
+    }
+
+    template <std::unsigned_integral... I>
+    inline masked_cursor<N, const shuffle_ct> cursor(const I &... is) const
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline masked_cursor<N, const shuffle_ct>
+    cursor(const std::array<std::size_t, N> & i) const
+    {
+        return {*this, get_index(i)};
+    }
+
+    template <std::unsigned_integral... I>
+    inline masked_cursor<N, shuffle_ct> cursor(const I &... is)
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline masked_cursor<N, shuffle_ct>
+    cursor(const std::array<std::size_t, N> & i)
+    {
+        return {*this, get_index(i)};
+    }
+
+private:
+    friend class masked_cursor<N, shuffle_ct>;
+    friend class masked_cursor<N, const shuffle_ct>;
+
+    static constexpr std::array<std::size_t, N> masks{M...};
+
+    static constexpr std::size_t mask(std::size_t d)
+    {
+        return masks[d];
+    }
+
+    template <std::size_t... J>
+    static inline std::size_t
+    get_index_helper(const std::array<std::size_t, N> & i, std::index_sequence<J...>)
+    {
+        return (utils::deposit<M>(i[J]) | ...);
+    }
+
+    static inline std::size_t get_index(const std::array<std::size_t, N> & i)
+    {
+        return get_index_helper(i, std::make_index_sequence<N>());
+    }
+
+    T ptr;
+};
+}
@@ -3,6 +3,7 @@
 #include <cassert>
 #include <iostream>
 
+#include "arrays/cursor.hpp"
 #include "concepts/pointer.hpp"
 #include "utils/mask.hpp"
 #include "utils/pdep.hpp"
@@ -54,7 +55,39 @@ public:
         return s;
     }
 
+    template <std::unsigned_integral... I>
+    inline masked_cursor<N, const shuffle_rt> cursor(const I &... is) const
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline masked_cursor<N, const shuffle_rt>
+    cursor(const std::array<std::size_t, N> & i) const
+    {
+        return {*this, get_index(i)};
+    }
+
+    template <std::unsigned_integral... I>
+    inline masked_cursor<N, shuffle_rt> cursor(const I &... is)
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline masked_cursor<N, shuffle_rt>
+    cursor(const std::array<std::size_t, N> & i)
+    {
+        return {*this, get_index(i)};
+    }
+
 private:
+    friend class masked_cursor<N, shuffle_rt>;
+    friend class masked_cursor<N, const shuffle_rt>;
+
+    inline std::size_t mask(std::size_t d) const
+    {
+        return m[d];
+    }
+
     template <std::size_t... J>
     inline std::size_t
     get_index_helper(const std::array<std::size_t, N> & i, std::index_sequence<J...>)
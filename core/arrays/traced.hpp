@@ -0,0 +1,91 @@
+#pragma once
+
+#include <array>
+#include <concepts>
+#include <cstddef>
+#include <vector>
+
+#include "arrays/cursor.hpp"
+#include "pointers/null_pointer.hpp"
+#include "trace/recorder.hpp"
+#include "utils/mask.hpp"
+
+namespace alex::arrays {
+template <std::size_t N, typename T>
+class traced
+{
+public:
+    using pointer_type = pointers::null_pointer<T>;
+    using value_type = typename pointer_type::value_type;
+
+    traced(
+        trace::recorder & _r,
+        std::size_t _id,
+        const std::vector<std::size_t> & _c
+    )
+        : recorder(&_r)
+        , id(_id)
+        , s(utils::get_sizes<N>(_c))
+    {
+    }
+
+    template <std::unsigned_integral... I>
+    inline value_type load(const I &... is) const
+    {
+        return load(std::array<std::size_t, N>{is...});
+    }
+
+    inline value_type load(const std::array<std::size_t, N> & i) const
+    {
+        recorder->record(id, false, i);
+        return ptr.load(0);
+    }
+
+    template <std::unsigned_integral... I>
+    inline void store(const value_type & v, const I &... is)
+    {
+        return store(v, std::array<std::size_t, N>{is...});
+    }
+
+    inline void
+    store(const value_type & v, const std::array<std::size_t, N> & i)
+    {
+        recorder->record(id, true, i);
+        ptr.store(0, v);
+    }
+
+    std::array<std::size_t, N> get_size() const
+    {
+        return s;
+    }
+
+    template <std::unsigned_integral... I>
+    inline index_cursor<N, const traced> cursor(const I &... is) const
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline index_cursor<N, const traced>
+    cursor(const std::array<std::size_t, N> & i) const
+    {
+        return {*this, i};
+    }
+
+    template <std::unsigned_integral... I>
+    inline index_cursor<N, traced> cursor(const I &... is)
+    {
+        return cursor(std::array<std::size_t, N>{is...});
+    }
+
+    inline index_cursor<N, traced> cursor(const std::array<std::size_t, N> & i)
+    {
+        return {*this, i};
+    }
+
+private:
+    pointer_type ptr;
+    trace::recorder * recorder;
+    std::size_t id;
+    const std::array<std::size_t, N> s;
+};
+}
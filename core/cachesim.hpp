@@ -3,3 +3,19 @@
 extern "C" {
 #include <backend.h>
 }
+
+#include <cstddef>
+
+inline void cache_load(Cache & cache, std::size_t addr, std::size_t length)
+{
+    Cache__load(
+        &cache, {static_cast<long int>(addr), static_cast<long int>(length)}
+    );
+}
+
+inline void cache_store(Cache & cache, std::size_t addr, std::size_t length)
+{
+    Cache__store(
+        &cache, {static_cast<long int>(addr), static_cast<long int>(length)}, 0
+    );
+}
@@ -34,6 +34,14 @@ concept array = requires
                     std::tuple_cat(std::make_tuple(m), i)
                 )
             } -> std::same_as<typename T::value_type>;
+
+            {
+                m.cursor(i).load()
+            } -> std::same_as<typename T::value_type>;
+
+            {
+                m.cursor(i).next(0).prev(0).load()
+            } -> std::same_as<typename T::value_type>;
         };
     };
 
@@ -49,6 +57,8 @@ concept array = requires
             },
             std::tuple_cat(std::tie(m), std::make_tuple(v), i)
         )};
+
+        {m.cursor(i).advance(0).retreat(0).store(v)};
     };
 };
 }
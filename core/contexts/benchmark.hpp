@@ -0,0 +1,70 @@
+#pragma once
+
+#include <array>
+#include <chrono>
+#include <cstddef>
+#include <tuple>
+#include <type_traits>
+#include <vector>
+
+#include "arrays/shuffle_rt.hpp"
+#include "pointers/true_pointer.hpp"
+#include "utils/counters.hpp"
+
+namespace alex::contexts {
+class benchmark
+{
+public:
+    benchmark(utils::counters * _counters = nullptr)
+        : counters(_counters)
+    {
+    }
+
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> & individual,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        auto data = std::apply(
+            [&individual](auto &&... p) {
+                return std::make_tuple(
+                    arrays::shuffle_rt<N, std::remove_cvref_t<decltype(p)>>(
+                        std::move(p), individual
+                    )...
+                );
+            },
+            pointers::allocate_multiple<Ts...>(sizes)
+        );
+
+        if (counters != nullptr) {
+            counters->start();
+        }
+
+        std::chrono::high_resolution_clock::time_point t1 =
+            std::chrono::high_resolution_clock::now();
+
+        std::apply(kernel, data);
+
+        std::chrono::high_resolution_clock::time_point t2 =
+            std::chrono::high_resolution_clock::now();
+
+        if (counters != nullptr) {
+            counters->stop();
+        }
+
+        runtime =
+            std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
+            );
+    }
+
+    std::size_t get_runtime() const
+    {
+        return runtime;
+    }
+
+private:
+    utils::counters * counters;
+    std::size_t runtime = 0;
+};
+}
@@ -0,0 +1,93 @@
+#pragma once
+
+#include <array>
+#include <chrono>
+#include <cstddef>
+#include <tuple>
+#include <type_traits>
+#include <vector>
+
+#include "arrays/shuffle_rt.hpp"
+#include "pointers/arena.hpp"
+#include "pointers/offsets.hpp"
+
+namespace alex::contexts {
+/*
+ * Benchmark context which allocates the arrays once, from an arena, and
+ * runs the kernel a number of untimed warm-up times followed by a number of
+ * timed repetitions on the same arrays.
+ */
+class repeated_benchmark
+{
+public:
+    repeated_benchmark(
+        std::size_t _repetitions,
+        std::size_t _warmup,
+        pointers::huge_pages _mode
+    )
+        : repetitions(_repetitions)
+        , warmup(_warmup)
+        , mode(_mode)
+    {
+    }
+
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> & individual,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        constexpr std::array<std::size_t, sizeof...(Ts)> element_sizes{
+            sizeof(Ts)...};
+
+        const std::array<std::size_t, sizeof...(Ts)> offsets =
+            pointers::offsets<Ts...>(sizes, pointers::page_size(mode));
+
+        pointers::arena arena(
+            offsets.back() + element_sizes.back() * sizes.back(), mode
+        );
+
+        auto data = std::apply(
+            [&individual](auto &&... p) {
+                return std::make_tuple(
+                    arrays::shuffle_rt<N, std::remove_cvref_t<decltype(p)>>(
+                        std::move(p), individual
+                    )...
+                );
+            },
+            arena.template partition<Ts...>(offsets)
+        );
+
+        for (std::size_t i = 0; i < warmup; ++i) {
+            std::apply(kernel, data);
+        }
+
+        runtimes.clear();
+
+        for (std::size_t i = 0; i < repetitions; ++i) {
+            std::chrono::high_resolution_clock::time_point t1 =
+                std::chrono::high_resolution_clock::now();
+
+            std::apply(kernel, data);
+
+            std::chrono::high_resolution_clock::time_point t2 =
+                std::chrono::high_resolution_clock::now();
+
+            runtimes.push_back(
+                std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1)
+                    .count()
+            );
+        }
+    }
+
+    const std::vector<std::size_t> & get_runtimes() const
+    {
+        return runtimes;
+    }
+
+private:
+    const std::size_t repetitions, warmup;
+    const pointers::huge_pages mode;
+    std::vector<std::size_t> runtimes;
+};
+}
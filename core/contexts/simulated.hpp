@@ -0,0 +1,48 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <tuple>
+#include <type_traits>
+#include <vector>
+
+#include "arrays/shuffle_rt.hpp"
+#include "cachesim.hpp"
+#include "pointers/simulated_pointer.hpp"
+
+namespace alex::contexts {
+template <typename C = Cache>
+class simulated
+{
+public:
+    simulated(C & _cache, std::size_t _alignment = 0xFFFFFFFF)
+        : cache(_cache)
+        , alignment(_alignment)
+    {
+    }
+
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> & individual,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        auto data = std::apply(
+            [&individual](auto &&... p) {
+                return std::make_tuple(
+                    arrays::shuffle_rt<N, std::remove_cvref_t<decltype(p)>>(
+                        std::move(p), individual
+                    )...
+                );
+            },
+            pointers::partition<Ts...>(cache, sizes, alignment)
+        );
+
+        std::apply(kernel, data);
+    }
+
+private:
+    C & cache;
+    std::size_t alignment;
+};
+}
@@ -0,0 +1,63 @@
+#pragma once
+
+#include <array>
+#include <chrono>
+#include <cstddef>
+#include <tuple>
+#include <type_traits>
+#include <vector>
+
+#include "arrays/shuffle_ct.hpp"
+#include "pointers/true_pointer.hpp"
+
+namespace alex::contexts {
+/*
+ * Benchmark context like benchmark, but for a single layout of which the
+ * masks are fixed at compile time, so that the kernel is compiled as it
+ * would be for that layout alone.
+ */
+template <std::size_t... M>
+class specialized_benchmark
+{
+public:
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> &,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        static_assert(N == sizeof...(M), "one mask is needed per dimension");
+
+        auto data = std::apply(
+            [](auto &&... p) {
+                return std::make_tuple(
+                    arrays::shuffle_ct<std::remove_cvref_t<decltype(p)>, M...>(
+                        std::move(p)
+                    )...
+                );
+            },
+            pointers::allocate_multiple<Ts...>(sizes)
+        );
+
+        std::chrono::high_resolution_clock::time_point t1 =
+            std::chrono::high_resolution_clock::now();
+
+        std::apply(kernel, data);
+
+        std::chrono::high_resolution_clock::time_point t2 =
+            std::chrono::high_resolution_clock::now();
+
+        runtime =
+            std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
+            );
+    }
+
+    std::size_t get_runtime() const
+    {
+        return runtime;
+    }
+
+private:
+    std::size_t runtime = 0;
+};
+}
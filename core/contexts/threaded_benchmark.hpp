@@ -0,0 +1,145 @@
+#pragma once
+
+#include <array>
+#include <atomic>
+#include <barrier>
+#include <cerrno>
+#include <chrono>
+#include <cstddef>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <thread>
+#include <tuple>
+#include <type_traits>
+#include <vector>
+
+#include <pthread.h>
+#include <sched.h>
+
+#include "arrays/shuffle_rt.hpp"
+#include "pointers/true_pointer.hpp"
+#include "utils/team.hpp"
+
+namespace alex::contexts {
+/*
+ * Benchmark context which splits the kernel between a team of threads, each
+ * of which is pinned to the next of the given CPUs, if any, so that the
+ * threads compete for the shared caches and the memory bandwidth as they do
+ * when a kernel occupies a whole socket. The runtime is measured from the
+ * moment that all threads are ready until the last one is done.
+ */
+class threaded_benchmark
+{
+public:
+    threaded_benchmark(std::size_t _threads, const std::vector<int> & _cpus)
+        : threads(_threads)
+        , cpus(_cpus)
+    {
+        if (threads == 0) {
+            throw std::invalid_argument("cannot benchmark on zero threads");
+        }
+    }
+
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> & individual,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        auto data = std::apply(
+            [&individual](auto &&... p) {
+                return std::make_tuple(
+                    arrays::shuffle_rt<N, std::remove_cvref_t<decltype(p)>>(
+                        std::move(p), individual
+                    )...
+                );
+            },
+            pointers::allocate_multiple<Ts...>(sizes)
+        );
+
+        std::chrono::high_resolution_clock::time_point t1, t2;
+
+        /*
+         * The clock is read when the last thread arrives at the start, and
+         * when the last thread arrives at the end, before any of the threads
+         * are released.
+         */
+        auto start = [&t1]() noexcept {
+            t1 = std::chrono::high_resolution_clock::now();
+        };
+        auto stop = [&t2]() noexcept {
+            t2 = std::chrono::high_resolution_clock::now();
+        };
+
+        std::barrier<decltype(start)> started(
+            static_cast<std::ptrdiff_t>(threads), start
+        );
+        std::barrier<decltype(stop)> stopped(
+            static_cast<std::ptrdiff_t>(threads), stop
+        );
+        std::barrier<> barrier(static_cast<std::ptrdiff_t>(threads));
+        std::atomic<std::size_t> progress(0);
+        std::vector<int> errors(threads, 0);
+
+        std::vector<std::thread> team;
+
+        for (std::size_t i = 0; i < threads; ++i) {
+            team.emplace_back([&, i]() {
+                if (!cpus.empty()) {
+                    errors[i] = pin(cpus[i % cpus.size()]);
+                }
+
+                utils::team member(i, threads, &barrier, &progress);
+
+                started.arrive_and_wait();
+
+                std::apply(
+                    [&kernel, &member](auto &... a) { kernel(a..., member); },
+                    data
+                );
+
+                stopped.arrive_and_wait();
+            });
+        }
+
+        for (std::thread & t : team) {
+            t.join();
+        }
+
+        for (std::size_t i = 0; i < threads; ++i) {
+            if (errors[i] != 0) {
+                throw std::runtime_error(
+                    "cannot pin thread " + std::to_string(i) + " to CPU " +
+                    std::to_string(cpus[i % cpus.size()]) + ": " +
+                    std::strerror(errors[i])
+                );
+            }
+        }
+
+        runtime =
+            std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
+            );
+    }
+
+    std::size_t get_runtime() const
+    {
+        return runtime;
+    }
+
+private:
+    static int pin(int cpu)
+    {
+        cpu_set_t set;
+
+        CPU_ZERO(&set);
+        CPU_SET(cpu, &set);
+
+        return pthread_setaffinity_np(pthread_self(), sizeof(set), &set);
+    }
+
+    const std::size_t threads;
+    const std::vector<int> cpus;
+    std::size_t runtime = 0;
+};
+}
@@ -0,0 +1,54 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <tuple>
+#include <utility>
+#include <vector>
+
+#include "arrays/traced.hpp"
+#include "pointers/offsets.hpp"
+#include "trace/recorder.hpp"
+
+namespace alex::contexts {
+class tracing
+{
+public:
+    tracing(trace::recorder & _recorder, std::size_t _alignment = 0xFFFFFFFF)
+        : recorder(_recorder)
+        , alignment(_alignment)
+    {
+    }
+
+    template <std::size_t N, typename... Ts, typename F>
+    void
+    run(const std::vector<std::size_t> & individual,
+        const std::array<std::size_t, sizeof...(Ts)> & sizes,
+        F && kernel)
+    {
+        run_helper<N, Ts...>(
+            individual,
+            pointers::offsets<Ts...>(sizes, alignment),
+            kernel,
+            std::make_index_sequence<sizeof...(Ts)>()
+        );
+    }
+
+private:
+    template <std::size_t N, typename... Ts, typename F, std::size_t... Is>
+    void
+    run_helper(const std::vector<std::size_t> & individual, const std::array<std::size_t, sizeof...(Ts)> & offsets, F && kernel, std::index_sequence<Is...>)
+    {
+        std::tuple<arrays::traced<N, Ts>...> data{arrays::traced<N, Ts>(
+            recorder, recorder.add_array(offsets[Is], sizeof(Ts)), individual
+        )...};
+
+        std::apply(kernel, data);
+
+        recorder.flush();
+    }
+
+    trace::recorder & recorder;
+    std::size_t alignment;
+};
+}
@@ -0,0 +1,148 @@
+#pragma once
+
+#include <array>
+#include <concepts>
+#include <cstddef>
+#include <vector>
+
+#include "patterns/cholesky_banachiewicz.hpp"
+#include "patterns/crout.hpp"
+#include "patterns/himeno.hpp"
+#include "patterns/jacobi2d.hpp"
+#include "patterns/mm_ijk.hpp"
+#include "patterns/mm_ikj.hpp"
+#include "patterns/mmt_ijk.hpp"
+#include "patterns/mmt_ikj.hpp"
+
+template <std::size_t N>
+std::array<std::size_t, N> size_getter(const std::vector<std::size_t> & ind)
+{
+    std::array<std::size_t, N> out;
+
+    for (std::size_t i = 0; i < N; ++i) {
+        out[i] = 1;
+    }
+
+    for (const std::size_t i : ind) {
+        out[i] <<= 1;
+    }
+
+    return out;
+}
+
+namespace entries {
+struct MMijk {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T, T>(
+            individual,
+            {m * n, m * n, m * n},
+            [](auto &&... a) { alex::patterns::mm_ijk(a...); }
+        );
+    }
+};
+
+struct MMTijk {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T, T>(
+            individual,
+            {m * n, m * n, m * n},
+            [](auto &&... a) { alex::patterns::mmt_ijk(a...); }
+        );
+    }
+};
+
+struct MMikj {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T, T>(
+            individual,
+            {m * n, m * n, m * n},
+            [](auto &&... a) { alex::patterns::mm_ikj(a...); }
+        );
+    }
+};
+
+struct MMTikj {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T, T>(
+            individual,
+            {m * n, m * n, m * n},
+            [](auto &&... a) { alex::patterns::mmt_ikj(a...); }
+        );
+    }
+};
+
+struct Jacobi2D {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T>(individual, {m * n, m * n}, [](auto &&... a) {
+            alex::patterns::jacobi2d(a...);
+        });
+    }
+};
+
+struct Cholesky {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T>(individual, {m * n, m * n}, [](auto &&... a) {
+            alex::patterns::cholesky_banachiewicz(a...);
+        });
+    }
+};
+
+struct Crout {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n] = size_getter<2>(individual);
+
+        ctx.template run<2, T, T, T>(
+            individual,
+            {m * n, m * n, m * n},
+            [](auto &&... a) { alex::patterns::crout(a...); }
+        );
+    }
+};
+
+struct Himeno {
+    template <std::floating_point T, typename C>
+    static void run(C & ctx, const std::vector<std::size_t> & individual)
+    {
+        auto [m, n, p] = size_getter<3>(individual);
+
+        ctx.template run<
+            3,
+            std::array<T, 3>,
+            std::array<T, 3>,
+            std::array<T, 3>,
+            T,
+            T,
+            T>(
+            individual,
+            {m * n * p, m * n * p, m * n * p, m * n * p, m * n * p, m * n * p},
+            [](auto &&... a) { alex::patterns::himeno(a...); }
+        );
+    }
+};
+}
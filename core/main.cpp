@@ -1,414 +1,495 @@
 #define PYBIND11_DETAILED_ERROR_MESSAGES
 
 #include <array>
-#include <chrono>
 #include <concepts>
-#include <iostream>
+#include <cstdint>
+#include <cstring>
+#include <optional>
+#include <string>
+#include <tuple>
 #include <type_traits>
 #include <utility>
 
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
-#include "arrays/lexicographic.hpp"
-#include "arrays/shuffle_rt.hpp"
 #include "cachesim.hpp"
-#include "patterns/cholesky_banachiewicz.hpp"
-#include "patterns/crout.hpp"
-#include "patterns/himeno.hpp"
-#include "patterns/jacobi2d.hpp"
-#include "patterns/mm_ijk.hpp"
-#include "patterns/mm_ikj.hpp"
-#include "patterns/mmt_ijk.hpp"
-#include "patterns/mmt_ikj.hpp"
-#include "pointers/simulated_pointer.hpp"
-#include "pointers/true_pointer.hpp"
-#include "utils/pdep.hpp"
-
-template <std::size_t N>
-std::array<std::size_t, N> size_getter(const std::vector<std::size_t> & ind)
+#include "contexts/benchmark.hpp"
+#include "contexts/repeated_benchmark.hpp"
+#include "contexts/simulated.hpp"
+#include "contexts/threaded_benchmark.hpp"
+#include "contexts/tracing.hpp"
+#include "entries.hpp"
+#include "sim/hierarchy.hpp"
+#include "sim/sampler.hpp"
+#include "sim/stack_distance.hpp"
+#include "trace/recorder.hpp"
+
+template <typename T>
+pybind11::array_t<T> to_numpy(const std::vector<T> & v, std::size_t width)
 {
-    std::array<std::size_t, N> out;
+    pybind11::array_t<T> out({v.size() / width, width});
 
-    for (std::size_t i = 0; i < N; ++i) {
-        out[i] = 1;
-    }
-
-    for (const std::size_t i : ind) {
-        out[i] <<= 1;
-    }
+    std::memcpy(out.mutable_data(), v.data(), v.size() * sizeof(T));
 
     return out;
 }
 
-template <std::floating_point T>
-void _MMijk_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+template <typename P, std::floating_point T>
+void sim_entry(
+    pybind11::handle obj,
+    const std::vector<std::size_t> & individual,
+    std::size_t alignment
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
-
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::partition<T, T, T>(cache, {m * n, m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
+    alex::contexts::simulated<Cache> ctx(
+        *reinterpret_cast<Cache *>(obj.ptr()), alignment
+    );
 
-    alex::patterns::mm_ijk(A, B, C);
+    P::template run<T>(ctx, individual);
 }
 
-template <std::floating_point T>
-std::size_t _MMijk_bench_entry(const std::vector<std::size_t> & individual)
+template <typename P, std::floating_point T>
+void native_entry(
+    alex::sim::hierarchy & hierarchy,
+    const std::vector<std::size_t> & individual,
+    std::size_t alignment
+)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::allocate_multiple<T, T, T>({m * n, m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
+    alex::contexts::simulated<alex::sim::hierarchy> ctx(hierarchy, alignment);
 
-    alex::patterns::mm_ijk(A, B, C);
-
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
-
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    P::template run<T>(ctx, individual);
 }
 
-template <std::floating_point T>
-void _MMTijk_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+template <typename P, std::floating_point T>
+void sampled_entry(
+    alex::sim::sampler & sampler, const std::vector<std::size_t> & individual
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
-
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::partition<T, T, T>(cache, {m * n, m * n, m * n});
+    alex::contexts::simulated<alex::sim::sampler> ctx(sampler);
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    alex::patterns::mmt_ijk(A, B, C);
+    P::template run<T>(ctx, individual);
 }
 
-template <std::floating_point T>
-std::size_t _MMTijk_bench_entry(const std::vector<std::size_t> & individual)
+template <typename P, std::floating_point T>
+void reuse_entry(
+    alex::sim::stack_distance & profile,
+    const std::vector<std::size_t> & individual
+)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::allocate_multiple<T, T, T>({m * n, m * n, m * n});
+    alex::contexts::simulated<alex::sim::stack_distance> ctx(profile);
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
+    P::template run<T>(ctx, individual);
+}
 
-    alex::patterns::mmt_ijk(A, B, C);
+template <typename P, std::floating_point T>
+std::size_t bench_entry(const std::vector<std::size_t> & individual)
+{
+    alex::contexts::benchmark ctx;
 
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    P::template run<T>(ctx, individual);
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    return ctx.get_runtime();
 }
 
-template <std::floating_point T>
-void _MMikj_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+/*
+ * Benchmark a layout with the kernel split between the given number of
+ * threads, pinned to the given CPUs in turn, and return the runtime.
+ */
+template <typename P, std::floating_point T>
+std::size_t bench_threaded_entry(
+    const std::vector<std::size_t> & individual,
+    std::size_t threads,
+    const std::vector<int> & cpus
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
+    alex::contexts::threaded_benchmark ctx(threads, cpus);
 
-    auto [m, n] = size_getter<2>(individual);
+    P::template run<T>(ctx, individual);
 
-    auto [_A, _B, _C] =
-        alex::pointers::partition<T, T, T>(cache, {m * n, m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    alex::patterns::mm_ikj(A, B, C);
+    return ctx.get_runtime();
 }
 
-template <std::floating_point T>
-std::size_t _MMikj_bench_entry(const std::vector<std::size_t> & individual)
+/*
+ * Benchmark a layout like bench_entry, and return the runtime along with the
+ * hardware counters of the timed region, which are None where unavailable.
+ */
+template <typename P, std::floating_point T>
+pybind11::dict bench_counters_entry(const std::vector<std::size_t> & individual)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::allocate_multiple<T, T, T>({m * n, m * n, m * n});
+    alex::utils::counters counters;
+    alex::contexts::benchmark ctx(&counters);
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
+    P::template run<T>(ctx, individual);
 
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
+    pybind11::dict out;
+    std::array<std::optional<std::uint64_t>, alex::utils::counters::count>
+        values = counters.read();
 
-    alex::patterns::mm_ikj(A, B, C);
+    out["runtime"] = ctx.get_runtime();
 
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    for (std::size_t i = 0; i < values.size(); ++i) {
+        out[alex::utils::counter_events[i].name] =
+            values[i] ? pybind11::cast(*values[i]) : pybind11::none();
+    }
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    return out;
 }
 
-template <std::floating_point T>
-void _MMTikj_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+/*
+ * Benchmark a layout in a number of timed repetitions on arrays which are
+ * allocated once, after a number of untimed warm-up runs, and return the
+ * runtime of every repetition.
+ */
+template <typename P, std::floating_point T>
+pybind11::array_t<std::uint64_t> bench_repeated_entry(
+    const std::vector<std::size_t> & individual,
+    std::size_t repetitions,
+    std::size_t warmup,
+    const std::string & huge_pages
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
+    alex::contexts::repeated_benchmark ctx(
+        repetitions, warmup, alex::pointers::parse_huge_pages(huge_pages)
+    );
 
-    auto [m, n] = size_getter<2>(individual);
+    {
+        pybind11::gil_scoped_release release;
 
-    auto [_A, _B, _C] =
-        alex::pointers::partition<T, T, T>(cache, {m * n, m * n, m * n});
+        P::template run<T>(ctx, individual);
+    }
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
+    std::vector<std::uint64_t> runtimes(
+        ctx.get_runtimes().begin(), ctx.get_runtimes().end()
+    );
 
-    alex::patterns::mmt_ikj(A, B, C);
+    return to_numpy(runtimes, 1).attr("ravel")();
 }
 
-template <std::floating_point T>
-std::size_t _MMTikj_bench_entry(const std::vector<std::size_t> & individual)
+template <typename P, std::floating_point T>
+pybind11::tuple
+trace_entry(const std::vector<std::size_t> & individual, std::size_t alignment)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::allocate_multiple<T, T, T>({m * n, m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
-
-    alex::patterns::mmt_ikj(A, B, C);
+    alex::trace::recorder recorder;
+    alex::contexts::tracing ctx(recorder, alignment);
 
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    P::template run<T>(ctx, individual);
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
+    return pybind11::make_tuple(
+        to_numpy(recorder.get_sites(), alex::trace::recorder::site_width),
+        to_numpy(recorder.get_blocks(), alex::trace::recorder::block_width),
+        to_numpy(recorder.get_arrays(), 2)
     );
 }
 
-template <std::floating_point T>
-void _Jacobi2D_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+void replay_sim_entry(
+    pybind11::handle obj,
+    pybind11::array_t<std::uint64_t, pybind11::array::c_style> addresses,
+    pybind11::array_t<std::uint8_t, pybind11::array::c_style> ops,
+    pybind11::array_t<std::uint32_t, pybind11::array::c_style> lengths
 )
 {
     Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
 
-    auto [m, n] = size_getter<2>(individual);
+    const std::uint64_t * a = addresses.data();
+    const std::uint8_t * o = ops.data();
+    const std::uint32_t * l = lengths.data();
 
-    auto [_A, _B] = alex::pointers::partition<T, T>(cache, {m * n, m * n});
+    for (pybind11::ssize_t i = 0; i < addresses.size(); ++i) {
+        addr_range r{static_cast<long int>(a[i]), static_cast<long int>(l[i])};
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual);
-
-    alex::patterns::jacobi2d(A, B);
+        if (o[i] == 0) {
+            Cache__load(&cache, r);
+        } else {
+            Cache__store(&cache, r, 0);
+        }
+    }
 }
 
-template <std::floating_point T>
-std::size_t _Jacobi2D_bench_entry(const std::vector<std::size_t> & individual)
+using level_tuple = std::tuple<
+    std::string,
+    std::int64_t,
+    std::int64_t,
+    std::int64_t,
+    bool,
+    bool,
+    std::int64_t,
+    std::int64_t,
+    std::int64_t>;
+
+alex::sim::hierarchy make_hierarchy(
+    const std::vector<level_tuple> & levels,
+    std::size_t first,
+    const std::vector<std::size_t> & order
+)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B] = alex::pointers::allocate_multiple<T, T>({m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual);
+    std::vector<alex::sim::level_config> configs;
 
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
-
-    alex::patterns::jacobi2d(A, B);
-
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    for (const level_tuple & l : levels) {
+        configs.push_back(std::make_from_tuple<alex::sim::level_config>(l));
+    }
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    return alex::sim::hierarchy(configs, first, order);
 }
 
-template <std::floating_point T>
-void _Cholesky_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+void hierarchy_process(
+    alex::sim::hierarchy & hierarchy,
+    pybind11::array_t<std::uint64_t, pybind11::array::c_style> addresses,
+    pybind11::array_t<std::uint8_t, pybind11::array::c_style> ops,
+    pybind11::array_t<std::uint32_t, pybind11::array::c_style> lengths
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
-
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B] = alex::pointers::partition<T, T>(cache, {m * n, m * n});
+    if (ops.size() != addresses.size() || lengths.size() != addresses.size()) {
+        throw std::invalid_argument("access buffers differ in length");
+    }
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual);
+    pybind11::gil_scoped_release release;
 
-    alex::patterns::cholesky_banachiewicz(A, B);
+    hierarchy.process(
+        addresses.data(), ops.data(), lengths.data(), addresses.size()
+    );
 }
 
-template <std::floating_point T>
-std::size_t _Cholesky_bench_entry(const std::vector<std::size_t> & individual)
+pybind11::list hierarchy_stats(const alex::sim::hierarchy & hierarchy)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B] = alex::pointers::allocate_multiple<T, T>({m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual);
-
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
-
-    alex::patterns::cholesky_banachiewicz(A, B);
-
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    pybind11::list out;
+
+    for (const alex::sim::hierarchy::level & l : hierarchy.get_levels()) {
+        pybind11::dict d;
+
+        d["name"] = l.config.name;
+        d["LOAD_count"] = l.LOAD.count;
+        d["LOAD_byte"] = l.LOAD.byte;
+        d["STORE_count"] = l.STORE.count;
+        d["STORE_byte"] = l.STORE.byte;
+        d["HIT_count"] = l.HIT.count;
+        d["HIT_byte"] = l.HIT.byte;
+        d["MISS_count"] = l.MISS.count;
+        d["MISS_byte"] = l.MISS.byte;
+        d["EVICT_count"] = l.EVICT.count;
+        d["EVICT_byte"] = l.EVICT.byte;
+
+        out.append(d);
+    }
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    return out;
 }
 
-template <std::floating_point T>
-void _Crout_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+/*
+ * Simulate a number of layouts of one pattern in turn on the same hierarchy,
+ * which is reset before every layout, and return the statistics of each.
+ */
+template <typename P, std::floating_point T>
+pybind11::list native_batch_entry(
+    alex::sim::hierarchy & hierarchy,
+    const std::vector<std::vector<std::size_t>> & individuals
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
+    pybind11::list out;
 
-    auto [m, n] = size_getter<2>(individual);
+    for (const std::vector<std::size_t> & individual : individuals) {
+        {
+            pybind11::gil_scoped_release release;
+            alex::contexts::simulated<alex::sim::hierarchy> ctx(hierarchy);
 
-    auto [_A, _B, _C] =
-        alex::pointers::partition<T, T, T>(cache, {m * n, m * n, m * n});
+            hierarchy.reset();
+            P::template run<T>(ctx, individual);
+            hierarchy.force_write_back();
+        }
 
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
+        out.append(hierarchy_stats(hierarchy));
+    }
 
-    alex::patterns::crout(A, B, C);
+    return out;
 }
 
-template <std::floating_point T>
-std::size_t _Crout_bench_entry(const std::vector<std::size_t> & individual)
+void sampler_process(
+    alex::sim::sampler & sampler,
+    pybind11::array_t<std::uint64_t, pybind11::array::c_style> addresses,
+    pybind11::array_t<std::uint8_t, pybind11::array::c_style> ops,
+    pybind11::array_t<std::uint32_t, pybind11::array::c_style> lengths
+)
 {
-    auto [m, n] = size_getter<2>(individual);
-
-    auto [_A, _B, _C] =
-        alex::pointers::allocate_multiple<T, T, T>({m * n, m * n, m * n});
-
-    alex::arrays::shuffle_rt<2, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
-
-    alex::patterns::crout(A, B, C);
+    if (ops.size() != addresses.size() || lengths.size() != addresses.size()) {
+        throw std::invalid_argument("access buffers differ in length");
+    }
 
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+    pybind11::gil_scoped_release release;
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
+    sampler.process(
+        addresses.data(), ops.data(), lengths.data(), addresses.size()
     );
 }
 
-template <std::floating_point T>
-void _Himeno_sim_entry(
-    pybind11::handle obj, const std::vector<std::size_t> & individual
+alex::sim::stack_distance make_stack_distance(
+    const std::vector<std::tuple<std::int64_t, std::int64_t, std::int64_t>> & g
 )
 {
-    Cache & cache = *reinterpret_cast<Cache *>(obj.ptr());
+    std::vector<alex::sim::geometry> geometries;
 
-    auto [m, n, p] = size_getter<3>(individual);
-
-    auto [_A, _B, _C, _P, _W1, _W2] = alex::pointers::partition<
-        std::array<T, 3>,
-        std::array<T, 3>,
-        std::array<T, 3>,
-        T,
-        T,
-        T>(
-        cache,
-        {m * n * p, m * n * p, m * n * p, m * n * p, m * n * p, m * n * p}
-    );
-
-    alex::arrays::shuffle_rt<3, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    alex::arrays::shuffle_rt<3, decltype(_P)> P(std::move(_P), individual),
-        W1(std::move(_W1), individual), W2(std::move(_W2), individual);
+    for (const auto & [line, sets, depth] : g) {
+        geometries.push_back({line, sets, depth});
+    }
 
-    alex::patterns::himeno(A, B, C, P, W1, W2);
+    return alex::sim::stack_distance(geometries);
 }
 
-template <std::floating_point T>
-std::size_t _Himeno_bench_entry(const std::vector<std::size_t> & individual)
+void stack_distance_process(
+    alex::sim::stack_distance & profile,
+    pybind11::array_t<std::uint64_t, pybind11::array::c_style> addresses,
+    pybind11::array_t<std::uint8_t, pybind11::array::c_style> ops,
+    pybind11::array_t<std::uint32_t, pybind11::array::c_style> lengths
+)
 {
-    auto [m, n, p] = size_getter<3>(individual);
-
-    auto [_A, _B, _C, _P, _W1, _W2] = alex::pointers::allocate_multiple<
-        std::array<T, 3>,
-        std::array<T, 3>,
-        std::array<T, 3>,
-        T,
-        T,
-        T>({m * n * p, m * n * p, m * n * p, m * n * p, m * n * p, m * n * p});
-
-    alex::arrays::shuffle_rt<3, decltype(_A)> A(std::move(_A), individual),
-        B(std::move(_B), individual), C(std::move(_C), individual);
-
-    alex::arrays::shuffle_rt<3, decltype(_P)> P(std::move(_P), individual),
-        W1(std::move(_W1), individual), W2(std::move(_W2), individual);
+    if (ops.size() != addresses.size() || lengths.size() != addresses.size()) {
+        throw std::invalid_argument("access buffers differ in length");
+    }
 
-    std::chrono::high_resolution_clock::time_point t1 =
-        std::chrono::high_resolution_clock::now();
+    pybind11::gil_scoped_release release;
 
-    alex::patterns::himeno(A, B, C, P, W1, W2);
+    profile.process(
+        addresses.data(), ops.data(), lengths.data(), addresses.size()
+    );
+}
 
-    std::chrono::high_resolution_clock::time_point t2 =
-        std::chrono::high_resolution_clock::now();
+pybind11::list
+stack_distance_histograms(const alex::sim::stack_distance & profile)
+{
+    pybind11::list out;
+
+    for (const alex::sim::stack_distance::state & s : profile.get_states()) {
+        pybind11::dict d;
+
+        d["line"] = s.config.line;
+        d["sets"] = s.config.sets;
+        d["depth"] = s.config.depth;
+        d["load"] = to_numpy(s.histogram[0], 1).attr("ravel")();
+        d["store"] = to_numpy(s.histogram[1], 1).attr("ravel")();
+        d["load_cold"] = s.cold[0];
+        d["store_cold"] = s.cold[1];
+        d["load_far"] = s.far[0];
+        d["store_far"] = s.far[1];
+
+        out.append(d);
+    }
 
-    return std::chrono::duration_cast<std::chrono::nanoseconds>(t2 - t1).count(
-    );
+    return out;
 }
 
-#define GLUE_HELPER(x, y) x##y
-#define GLUE(x, y) GLUE_HELPER(x, y)
-
-#define REGISTER(NAME)                                                         \
-    do {                                                                       \
-        m.def(                                                                 \
-            "_" #NAME "_double_sim_entry",                                     \
-            &GLUE(_, GLUE(NAME, _sim_entry)) < double >                        \
-        );                                                                     \
-        m.def(                                                                 \
-            "_" #NAME "_single_sim_entry",                                     \
-            &GLUE(_, GLUE(NAME, _sim_entry)) < float >                         \
-        );                                                                     \
-        m.def(                                                                 \
-            "_" #NAME "_double_bench_entry",                                   \
-            &GLUE(_, GLUE(NAME, _bench_entry)) < double >                      \
-        );                                                                     \
-        m.def(                                                                 \
-            "_" #NAME "_single_bench_entry",                                   \
-            &GLUE(_, GLUE(NAME, _bench_entry)) < float >                       \
-        );                                                                     \
+/*
+ * The extension is built once for every implementation of the bit deposit,
+ * each variant under a module name of its own.
+ */
+#ifndef ALEX_MODULE
+#define ALEX_MODULE __alex_core
+#endif
+
+#define REGISTER(NAME)                                                                                 \
+    do {                                                                                               \
+        m.def(                                                                                         \
+            "_" #NAME "_double_sim_entry",                                                             \
+            &sim_entry<entries::NAME, double>,                                                         \
+            pybind11::arg("cache"),                                                                    \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def(                                                                                         \
+            "_" #NAME "_single_sim_entry",                                                             \
+            &sim_entry<entries::NAME, float>,                                                          \
+            pybind11::arg("cache"),                                                                    \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def("_" #NAME "_double_bench_entry", &bench_entry<entries::NAME, double>);                   \
+        m.def("_" #NAME "_single_bench_entry", &bench_entry<entries::NAME, float>);                    \
+        m.def("_" #NAME "_double_bench_threaded_entry", &bench_threaded_entry<entries::NAME, double>); \
+        m.def("_" #NAME "_single_bench_threaded_entry", &bench_threaded_entry<entries::NAME, float>);  \
+        m.def("_" #NAME "_double_bench_counters_entry", &bench_counters_entry<entries::NAME, double>); \
+        m.def("_" #NAME "_single_bench_counters_entry", &bench_counters_entry<entries::NAME, float>);  \
+        m.def("_" #NAME "_double_bench_repeated_entry", &bench_repeated_entry<entries::NAME, double>); \
+        m.def("_" #NAME "_single_bench_repeated_entry", &bench_repeated_entry<entries::NAME, float>);  \
+        m.def(                                                                                         \
+            "_" #NAME "_double_trace_entry",                                                           \
+            &trace_entry<entries::NAME, double>,                                                       \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def(                                                                                         \
+            "_" #NAME "_single_trace_entry",                                                           \
+            &trace_entry<entries::NAME, float>,                                                        \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def(                                                                                         \
+            "_" #NAME "_double_native_entry",                                                          \
+            &native_entry<entries::NAME, double>,                                                      \
+            pybind11::arg("hierarchy"),                                                                \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def(                                                                                         \
+            "_" #NAME "_single_native_entry",                                                          \
+            &native_entry<entries::NAME, float>,                                                       \
+            pybind11::arg("hierarchy"),                                                                \
+            individual,                                                                                \
+            alignment                                                                                  \
+        );                                                                                             \
+        m.def("_" #NAME "_double_native_batch_entry", &native_batch_entry<entries::NAME, double>);     \
+        m.def("_" #NAME "_single_native_batch_entry", &native_batch_entry<entries::NAME, float>);      \
+        m.def("_" #NAME "_double_sampled_entry", &sampled_entry<entries::NAME, double>);               \
+        m.def("_" #NAME "_single_sampled_entry", &sampled_entry<entries::NAME, float>);                \
+        m.def("_" #NAME "_double_reuse_entry", &reuse_entry<entries::NAME, double>);                   \
+        m.def("_" #NAME "_single_reuse_entry", &reuse_entry<entries::NAME, float>);                    \
     } while (0)
 
-PYBIND11_MODULE(__alex_core, m)
+PYBIND11_MODULE(ALEX_MODULE, m)
 {
+    pybind11::class_<alex::sim::hierarchy>(
+        m, "Hierarchy", pybind11::module_local()
+    )
+        .def(pybind11::init(&make_hierarchy))
+        .def("process", &hierarchy_process)
+        .def("force_write_back", &alex::sim::hierarchy::force_write_back)
+        .def("reset", &alex::sim::hierarchy::reset)
+        .def("stats", &hierarchy_stats);
+
+    pybind11::class_<alex::sim::sampler>(
+        m, "SetSampler", pybind11::module_local()
+    )
+        .def(
+            pybind11::init<
+                const std::vector<alex::sim::hierarchy *> &,
+                std::int64_t,
+                const std::vector<std::int64_t> &>(),
+            pybind11::keep_alive<1, 2>()
+        )
+        .def("process", &sampler_process)
+        .def("extra", &alex::sim::sampler::get_extra);
+
+    pybind11::class_<alex::sim::stack_distance>(
+        m, "StackDistance", pybind11::module_local()
+    )
+        .def(pybind11::init(&make_stack_distance))
+        .def("process", &stack_distance_process)
+        .def("reset", &alex::sim::stack_distance::reset)
+        .def("histograms", &stack_distance_histograms)
+        .def(
+            "loads",
+            [](const alex::sim::stack_distance & s) { return s.get_count(0); }
+        )
+        .def("stores", [](const alex::sim::stack_distance & s) {
+            return s.get_count(1);
+        });
+
+    /*
+     * The simulated and traced arrays are placed at multiples of the given
+     * alignment, which callers may raise to start every array on a line.
+     */
+    const pybind11::arg individual("individual");
+    const pybind11::arg_v alignment = pybind11::arg("alignment") =
+        std::size_t{0xFFFFFFFF};
+
     REGISTER(MMijk);
     REGISTER(MMTijk);
     REGISTER(MMikj);
@@ -417,4 +498,6 @@ PYBIND11_MODULE(__alex_core, m)
     REGISTER(Cholesky);
     REGISTER(Himeno);
     REGISTER(Crout);
+
+    m.def("_replay_sim_entry", &replay_sim_entry);
 }
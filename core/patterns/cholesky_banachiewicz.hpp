@@ -4,33 +4,57 @@
 #include <cstddef>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<2> M>
-void cholesky_banachiewicz(const M & A, M & L)
+void cholesky_banachiewicz(const M & A, M & L, const utils::team & t = {})
 {
     auto [m, n] = A.get_size();
 
     assert(m == n);
 
     for (std::size_t i = 0; i < m; ++i) {
+        if (!t.owns(i)) {
+            continue;
+        }
+
+        auto aii = A.cursor({i, i});
+        auto li = L.cursor({i, 0});
+        auto lj = L.cursor({0, 0});
+        auto ljj = L.cursor({0, 0});
+        auto lij = li;
+
         for (std::size_t j = 0; j <= i; ++j) {
+            if (j < i) {
+                t.wait(j + 1);
+            }
+
             typename M::value_type sum = 0;
+            auto lik = li;
+            auto ljk = lj;
 
             for (std::size_t k = 0; k < j; ++k) {
-                sum += L.load(i, k) * L.load(j, k);
+                sum += lik.load() * ljk.load();
+
+                lik.advance(1);
+                ljk.advance(1);
             }
 
             if (i == j)
-                L.store(std::sqrt(A.load(i, i) - sum), i, j);
+                lij.store(std::sqrt(aii.load() - sum));
             else
-                L.store(
-                    static_cast<typename M::value_type>(1.0) / L.load(j, j) *
-                        (A.load(i, i) - sum),
-                    i,
-                    j
+                lij.store(
+                    static_cast<typename M::value_type>(1.0) / ljj.load() *
+                    (aii.load() - sum)
                 );
+
+            lj.advance(0);
+            ljj.advance(0).advance(1);
+            lij.advance(1);
         }
+
+        t.complete(i + 1);
     }
 }
 }
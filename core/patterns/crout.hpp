@@ -5,39 +5,88 @@
 #include <memory>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<2> M>
-void crout(const M & A, M & L, M & U)
+void crout(const M & A, M & L, M & U, const utils::team & t = {})
 {
     auto [m, n] = A.get_size();
 
     assert(m == n);
 
-    for (std::size_t i = 0; i < n; ++i) {
-        U.store(1.0, i, i);
+    const auto [lo, hi] = t.share(0, n);
+
+    auto uii = U.cursor({lo, lo});
+
+    for (std::size_t i = lo; i < hi; ++i) {
+        uii.store(1.0);
+
+        uii.advance(0).advance(1);
     }
 
+    t.sync();
+
+    auto ljj = L.cursor({0, 0});
+    auto lj = L.cursor({0, 0});
+    auto uj = U.cursor({0, 0});
+
     for (std::size_t j = 0; j < n; ++j) {
-        for (std::size_t i = j; i < n; ++i) {
+        const auto [jlo, jhi] = t.share(j, n);
+
+        auto li = L.cursor({jlo, 0});
+        auto aij = A.cursor({jlo, j});
+        auto lij = L.cursor({jlo, j});
+
+        for (std::size_t i = jlo; i < jhi; ++i) {
             typename M::value_type sum = 0;
+            auto lik = li;
+            auto ukj = uj;
 
             for (std::size_t k = 0; k < j; ++k) {
-                sum += L.load(i, k) * U.load(k, j);
+                sum += lik.load() * ukj.load();
+
+                lik.advance(1);
+                ukj.advance(0);
             }
 
-            L.store(A.load(i, j) - sum, i, j);
+            lij.store(aij.load() - sum);
+
+            li.advance(0);
+            aij.advance(0);
+            lij.advance(0);
         }
 
-        for (std::size_t i = j; i < n; ++i) {
+        t.sync();
+
+        auto ui = U.cursor({0, jlo});
+        auto aji = A.cursor({j, jlo});
+        auto uji = U.cursor({j, jlo});
+
+        for (std::size_t i = jlo; i < jhi; ++i) {
             typename M::value_type sum = 0;
+            auto ljk = lj;
+            auto uki = ui;
 
             for (std::size_t k = 0; k < j; ++k) {
-                sum += L.load(j, k) * U.load(k, i);
+                sum += ljk.load() * uki.load();
+
+                ljk.advance(1);
+                uki.advance(0);
             }
 
-            U.store((A.load(j, i) - sum) / L.load(j, j), j, i);
+            uji.store((aji.load() - sum) / ljj.load());
+
+            ui.advance(1);
+            aji.advance(1);
+            uji.advance(1);
         }
+
+        t.sync();
+
+        ljj.advance(0).advance(1);
+        lj.advance(0);
+        uj.advance(1);
     }
 }
 }
@@ -5,43 +5,96 @@
 #include <cstddef>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<3> M, concepts::array<3> N>
 void himeno(
-    const M & A, const M & B, const M & C, const N & P, const N & W1, N & W2
+    const M & A,
+    const M & B,
+    const M & C,
+    const N & P,
+    const N & W1,
+    N & W2,
+    const utils::team & t = {}
 ) requires
     std::same_as<typename M::value_type::value_type, typename N::value_type>
 {
     auto [m, n, p] = W2.get_size();
+    const auto [lo, hi] = t.share(1, m - 1);
+
+    auto ai = A.cursor({lo, 1, 1});
+    auto bi = B.cursor({lo, 1, 1});
+    auto ci = C.cursor({lo, 1, 1});
+    auto pi = P.cursor({lo, 1, 1});
+    auto w1i = W1.cursor({lo, 1, 1});
+    auto w2i = W2.cursor({lo, 1, 1});
+
+    for (std::size_t i = lo; i < hi; ++i) {
+        auto aj = ai;
+        auto bj = bi;
+        auto cj = ci;
+        auto pj = pi;
+        auto w1j = w1i;
+        auto w2j = w2i;
 
-    for (std::size_t i = 1; i < m - 1; ++i) {
         for (std::size_t j = 1; j < n - 1; ++j) {
+            auto ak = aj;
+            auto bk = bj;
+            auto ck = cj;
+            auto pk = pj;
+            auto w1k = w1j;
+            auto w2k = w2j;
+
             for (std::size_t k = 1; k < p - 1; ++k) {
-                typename M::value_type vA = A.load(i, j, k);
-                typename M::value_type vB = B.load(i, j, k);
-                typename M::value_type vC = C.load(i, j, k);
+                typename M::value_type vA = ak.load();
+                typename M::value_type vB = bk.load();
+                typename M::value_type vC = ck.load();
 
                 typename N::value_type s0 =
-                    vA[0] * P.load(i, j, k) + vA[1] * P.load(i, j + 1, k) +
-                    vA[2] * P.load(i, j, k + 1) +
+                    vA[0] * pk.load() + vA[1] * pk.next(1).load() +
+                    vA[2] * pk.next(2).load() +
                     vB[0] *
-                        (P.load(i + 1, j + 1, k) - P.load(i + 1, j - 1, k) -
-                         P.load(i - 1, j + 1, k) + P.load(i - 1, j - 1, k)) +
+                        (pk.next(0).next(1).load() - pk.next(0).prev(1).load() -
+                         pk.prev(0).next(1).load() +
+                         pk.prev(0).prev(1).load()) +
                     vB[1] *
-                        (P.load(i, j + 1, k + 1) - P.load(i, j - 1, k + 1) -
-                         P.load(i, j + 1, k - 1) + P.load(i, j - 1, k - 1)) +
+                        (pk.next(1).next(2).load() - pk.prev(1).next(2).load() -
+                         pk.next(1).prev(2).load() +
+                         pk.prev(1).prev(2).load()) +
                     vB[2] *
-                        (P.load(i + 1, j, k + 1) - P.load(i - 1, j, k + 1) -
-                         P.load(i + 1, j, k - 1) + P.load(i - 1, j, k - 1)) +
-                    vC[0] * P.load(i - 1, j, k) + vC[1] * P.load(i, j - 1, k) +
-                    vC[2] * P.load(i, j, k - 1) + W1.load(i, j, k);
+                        (pk.next(0).next(2).load() - pk.prev(0).next(2).load() -
+                         pk.next(0).prev(2).load() +
+                         pk.prev(0).prev(2).load()) +
+                    vC[0] * pk.prev(0).load() + vC[1] * pk.prev(1).load() +
+                    vC[2] * pk.prev(2).load() + w1k.load();
 
-                auto ss = ((s0 / 6.0f) - P.load(i, j, k));
+                auto ss = ((s0 / 6.0f) - pk.load());
 
-                W2.store(P.load(i, j, k) + 0.8 * ss, i, j, k);
+                w2k.store(pk.load() + 0.8 * ss);
+
+                ak.advance(2);
+                bk.advance(2);
+                ck.advance(2);
+                pk.advance(2);
+                w1k.advance(2);
+                w2k.advance(2);
             }
+
+            aj.advance(1);
+            bj.advance(1);
+            cj.advance(1);
+            pj.advance(1);
+            w1j.advance(1);
+            w2j.advance(1);
         }
+
+        ai.advance(0);
+        bi.advance(0);
+        ci.advance(0);
+        pi.advance(0);
+        w1i.advance(0);
+        w2i.advance(0);
     }
 }
 }
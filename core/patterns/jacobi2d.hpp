@@ -3,43 +3,57 @@
 #include <cstddef>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<2> M>
-void jacobi2d(const M & A, M & B)
+void jacobi2d(const M & A, M & B, const utils::team & t = {})
 {
     auto [m, n] = B.get_size();
+    const auto [lo, hi] = t.share(0, m);
+
+    auto ai = A.cursor({lo, 0});
+    auto bi = B.cursor({lo, 0});
+
+    for (std::size_t i = lo; i < hi; ++i) {
+        auto aij = ai;
+        auto bij = bi;
 
-    for (std::size_t i = 0; i < m; ++i) {
         for (std::size_t j = 0; j < n; ++j) {
             typename M::value_type v1, v2, v3, v4;
 
             if (i > 0) {
-                v1 = A.load(i - 1, j);
+                v1 = aij.prev(0).load();
             } else {
                 v1 = 0.f;
             }
 
             if (j > 0) {
-                v2 = A.load(i, j - 1);
+                v2 = aij.prev(1).load();
             } else {
                 v2 = 0.f;
             }
 
             if (i < m - 1) {
-                v3 = A.load(i + 1, j);
+                v3 = aij.next(0).load();
             } else {
                 v3 = 0.f;
             }
 
             if (j < n - 1) {
-                v4 = A.load(i, j + 1);
+                v4 = aij.next(1).load();
             } else {
                 v4 = 0.f;
             }
 
-            B.store(0.25f * (v1 + v2 + v3 + v4), i, j);
+            bij.store(0.25f * (v1 + v2 + v3 + v4));
+
+            aij.advance(1);
+            bij.advance(1);
         }
+
+        ai.advance(0);
+        bi.advance(0);
     }
 }
 }
@@ -3,23 +3,42 @@
 #include <cstddef>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<2> M>
-void mmt_ijk(const M & A, const M & B, M & C)
+void mmt_ijk(const M & A, const M & B, M & C, const utils::team & t = {})
 {
     auto [m, n] = C.get_size();
+    const auto [lo, hi] = t.share(0, m);
+
+    auto ai = A.cursor({lo, 0});
+    auto ci = C.cursor({lo, 0});
+
+    for (std::size_t i = lo; i < hi; ++i) {
+        auto bj = B.cursor({0, 0});
+        auto cij = ci;
 
-    for (std::size_t i = 0; i < m; ++i) {
         for (std::size_t j = 0; j < m; ++j) {
             typename M::value_type acc = 0.;
+            auto aik = ai;
+            auto bjk = bj;
 
             for (std::size_t k = 0; k < n; ++k) {
-                acc += A.load(i, k) * B.load(j, k);
+                acc += aik.load() * bjk.load();
+
+                aik.advance(1);
+                bjk.advance(1);
             }
 
-            C.store(acc, i, j);
+            cij.store(acc);
+
+            bj.advance(0);
+            cij.advance(1);
         }
+
+        ai.advance(0);
+        ci.advance(0);
     }
 }
 }
@@ -3,19 +3,39 @@
 #include <cstddef>
 
 #include "concepts/array.hpp"
+#include "utils/team.hpp"
 
 namespace alex::patterns {
 template <concepts::array<2> M>
-void mmt_ikj(const M & A, const M & B, M & C)
+void mmt_ikj(const M & A, const M & B, M & C, const utils::team & t = {})
 {
     auto [m, n] = C.get_size();
+    const auto [lo, hi] = t.share(0, m);
+
+    auto ai = A.cursor({lo, 0});
+    auto ci = C.cursor({lo, 0});
+
+    for (std::size_t i = lo; i < hi; ++i) {
+        auto aik = ai;
+        auto bk = B.cursor({0, 0});
 
-    for (std::size_t i = 0; i < m; ++i) {
         for (std::size_t k = 0; k < n; ++k) {
+            auto cij = ci;
+            auto bjk = bk;
+
             for (std::size_t j = 0; j < m; ++j) {
-                C.store(C.load(i, j) + A.load(i, k) * B.load(j, k), i, j);
+                cij.store(cij.load() + aik.load() * bjk.load());
+
+                cij.advance(1);
+                bjk.advance(0);
             }
+
+            aik.advance(1);
+            bk.advance(1);
         }
+
+        ai.advance(0);
+        ci.advance(0);
     }
 }
 }
@@ -0,0 +1,138 @@
+#pragma once
+
+#include <array>
+#include <cerrno>
+#include <cstddef>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <tuple>
+#include <utility>
+
+#include <sys/mman.h>
+#include <unistd.h>
+
+#include "pointers/offsets.hpp"
+
+namespace alex::pointers {
+enum class huge_pages {
+    none,
+    transparent,
+    explicit_
+};
+
+huge_pages parse_huge_pages(const std::string & s)
+{
+    if (s == "none") {
+        return huge_pages::none;
+    } else if (s == "transparent") {
+        return huge_pages::transparent;
+    } else if (s == "explicit") {
+        return huge_pages::explicit_;
+    }
+
+    throw std::invalid_argument("unknown huge page mode " + s);
+}
+
+std::size_t page_size(huge_pages mode)
+{
+    return mode == huge_pages::none
+               ? static_cast<std::size_t>(sysconf(_SC_PAGESIZE))
+               : std::size_t(2) << 20;
+}
+
+template <typename T>
+class arena_pointer
+{
+public:
+    using value_type = T;
+
+    arena_pointer(T * _ptr)
+        : ptr(_ptr)
+    {
+    }
+
+    inline T load(const std::size_t & i) const
+    {
+        return ptr[i];
+    }
+
+    inline void store(const std::size_t & i, const T & v)
+    {
+        ptr[i] = v;
+    }
+
+private:
+    T * ptr;
+};
+
+/*
+ * A single mapping from which all arrays of a benchmark are allocated, each
+ * starting at a page boundary. The mapping is optionally backed by huge
+ * pages, either transparent ones, which the kernel may or may not provide,
+ * or explicit ones from the hugetlbfs pool, which must have been reserved.
+ * Every page is touched when the arena is created, so that no page faults
+ * occur in the timed region.
+ */
+class arena
+{
+public:
+    arena(std::size_t bytes, huge_pages mode)
+        : size(
+              (std::max<std::size_t>(bytes, 1) + page_size(mode) - 1) /
+              page_size(mode) * page_size(mode)
+          )
+    {
+        int flags = MAP_PRIVATE | MAP_ANONYMOUS;
+
+        if (mode == huge_pages::explicit_) {
+            flags |= MAP_HUGETLB;
+        }
+
+        base = mmap(nullptr, size, PROT_READ | PROT_WRITE, flags, -1, 0);
+
+        if (base == MAP_FAILED) {
+            throw std::runtime_error(
+                "cannot map " + std::to_string(size) +
+                " bytes for the arena: " + std::strerror(errno)
+            );
+        }
+
+        if (mode == huge_pages::transparent) {
+            madvise(base, size, MADV_HUGEPAGE);
+        }
+
+        std::memset(base, 0, size);
+    }
+
+    arena(const arena &) = delete;
+    arena & operator=(const arena &) = delete;
+
+    ~arena()
+    {
+        munmap(base, size);
+    }
+
+    template <typename... Ts>
+    std::tuple<arena_pointer<Ts>...>
+    partition(const std::array<std::size_t, sizeof...(Ts)> & offsets)
+    {
+        return partition_helper<Ts...>(
+            offsets, std::make_index_sequence<sizeof...(Ts)>()
+        );
+    }
+
+private:
+    template <typename... Ts, std::size_t... Is>
+    std::tuple<arena_pointer<Ts>...>
+    partition_helper(const std::array<std::size_t, sizeof...(Ts)> & offsets, std::index_sequence<Is...>)
+    {
+        return {arena_pointer<Ts>(
+            reinterpret_cast<Ts *>(static_cast<char *>(base) + offsets[Is])
+        )...};
+    }
+
+    std::size_t size;
+    void * base;
+};
+}
@@ -0,0 +1,21 @@
+#pragma once
+
+#include <cstddef>
+
+namespace alex::pointers {
+template <typename T>
+class null_pointer
+{
+public:
+    using value_type = T;
+
+    inline T load(const std::size_t &) const
+    {
+        return T();
+    }
+
+    inline void store(const std::size_t &, const T &)
+    {
+    }
+};
+}
@@ -0,0 +1,30 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+
+namespace alex::pointers {
+template <typename... Ts>
+std::array<std::size_t, sizeof...(Ts)> offsets(
+    const std::array<std::size_t, sizeof...(Ts)> & sizes,
+    std::size_t alignment = 0xFFFFFFFF
+)
+{
+    constexpr std::array<std::size_t, sizeof...(Ts)> element_sizes{
+        sizeof(Ts)...};
+
+    std::array<std::size_t, sizeof...(Ts)> out;
+    std::size_t current = 0;
+
+    for (std::size_t i = 0; i < sizeof...(Ts); ++i) {
+        if (current % alignment != 0) {
+            current += (alignment - (current % alignment));
+        }
+
+        out[i] = current;
+        current += element_sizes[i] * sizes[i];
+    }
+
+    return out;
+}
+}
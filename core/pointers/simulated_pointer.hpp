@@ -1,18 +1,21 @@
 #pragma once
 
+#include <array>
 #include <cstddef>
+#include <tuple>
+#include <utility>
 
 #include "cachesim.hpp"
-#include "utils/tail.hpp"
+#include "pointers/offsets.hpp"
 
 namespace alex::pointers {
-template <typename T>
+template <typename T, typename C = Cache>
 class simulated_pointer
 {
 public:
     using value_type = T;
 
-    simulated_pointer(Cache & _cache, std::size_t _begin)
+    simulated_pointer(C & _cache, std::size_t _begin)
         : cache(_cache)
         , begin(_begin)
     {
@@ -20,62 +23,39 @@ public:
 
     inline T load(const std::size_t & i) const
     {
-        Cache__load(
-            &cache, {static_cast<long int>(begin + i * sizeof(T)), sizeof(T)}
-        );
+        cache_load(cache, begin + i * sizeof(T), sizeof(T));
 
         return T();
     }
 
     inline void store(const std::size_t & i, const T &)
     {
-        Cache__store(
-            &cache, {static_cast<long int>(begin + i * sizeof(T)), sizeof(T)}, 0
-        );
+        cache_store(cache, begin + i * sizeof(T), sizeof(T));
     }
 
 private:
-    Cache & cache;
+    C & cache;
     std::size_t begin;
 };
 
-template <typename T, typename... Ts>
-std::tuple<simulated_pointer<T>, simulated_pointer<Ts>...> partition_helper(
-    Cache & cache,
-    const std::array<std::size_t, sizeof...(Ts) + 1> & sizes,
-    std::size_t alignment,
-    std::size_t current
-)
+template <typename C, typename... Ts, std::size_t... Is>
+std::tuple<simulated_pointer<Ts, C>...>
+partition_helper(C & cache, const std::array<std::size_t, sizeof...(Ts)> & offsets, std::index_sequence<Is...>)
 {
-    if (current % alignment != 0) {
-        current += (alignment - (current % alignment));
-    }
-
-    assert(current % alignment == 0);
-
-    if constexpr (sizeof...(Ts) == 0) {
-        return std::tuple<simulated_pointer<T>>(
-            simulated_pointer<T>(cache, current)
-        );
-    } else {
-        return std::tuple_cat(
-            std::tuple<simulated_pointer<T>>(
-                simulated_pointer<T>(cache, current)
-            ),
-            partition_helper<Ts...>(
-                cache, tail(sizes), alignment, current + (sizeof(T) * sizes[0])
-            )
-        );
-    }
+    return {simulated_pointer<Ts, C>(cache, offsets[Is])...};
 }
 
-template <typename... Ts>
-std::tuple<simulated_pointer<Ts>...> partition(
-    Cache & cache,
+template <typename... Ts, typename C>
+std::tuple<simulated_pointer<Ts, C>...> partition(
+    C & cache,
     const std::array<std::size_t, sizeof...(Ts)> & sizes,
     std::size_t alignment = 0xFFFFFFFF
 )
 {
-    return partition_helper<Ts...>(cache, sizes, alignment, 0UL);
+    return partition_helper<C, Ts...>(
+        cache,
+        offsets<Ts...>(sizes, alignment),
+        std::make_index_sequence<sizeof...(Ts)>()
+    );
 }
 }
@@ -0,0 +1,326 @@
+#pragma once
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <stdexcept>
+#include <string>
+#include <vector>
+
+namespace alex::sim {
+struct counter {
+    std::int64_t count = 0;
+    std::int64_t byte = 0;
+
+    inline void add(std::int64_t bytes)
+    {
+        ++count;
+        byte += bytes;
+    }
+};
+
+struct level_config {
+    std::string name;
+    std::int64_t sets;
+    std::int64_t ways;
+    std::int64_t line;
+    bool write_back;
+    bool write_allocate;
+    std::int64_t load_from;
+    std::int64_t store_to;
+    std::int64_t victims_to;
+};
+
+/*
+ * A native model of an LRU cache hierarchy which reproduces the behaviour
+ * and the statistics of pycachesim exactly, but without the per-access call
+ * overhead. Every set is an array of packed 64-bit entries ordered from most
+ * to least recently used, holding the cache line identifier in the upper 63
+ * bits and the dirty flag in the lowest bit. As pycachesim only ever inserts
+ * at the front of a set, invalid entries are always at the back, so we only
+ * keep a fill count per set rather than a validity flag per entry.
+ */
+class hierarchy
+{
+public:
+    struct level {
+        level_config config;
+        std::int64_t line_bits;
+        std::vector<std::uint64_t> entries;
+        std::vector<std::uint32_t> fill;
+
+        counter LOAD, STORE, HIT, MISS, EVICT;
+    };
+
+    hierarchy(
+        const std::vector<level_config> & configs,
+        std::size_t _first,
+        const std::vector<std::size_t> & _order
+    )
+        : first(_first)
+        , order(_order)
+    {
+        for (const level_config & c : configs) {
+            if (c.line <= 0 || (c.line & (c.line - 1)) != 0) {
+                throw std::invalid_argument(
+                    "line size of " + c.name + " must be a power of two"
+                );
+            }
+
+            level l;
+
+            l.config = c;
+            l.line_bits = 0;
+
+            while ((std::int64_t{1} << l.line_bits) < c.line) {
+                ++l.line_bits;
+            }
+
+            l.entries.resize(c.sets * c.ways);
+            l.fill.resize(c.sets);
+
+            levels.push_back(std::move(l));
+        }
+    }
+
+    inline void load(std::uint64_t addr, std::uint64_t length)
+    {
+        load(levels[first], addr, length);
+    }
+
+    inline void store(std::uint64_t addr, std::uint64_t length)
+    {
+        store(levels[first], addr, length, false);
+    }
+
+    void process(
+        const std::uint64_t * addresses,
+        const std::uint8_t * ops,
+        const std::uint32_t * lengths,
+        std::size_t n
+    )
+    {
+        level & l = levels[first];
+
+        for (std::size_t i = 0; i < n; ++i) {
+            if (ops[i] == 0) {
+                load(l, addresses[i], lengths[i]);
+            } else {
+                store(l, addresses[i], lengths[i], false);
+            }
+        }
+    }
+
+    void force_write_back()
+    {
+        for (std::size_t i : order) {
+            level & l = levels[i];
+
+            for (std::int64_t s = 0; s < l.config.sets; ++s) {
+                for (std::uint32_t w = 0; w < l.fill[s]; ++w) {
+                    std::uint64_t & e = l.entries[s * l.config.ways + w];
+
+                    if (e & 1) {
+                        l.EVICT.add(l.config.line);
+
+                        if (l.config.store_to >= 0) {
+                            store(
+                                levels[l.config.store_to],
+                                (e >> 1) << l.line_bits,
+                                l.config.line,
+                                false
+                            );
+                        }
+
+                        e &= ~std::uint64_t{1};
+                    }
+                }
+            }
+        }
+    }
+
+    void reset()
+    {
+        for (level & l : levels) {
+            std::fill(l.fill.begin(), l.fill.end(), 0);
+            l.LOAD = l.STORE = l.HIT = l.MISS = l.EVICT = counter();
+        }
+    }
+
+    const std::vector<level> & get_levels() const
+    {
+        return levels;
+    }
+
+private:
+    inline std::int64_t set_of(const level & l, std::uint64_t cl) const
+    {
+        return static_cast<std::int64_t>(
+            cl % static_cast<std::uint64_t>(l.config.sets)
+        );
+    }
+
+    inline std::int64_t
+    location(const level & l, std::uint64_t cl, std::int64_t set) const
+    {
+        const std::uint64_t * e = &l.entries[set * l.config.ways];
+
+        for (std::uint32_t w = 0; w < l.fill[set]; ++w) {
+            if ((e[w] >> 1) == cl) {
+                return w;
+            }
+        }
+
+        return -1;
+    }
+
+    void inject(level & l, std::uint64_t entry)
+    {
+        const std::int64_t set = set_of(l, entry >> 1);
+        std::uint64_t * e = &l.entries[set * l.config.ways];
+        std::uint32_t & fill = l.fill[set];
+
+        if (fill < l.config.ways) {
+            std::copy_backward(e, e + fill, e + fill + 1);
+            e[0] = entry;
+            ++fill;
+            return;
+        }
+
+        const std::uint64_t replaced = e[l.config.ways - 1];
+
+        std::copy_backward(e, e + l.config.ways - 1, e + l.config.ways);
+        e[0] = entry;
+
+        if (l.config.write_back && (replaced & 1)) {
+            l.EVICT.add(l.config.line);
+
+            if (l.config.store_to >= 0) {
+                store(
+                    levels[l.config.store_to],
+                    (replaced >> 1) << l.line_bits,
+                    l.config.line,
+                    false
+                );
+            }
+        } else if (l.config.victims_to >= 0) {
+            level & v = levels[l.config.victims_to];
+
+            inject(v, replaced);
+
+            l.EVICT.add(l.config.line);
+            v.STORE.add(l.config.line);
+        }
+    }
+
+    std::int64_t load(level & l, std::uint64_t addr, std::uint64_t length)
+    {
+        l.LOAD.add(length);
+
+        const std::int64_t bytes =
+            std::min<std::int64_t>(l.config.line, length);
+        const std::uint64_t last = (addr + length - 1) >> l.line_bits;
+
+        std::int64_t placement = -1;
+
+        for (std::uint64_t cl = addr >> l.line_bits; cl <= last; ++cl) {
+            const std::int64_t set = set_of(l, cl);
+            const std::int64_t loc = location(l, cl, set);
+
+            if (loc != -1) {
+                l.HIT.add(bytes);
+
+                std::uint64_t * e = &l.entries[set * l.config.ways];
+                const std::uint64_t entry = e[loc];
+
+                std::copy_backward(e, e + loc, e + loc + 1);
+                e[0] = entry;
+
+                placement = 0;
+                continue;
+            }
+
+            l.MISS.add(bytes);
+
+            bool victim_hit = false;
+
+            if (l.config.victims_to >= 0) {
+                level & v = levels[l.config.victims_to];
+
+                if (location(v, cl, set_of(v, cl)) != -1) {
+                    load(v, cl << l.line_bits, l.config.line);
+                    victim_hit = true;
+                }
+            }
+
+            if (!victim_hit && l.config.load_from >= 0) {
+                load(
+                    levels[l.config.load_from], cl << l.line_bits, l.config.line
+                );
+            }
+
+            inject(l, cl << 1);
+            placement = 0;
+        }
+
+        return placement;
+    }
+
+    void store(
+        level & l, std::uint64_t addr, std::uint64_t length, bool non_temporal
+    )
+    {
+        l.STORE.add(length);
+
+        const std::uint64_t last = (addr + length - 1) >> l.line_bits;
+
+        for (std::uint64_t cl = addr >> l.line_bits; cl <= last; ++cl) {
+            const std::int64_t set = set_of(l, cl);
+            std::int64_t loc = location(l, cl, set);
+
+            if (l.config.write_allocate && !non_temporal) {
+                if (loc == -1) {
+                    loc = load(l, cl << l.line_bits, l.config.line);
+                }
+            } else if (loc == -1 && l.config.write_back) {
+                inject(l, (cl << 1) | 1);
+                loc = 0;
+            }
+
+            if (l.config.write_back && loc != -1) {
+                l.entries[set * l.config.ways + loc] |= 1;
+            } else if (l.config.store_to >= 0) {
+                const std::uint64_t begin =
+                    std::max<std::uint64_t>(cl << l.line_bits, addr);
+                const std::uint64_t length_in_line =
+                    begin + l.config.line < addr + length
+                        ? l.config.line
+                        : addr + length - begin;
+
+                l.EVICT.add(length_in_line);
+
+                store(
+                    levels[l.config.store_to],
+                    begin,
+                    length_in_line,
+                    non_temporal
+                );
+            }
+        }
+    }
+
+    std::vector<level> levels;
+    std::size_t first;
+    std::vector<std::size_t> order;
+};
+
+inline void cache_load(hierarchy & h, std::size_t addr, std::size_t length)
+{
+    h.load(addr, length);
+}
+
+inline void cache_store(hierarchy & h, std::size_t addr, std::size_t length)
+{
+    h.store(addr, length);
+}
+}
@@ -0,0 +1,121 @@
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <stdexcept>
+#include <vector>
+
+#include "sim/hierarchy.hpp"
+
+namespace alex::sim {
+/*
+ * Front end for set-sampled simulation. The cache lines are divided into
+ * classes by their index modulo the smallest set count in the hierarchy;
+ * as long as all set counts are multiples of that number, the lines of one
+ * class only ever compete with each other, at every level. Every sampled
+ * class belongs to one of a number of groups, each of which has its own
+ * hierarchy, and accesses to unsampled classes are dropped.
+ *
+ * Accesses which span multiple lines are split at line boundaries, which
+ * simulates every line exactly, but counts additional loads or stores in
+ * the first level. Those are tallied per group so that they can be
+ * subtracted again.
+ */
+class sampler
+{
+public:
+    sampler(
+        const std::vector<hierarchy *> & _groups,
+        std::int64_t _line_bits,
+        const std::vector<std::int64_t> & _group_of
+    )
+        : groups(_groups)
+        , line_bits(_line_bits)
+        , group_of(_group_of)
+        , extra(_groups.size(), {0, 0})
+    {
+        if (group_of.empty()) {
+            throw std::invalid_argument("sampler needs at least one set class");
+        }
+
+        for (std::int64_t g : group_of) {
+            if (g >= static_cast<std::int64_t>(groups.size())) {
+                throw std::invalid_argument("set class has an invalid group");
+            }
+        }
+    }
+
+    inline void load(std::uint64_t addr, std::uint64_t length)
+    {
+        access(addr, length, 0);
+    }
+
+    inline void store(std::uint64_t addr, std::uint64_t length)
+    {
+        access(addr, length, 1);
+    }
+
+    void process(
+        const std::uint64_t * addresses,
+        const std::uint8_t * ops,
+        const std::uint32_t * lengths,
+        std::size_t n
+    )
+    {
+        for (std::size_t i = 0; i < n; ++i) {
+            access(addresses[i], lengths[i], ops[i] == 0 ? 0 : 1);
+        }
+    }
+
+    std::uint64_t get_extra(std::size_t group, int op) const
+    {
+        return extra[group][op];
+    }
+
+private:
+    inline void access(std::uint64_t addr, std::uint64_t length, int op)
+    {
+        const std::uint64_t first = addr >> line_bits;
+        const std::uint64_t last = (addr + length - 1) >> line_bits;
+
+        for (std::uint64_t cl = first; cl <= last; ++cl) {
+            const std::int64_t g = group_of[cl % group_of.size()];
+
+            if (g < 0) {
+                continue;
+            }
+
+            const std::uint64_t begin = std::max(addr, cl << line_bits);
+            const std::uint64_t end =
+                std::min(addr + length, (cl + 1) << line_bits);
+
+            if (op == 0) {
+                groups[g]->load(begin, end - begin);
+            } else {
+                groups[g]->store(begin, end - begin);
+            }
+
+            if (cl != first) {
+                ++extra[g][op];
+            }
+        }
+    }
+
+    std::vector<hierarchy *> groups;
+    std::int64_t line_bits;
+    std::vector<std::int64_t> group_of;
+    std::vector<std::array<std::uint64_t, 2>> extra;
+};
+
+inline void cache_load(sampler & s, std::size_t addr, std::size_t length)
+{
+    s.load(addr, length);
+}
+
+inline void cache_store(sampler & s, std::size_t addr, std::size_t length)
+{
+    s.store(addr, length);
+}
+}
@@ -0,0 +1,387 @@
+#pragma once
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <memory>
+#include <stdexcept>
+#include <unordered_map>
+#include <vector>
+
+namespace alex::sim {
+struct geometry {
+    std::int64_t line;
+    std::int64_t sets;
+    std::int64_t depth;
+};
+
+/*
+ * Single-pass LRU stack distance (Mattson) analysis for a number of cache
+ * geometries at once. For a geometry with a given line size and set count,
+ * the stack distance of an access is the number of distinct lines mapping to
+ * the same set which were touched since the previous access to the same
+ * line. An access hits in an LRU cache of that geometry with w ways if and
+ * only if its distance is smaller than w, so a single histogram of distances
+ * yields the hit and miss counts for every associativity.
+ *
+ * If a geometry has a bounded depth, every set keeps an explicit LRU stack
+ * of that many lines, which is as cheap as simulating the largest cache of
+ * interest; distances beyond the depth are only counted. A depth of zero
+ * requests unbounded distances, which are computed with a Fenwick tree per
+ * set over the local time of that set, in which only the most recent access
+ * of every line is marked. With a single set, this gives the miss ratio
+ * curve of a fully associative cache of any capacity.
+ *
+ * Lines are numbered densely once per line size through a paged table, so
+ * the geometries sharing a line size need no lookups of their own.
+ */
+class stack_distance
+{
+public:
+    struct set_state {
+        std::uint32_t time = 0;
+        std::uint32_t live = 0;
+        std::vector<std::int32_t> tree;
+        std::vector<std::uint32_t> owner;
+    };
+
+    struct state {
+        geometry config;
+
+        std::vector<std::uint32_t> stacks;
+        std::vector<std::uint32_t> fill;
+
+        std::vector<std::uint32_t> last;
+        std::vector<set_state> sets;
+
+        std::vector<std::uint64_t> histogram[2];
+        std::uint64_t cold[2] = {0, 0};
+        std::uint64_t far[2] = {0, 0};
+    };
+
+    stack_distance(const std::vector<geometry> & geometries)
+    {
+        for (const geometry & g : geometries) {
+            if (g.line <= 0 || (g.line & (g.line - 1)) != 0) {
+                throw std::invalid_argument("line size must be a power of two");
+            }
+
+            if (g.sets <= 0) {
+                throw std::invalid_argument("set count must be positive");
+            }
+
+            if (g.depth < 0) {
+                throw std::invalid_argument("depth must not be negative");
+            }
+
+            std::int64_t line_bits = 0;
+
+            while ((std::int64_t{1} << line_bits) < g.line) {
+                ++line_bits;
+            }
+
+            auto group = std::find_if(
+                groups.begin(),
+                groups.end(),
+                [line_bits](const line_group & x) {
+                    return x.line_bits == line_bits;
+                }
+            );
+
+            if (group == groups.end()) {
+                groups.emplace_back();
+                groups.back().line_bits = line_bits;
+                group = groups.end() - 1;
+            }
+
+            group->members.push_back(states.size());
+
+            state s;
+
+            s.config = g;
+
+            if (g.depth > 0) {
+                s.stacks.resize(g.sets * g.depth);
+                s.fill.resize(g.sets);
+                s.histogram[0].resize(g.depth);
+                s.histogram[1].resize(g.depth);
+            } else {
+                s.sets.resize(g.sets);
+            }
+
+            states.push_back(std::move(s));
+        }
+    }
+
+    inline void load(std::uint64_t addr, std::uint64_t length)
+    {
+        access(addr, length, 0);
+    }
+
+    inline void store(std::uint64_t addr, std::uint64_t length)
+    {
+        access(addr, length, 1);
+    }
+
+    void process(
+        const std::uint64_t * addresses,
+        const std::uint8_t * ops,
+        const std::uint32_t * lengths,
+        std::size_t n
+    )
+    {
+        for (std::size_t i = 0; i < n; ++i) {
+            access(addresses[i], lengths[i], ops[i] == 0 ? 0 : 1);
+        }
+    }
+
+    void reset()
+    {
+        for (state & s : states) {
+            std::fill(s.fill.begin(), s.fill.end(), 0);
+            std::fill(s.sets.begin(), s.sets.end(), set_state());
+            s.last.clear();
+
+            for (int op = 0; op < 2; ++op) {
+                if (s.config.depth > 0) {
+                    std::fill(
+                        s.histogram[op].begin(), s.histogram[op].end(), 0
+                    );
+                } else {
+                    s.histogram[op].clear();
+                }
+
+                s.cold[op] = 0;
+                s.far[op] = 0;
+            }
+        }
+
+        for (line_group & g : groups) {
+            g.pages.clear();
+            g.slots = 0;
+            std::fill_n(g.cached_page, page_cache, nullptr);
+        }
+
+        count[0] = count[1] = 0;
+    }
+
+    const std::vector<state> & get_states() const
+    {
+        return states;
+    }
+
+    std::uint64_t get_count(int op) const
+    {
+        return count[op];
+    }
+
+private:
+    static constexpr std::uint64_t page_bits = 12;
+    static constexpr std::size_t page_cache = 16;
+
+    struct line_group {
+        std::int64_t line_bits;
+        std::vector<std::size_t> members;
+        std::unordered_map<std::uint64_t, std::unique_ptr<std::uint32_t[]>>
+            pages;
+        std::uint32_t slots = 0;
+        std::uint64_t cached_key[page_cache];
+        std::uint32_t * cached_page[page_cache] = {};
+    };
+
+    /*
+     * Return the dense number of a line, which is never zero, and whether
+     * this is the first time the line is seen.
+     */
+    static inline std::pair<std::uint32_t, bool>
+    slot_of(line_group & g, std::uint64_t cl)
+    {
+        const std::uint64_t key = cl >> page_bits;
+        const std::size_t c = ((key * 0x9E3779B97F4A7C15) >> 32) % page_cache;
+
+        if (g.cached_page[c] == nullptr || g.cached_key[c] != key) {
+            std::unique_ptr<std::uint32_t[]> & page = g.pages[key];
+
+            if (!page) {
+                page = std::make_unique<std::uint32_t[]>(1 << page_bits);
+            }
+
+            g.cached_key[c] = key;
+            g.cached_page[c] = page.get();
+        }
+
+        std::uint32_t & slot =
+            g.cached_page[c][cl & ((std::uint64_t{1} << page_bits) - 1)];
+
+        if (slot == 0) {
+            slot = ++g.slots;
+            return {slot, true};
+        }
+
+        return {slot, false};
+    }
+
+    inline void access(std::uint64_t addr, std::uint64_t length, int op)
+    {
+        ++count[op];
+
+        for (line_group & g : groups) {
+            const std::uint64_t last = (addr + length - 1) >> g.line_bits;
+
+            for (std::uint64_t cl = addr >> g.line_bits; cl <= last; ++cl) {
+                const auto [slot, cold] = slot_of(g, cl);
+
+                for (std::size_t i : g.members) {
+                    state & s = states[i];
+                    const std::uint64_t set =
+                        cl % static_cast<std::uint64_t>(s.config.sets);
+
+                    if (s.config.depth > 0) {
+                        touch_stack(s, set, slot, cold, op);
+                    } else {
+                        touch_tree(s, set, slot, cold, op);
+                    }
+                }
+            }
+        }
+    }
+
+    static inline void touch_stack(
+        state & s, std::uint64_t set, std::uint32_t slot, bool cold, int op
+    )
+    {
+        std::uint32_t * e = &s.stacks[set * s.config.depth];
+        std::uint32_t & fill = s.fill[set];
+        std::uint32_t d = 0;
+
+        while (d < fill && e[d] != slot) {
+            ++d;
+        }
+
+        if (d < fill) {
+            ++s.histogram[op][d];
+        } else {
+            if (cold) {
+                ++s.cold[op];
+            } else {
+                ++s.far[op];
+            }
+
+            if (fill < s.config.depth) {
+                ++fill;
+            }
+
+            d = fill - 1;
+        }
+
+        std::copy_backward(e, e + d, e + d + 1);
+        e[0] = slot;
+    }
+
+    static inline void add(set_state & t, std::uint32_t i, std::int32_t v)
+    {
+        for (; i < t.tree.size(); i += i & (~i + 1)) {
+            t.tree[i] += v;
+        }
+    }
+
+    static inline std::uint32_t prefix(const set_state & t, std::uint32_t i)
+    {
+        std::int32_t r = 0;
+
+        for (; i > 0; i -= i & (~i + 1)) {
+            r += t.tree[i];
+        }
+
+        return r;
+    }
+
+    static void compact(state & s, set_state & t)
+    {
+        std::uint32_t n = 0;
+
+        for (std::uint32_t i = 1; i <= t.time; ++i) {
+            if (t.owner[i] != 0) {
+                t.owner[++n] = t.owner[i];
+                s.last[t.owner[i]] = n;
+            }
+        }
+
+        t.time = n;
+
+        const std::size_t capacity = std::max<std::size_t>(
+            t.tree.size(), 2 * static_cast<std::size_t>(n) + 64
+        );
+
+        t.owner.resize(capacity, 0);
+        std::fill(t.owner.begin() + n + 1, t.owner.end(), 0);
+        t.tree.assign(capacity, 0);
+
+        for (std::uint32_t i = 1; i < capacity; ++i) {
+            if (i <= n) {
+                t.tree[i] += 1;
+            }
+
+            const std::uint32_t j = i + (i & (~i + 1));
+
+            if (j < capacity) {
+                t.tree[j] += t.tree[i];
+            }
+        }
+    }
+
+    static inline void touch_tree(
+        state & s, std::uint64_t set, std::uint32_t slot, bool cold, int op
+    )
+    {
+        set_state & t = s.sets[set];
+
+        if (t.time + 1 >= t.tree.size()) {
+            compact(s, t);
+        }
+
+        if (slot >= s.last.size()) {
+            s.last.resize(
+                std::max<std::size_t>(2 * s.last.size(), slot + 1), 0
+            );
+        }
+
+        if (cold) {
+            ++s.cold[op];
+        } else {
+            const std::uint32_t p = s.last[slot];
+            const std::uint32_t d = t.live - prefix(t, p);
+
+            if (d >= s.histogram[op].size()) {
+                s.histogram[op].resize(d + 1, 0);
+            }
+
+            ++s.histogram[op][d];
+
+            add(t, p, -1);
+            t.owner[p] = 0;
+            --t.live;
+        }
+
+        s.last[slot] = ++t.time;
+        t.owner[t.time] = slot;
+        add(t, t.time, 1);
+        ++t.live;
+    }
+
+    std::vector<state> states;
+    std::vector<line_group> groups;
+    std::uint64_t count[2] = {0, 0};
+};
+
+inline void cache_load(stack_distance & s, std::size_t addr, std::size_t length)
+{
+    s.load(addr, length);
+}
+
+inline void
+cache_store(stack_distance & s, std::size_t addr, std::size_t length)
+{
+    s.store(addr, length);
+}
+}
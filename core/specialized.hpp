@@ -0,0 +1,23 @@
+#pragma once
+
+#include <concepts>
+#include <cstddef>
+#include <vector>
+
+#include "contexts/specialized_benchmark.hpp"
+#include "entries.hpp"
+
+/*
+ * Benchmark entry for one layout, given by its masks, which modules generated
+ * by alex-compile instantiate for every layout they contain. The individual
+ * must be the layout the masks were computed from.
+ */
+template <typename P, std::floating_point T, std::size_t... M>
+std::size_t specialized_bench_entry(const std::vector<std::size_t> & individual)
+{
+    alex::contexts::specialized_benchmark<M...> ctx;
+
+    P::template run<T>(ctx, individual);
+
+    return ctx.get_runtime();
+}
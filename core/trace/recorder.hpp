@@ -0,0 +1,252 @@
+#pragma once
+
+#include <array>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace alex::trace {
+struct access {
+    std::int64_t array;
+    std::int64_t op;
+    std::array<std::int64_t, 3> index;
+};
+
+/*
+ * Records the logical accesses of a pattern, i.e. the array, the operation
+ * and the multi-dimensional index of every access, independent of the
+ * layout. The trace is compressed on the fly into blocks of strided runs: a
+ * block is a sequence of `period` sites which is repeated `count` times,
+ * where every repetition moves each site by its own constant stride.
+ * Accesses which do not fit any run are collected into literal blocks with a
+ * count of one.
+ */
+class recorder
+{
+public:
+    static constexpr std::size_t max_dimensions = 3;
+    static constexpr std::size_t max_period = 32;
+    static constexpr std::size_t site_width = 2 + 2 * max_dimensions;
+    static constexpr std::size_t block_width = 3;
+
+    std::size_t add_array(std::size_t offset, std::size_t element_size)
+    {
+        arrays.push_back(static_cast<std::int64_t>(offset));
+        arrays.push_back(static_cast<std::int64_t>(element_size));
+
+        return arrays.size() / 2 - 1;
+    }
+
+    template <std::size_t N>
+    void record(
+        std::size_t array, bool store, const std::array<std::size_t, N> & index
+    ) requires(N <= max_dimensions)
+    {
+        access a{static_cast<std::int64_t>(array), store ? 1 : 0, {0, 0, 0}};
+
+        for (std::size_t i = 0; i < N; ++i) {
+            a.index[i] = static_cast<std::int64_t>(index[i]);
+        }
+
+        push(a);
+    }
+
+    void flush()
+    {
+        while (open) {
+            for (const access & a : close()) {
+                push(a);
+            }
+        }
+
+        for (const access & a : pending) {
+            emit_literal(a);
+        }
+
+        pending.clear();
+    }
+
+    const std::vector<std::int32_t> & get_sites() const
+    {
+        return sites;
+    }
+
+    const std::vector<std::int64_t> & get_blocks() const
+    {
+        return blocks;
+    }
+
+    const std::vector<std::int64_t> & get_arrays() const
+    {
+        return arrays;
+    }
+
+private:
+    void push(const access & a)
+    {
+        if (open) {
+            const std::size_t s = partial.size();
+
+            if (predicts(a, s)) {
+                partial.push_back(a);
+
+                if (partial.size() == period) {
+                    ++count;
+                    partial.clear();
+                }
+            } else {
+                std::vector<access> rest = close();
+                rest.push_back(a);
+
+                for (const access & r : rest) {
+                    push(r);
+                }
+            }
+
+            return;
+        }
+
+        pending.push_back(a);
+
+        if (pending.size() % 3 == 0 && pending.size() / 3 <= max_period &&
+            try_open(pending.size() / 3))
+        {
+            pending.clear();
+            return;
+        }
+
+        while (pending.size() >= 3 * max_period) {
+            emit_literal(pending.front());
+            pending.erase(pending.begin());
+
+            for (std::size_t p = 1; 3 * p <= pending.size(); ++p) {
+                if (try_open(p)) {
+                    std::vector<access> rest(
+                        pending.begin() + 3 * p, pending.end()
+                    );
+                    pending.clear();
+
+                    for (const access & r : rest) {
+                        push(r);
+                    }
+
+                    return;
+                }
+            }
+        }
+    }
+
+    bool predicts(const access & a, std::size_t s) const
+    {
+        if (a.array != base[s].array || a.op != base[s].op) {
+            return false;
+        }
+
+        for (std::size_t i = 0; i < max_dimensions; ++i) {
+            if (a.index[i] != base[s].index[i] + count * stride[s][i]) {
+                return false;
+            }
+        }
+
+        return true;
+    }
+
+    bool try_open(std::size_t p)
+    {
+        for (std::size_t s = 0; s < p; ++s) {
+            const access &a = pending[s], &b = pending[p + s],
+                         &c = pending[2 * p + s];
+
+            if (a.array != b.array || a.array != c.array || a.op != b.op ||
+                a.op != c.op)
+            {
+                return false;
+            }
+
+            for (std::size_t i = 0; i < max_dimensions; ++i) {
+                if (b.index[i] - a.index[i] != c.index[i] - b.index[i]) {
+                    return false;
+                }
+            }
+        }
+
+        base.assign(pending.begin(), pending.begin() + p);
+        stride.resize(p);
+
+        for (std::size_t s = 0; s < p; ++s) {
+            for (std::size_t i = 0; i < max_dimensions; ++i) {
+                stride[s][i] = pending[p + s].index[i] - pending[s].index[i];
+            }
+        }
+
+        open = true;
+        period = p;
+        count = 3;
+        partial.clear();
+
+        return true;
+    }
+
+    std::vector<access> close()
+    {
+        blocks.push_back(static_cast<std::int64_t>(period));
+        blocks.push_back(count);
+        blocks.push_back(static_cast<std::int64_t>(sites.size() / site_width));
+
+        for (std::size_t s = 0; s < period; ++s) {
+            emit_site(base[s], stride[s]);
+        }
+
+        open = false;
+        literal = false;
+
+        return std::move(partial);
+    }
+
+    void emit_literal(const access & a)
+    {
+        if (literal) {
+            ++blocks[blocks.size() - block_width];
+        } else {
+            blocks.push_back(1);
+            blocks.push_back(1);
+            blocks.push_back(
+                static_cast<std::int64_t>(sites.size() / site_width)
+            );
+            literal = true;
+        }
+
+        emit_site(a, {0, 0, 0});
+    }
+
+    void emit_site(
+        const access & a, const std::array<std::int64_t, max_dimensions> & d
+    )
+    {
+        sites.push_back(static_cast<std::int32_t>(a.array));
+        sites.push_back(static_cast<std::int32_t>(a.op));
+
+        for (std::size_t i = 0; i < max_dimensions; ++i) {
+            sites.push_back(static_cast<std::int32_t>(a.index[i]));
+        }
+
+        for (std::size_t i = 0; i < max_dimensions; ++i) {
+            sites.push_back(static_cast<std::int32_t>(d[i]));
+        }
+    }
+
+    bool open = false;
+    bool literal = false;
+    std::size_t period = 0;
+    std::int64_t count = 0;
+
+    std::vector<access> base;
+    std::vector<std::array<std::int64_t, max_dimensions>> stride;
+    std::vector<access> partial;
+    std::vector<access> pending;
+
+    std::vector<std::int32_t> sites;
+    std::vector<std::int64_t> blocks;
+    std::vector<std::int64_t> arrays;
+};
+}
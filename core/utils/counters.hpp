@@ -0,0 +1,130 @@
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <cstring>
+#include <optional>
+
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+namespace alex::utils {
+struct counter_event {
+    const char * name;
+    std::uint32_t type;
+    std::uint64_t config;
+};
+
+constexpr std::uint64_t
+cache_event(std::uint64_t cache, std::uint64_t op, std::uint64_t result)
+{
+    return cache | (op << 8) | (result << 16);
+}
+
+constexpr std::array<counter_event, 4> counter_events{{
+    {"cycles", PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES},
+    {"l1d_misses",
+     PERF_TYPE_HW_CACHE,
+     cache_event(
+         PERF_COUNT_HW_CACHE_L1D,
+         PERF_COUNT_HW_CACHE_OP_READ,
+         PERF_COUNT_HW_CACHE_RESULT_MISS
+     )},
+    {"llc_misses",
+     PERF_TYPE_HW_CACHE,
+     cache_event(
+         PERF_COUNT_HW_CACHE_LL,
+         PERF_COUNT_HW_CACHE_OP_READ,
+         PERF_COUNT_HW_CACHE_RESULT_MISS
+     )},
+    {"dtlb_misses",
+     PERF_TYPE_HW_CACHE,
+     cache_event(
+         PERF_COUNT_HW_CACHE_DTLB,
+         PERF_COUNT_HW_CACHE_OP_READ,
+         PERF_COUNT_HW_CACHE_RESULT_MISS
+     )},
+}};
+
+/*
+ * Hardware performance counters of the calling thread, counting user space
+ * only. Every counter is opened on its own, so that a counter which the
+ * hardware does not support, or which the system does not permit, leaves
+ * the others working; the value of such a counter is empty.
+ */
+class counters
+{
+public:
+    static constexpr std::size_t count = counter_events.size();
+
+    counters()
+    {
+        for (std::size_t i = 0; i < count; ++i) {
+            perf_event_attr attr;
+
+            std::memset(&attr, 0, sizeof(attr));
+            attr.size = sizeof(attr);
+            attr.type = counter_events[i].type;
+            attr.config = counter_events[i].config;
+            attr.disabled = 1;
+            attr.exclude_kernel = 1;
+            attr.exclude_hv = 1;
+
+            fds[i] = static_cast<int>(
+                syscall(SYS_perf_event_open, &attr, 0, -1, -1, 0)
+            );
+        }
+    }
+
+    counters(const counters &) = delete;
+    counters & operator=(const counters &) = delete;
+
+    ~counters()
+    {
+        for (int fd : fds) {
+            if (fd >= 0) {
+                close(fd);
+            }
+        }
+    }
+
+    void start()
+    {
+        for (int fd : fds) {
+            if (fd >= 0) {
+                ioctl(fd, PERF_EVENT_IOC_RESET, 0);
+                ioctl(fd, PERF_EVENT_IOC_ENABLE, 0);
+            }
+        }
+    }
+
+    void stop()
+    {
+        for (int fd : fds) {
+            if (fd >= 0) {
+                ioctl(fd, PERF_EVENT_IOC_DISABLE, 0);
+            }
+        }
+    }
+
+    std::array<std::optional<std::uint64_t>, count> read() const
+    {
+        std::array<std::optional<std::uint64_t>, count> out;
+
+        for (std::size_t i = 0; i < count; ++i) {
+            std::uint64_t v;
+
+            if (fds[i] >= 0 && ::read(fds[i], &v, sizeof(v)) == sizeof(v)) {
+                out[i] = v;
+            }
+        }
+
+        return out;
+    }
+
+private:
+    std::array<int, count> fds;
+};
+}
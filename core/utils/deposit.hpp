@@ -0,0 +1,55 @@
+#pragma once
+
+#include <bit>
+#include <climits>
+#include <cstddef>
+
+#include "utils/pdep.hpp"
+
+namespace alex::utils {
+/*
+ * Number of contiguous runs of set bits in a mask.
+ */
+constexpr std::size_t runs(std::size_t m)
+{
+    return std::popcount(m & ~(m << 1));
+}
+
+template <std::size_t M, std::size_t S>
+constexpr std::size_t deposit_runs(std::size_t v)
+{
+    if constexpr (M == 0) {
+        return 0;
+    } else {
+        constexpr std::size_t start = std::countr_zero(M);
+        constexpr std::size_t length = std::countr_one(M >> start);
+        constexpr std::size_t run = (length == sizeof(std::size_t) * CHAR_BIT
+                                         ? ~std::size_t(0)
+                                         : (std::size_t(1) << length) - 1)
+                                    << start;
+
+        return (((v >> S) << start) & run) |
+               deposit_runs<M & ~run, S + length>(v);
+    }
+}
+
+/*
+ * Deposit the low bits of a value in the set bits of a mask which is known at
+ * compile time, like pdep. Every contiguous run of bits in the mask becomes a
+ * shift and a bitwise and, which the compiler can fold into the surrounding
+ * index computation and vectorize. Masks with many short runs, such as
+ * interleaved dimensions, use pdep where it is available, as the shifts would
+ * be slower than the single instruction.
+ */
+template <std::size_t M>
+constexpr std::size_t deposit(std::size_t v)
+{
+#ifdef __BMI2__
+    if constexpr (runs(M) > 4) {
+        return pdep(v, M);
+    }
+#endif
+
+    return deposit_runs<M, 0>(v);
+}
+}
@@ -1,14 +1,56 @@
 #pragma once
 
+#include <array>
+#include <bit>
 #include <climits>
 #include <concepts>
+#include <cstdint>
 
 #include <x86intrin.h>
 
+#ifdef ALEX_PDEP_TABLE
+/*
+ * Table of the deposit of every byte into every byte mask, such that a
+ * deposit into a wider mask takes one lookup per byte of the mask.
+ */
+constexpr std::array<std::array<std::uint8_t, 256>, 256> make_pdep_table()
+{
+    std::array<std::array<std::uint8_t, 256>, 256> t{};
+
+    /*
+     * The lowest bit of the mask receives the lowest bit of the value, the
+     * other bits of the mask the remaining bits of the value.
+     */
+    for (unsigned m = 1; m < 256; ++m) {
+        for (unsigned v = 0; v < 256; ++v) {
+            t[m][v] = static_cast<std::uint8_t>(
+                t[m & (m - 1)][v >> 1] | ((v & 1U) << std::countr_zero(m))
+            );
+        }
+    }
+
+    return t;
+}
+
+inline constexpr std::array<std::array<std::uint8_t, 256>, 256> pdep_table =
+    make_pdep_table();
+#endif
+
 template <std::unsigned_integral T>
 inline T pdep(const T & v, const T & m)
 {
-#ifdef __BMI2__
+#if defined(ALEX_PDEP_TABLE)
+    T a = 0, r = v, w = m;
+
+    for (unsigned s = 0; w != 0; s += CHAR_BIT, w >>= CHAR_BIT) {
+        const std::uint8_t b = static_cast<std::uint8_t>(w);
+
+        a |= static_cast<T>(pdep_table[b][static_cast<std::uint8_t>(r)]) << s;
+        r >>= std::popcount(b);
+    }
+
+    return a;
+#elif defined(__BMI2__)
     return _pdep_u64(v, m);
 #else
     T a = 0;
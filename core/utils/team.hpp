@@ -0,0 +1,80 @@
+#pragma once
+
+#include <atomic>
+#include <barrier>
+#include <cstddef>
+#include <thread>
+#include <utility>
+
+namespace alex::utils {
+/*
+ * The part of one thread in a kernel which is run by a team of threads. A
+ * kernel splits its outer loop between the members of the team, either in
+ * contiguous blocks or cyclically, and synchronizes them where iterations
+ * depend on each other: with a barrier, or by waiting for the iterations of
+ * an ordered loop to complete. A default constructed member is a team of its
+ * own, which runs the whole kernel without ever synchronizing.
+ */
+class team
+{
+public:
+    team() = default;
+
+    team(
+        std::size_t _rank,
+        std::size_t _size,
+        std::barrier<> * _barrier,
+        std::atomic<std::size_t> * _progress
+    )
+        : rank(_rank)
+        , size(_size)
+        , barrier(_barrier)
+        , progress(_progress)
+    {
+    }
+
+    std::pair<std::size_t, std::size_t>
+    share(std::size_t lo, std::size_t hi) const
+    {
+        if (hi <= lo) {
+            return {lo, lo};
+        }
+
+        return {
+            lo + (hi - lo) * rank / size, lo + (hi - lo) * (rank + 1) / size};
+    }
+
+    bool owns(std::size_t i) const
+    {
+        return i % size == rank;
+    }
+
+    void sync() const
+    {
+        if (barrier != nullptr) {
+            barrier->arrive_and_wait();
+        }
+    }
+
+    void wait(std::size_t i) const
+    {
+        if (progress != nullptr) {
+            while (progress->load(std::memory_order_acquire) < i) {
+                std::this_thread::yield();
+            }
+        }
+    }
+
+    void complete(std::size_t i) const
+    {
+        if (progress != nullptr) {
+            progress->store(i, std::memory_order_release);
+        }
+    }
+
+private:
+    std::size_t rank = 0, size = 1;
+    std::barrier<> * barrier = nullptr;
+    std::atomic<std::size_t> * progress = nullptr;
+};
+}
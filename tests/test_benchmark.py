@@ -0,0 +1,85 @@
+import os
+import random
+
+import alex.benchmark
+import alex.definitions
+import alex.pattern
+
+
+def test_median_interval():
+    rng = random.Random(0)
+    samples = [rng.gauss(100.0, 5.0) for _ in range(400)]
+
+    low, high = alex.benchmark.medianInterval(samples, 0.95)
+    narrow = alex.benchmark.medianInterval(samples[:100], 0.95)
+
+    assert low < 100.0 < high
+    assert high - low < narrow[1] - narrow[0]
+    assert alex.benchmark.medianInterval([1.0], 0.95) == (1.0, 1.0)
+
+
+def test_adaptive_protocol():
+    protocol = alex.benchmark.Protocol(repetitions=5, target=0.05, outliers=3.0)
+    samples = [100.0, 101.0, 99.0, 100.5, 99.5, 100.0, 1000.0]
+
+    assert not alex.benchmark.converged(samples[:4], protocol)
+    assert alex.benchmark.converged(samples, protocol)
+    assert not alex.benchmark.converged(samples, protocol.copy(update={"target": 0}))
+    assert alex.benchmark.outlierMask(samples, 3.0).tolist() == [True] * 6 + [False]
+
+    summary = alex.benchmark.summarize(samples, protocol)
+
+    assert summary.trials == 6
+    assert summary.median == 100.0
+    assert summary.low <= summary.median <= summary.high
+
+
+def test_counters():
+    result = alex.pattern.runBenchPatternCounters(
+        alex.definitions.Pattern.MMijk, [0, 1] * 4
+    )
+
+    assert set(result) == {"runtime"} | set(alex.benchmark.COUNTERS)
+    assert result["runtime"] > 0
+
+    protocol = alex.benchmark.Protocol(outliers=3.0)
+    counters = [
+        {"cycles": c, "l1d_misses": 1, "llc_misses": None, "dtlb_misses": 0}
+        for c in (10, 20, 30, 1000)
+    ]
+    summary = alex.benchmark.summarizeCounters(
+        [100.0, 101.0, 99.0, 1000.0], counters, protocol
+    )
+
+    assert summary == {
+        "cycles": 20.0,
+        "l1d_misses": 1.0,
+        "llc_misses": None,
+        "dtlb_misses": 0.0,
+    }
+
+
+def test_repeated():
+    for huge_pages in ["none", "transparent"]:
+        runtimes = alex.pattern.runBenchPatternRepeated(
+            alex.definitions.Pattern.Himeno, [0, 1, 2] * 3, 5, 2, huge_pages
+        )
+
+        assert runtimes.shape == (5,)
+        assert (runtimes > 0).all()
+
+
+def test_threaded():
+    cpus = sorted(os.sched_getaffinity(0))
+
+    for pattern in alex.definitions.Pattern:
+        for threads in [1, 3]:
+            assert (
+                alex.pattern.runBenchPattern(
+                    pattern,
+                    list(range(pattern.dimensions)) * 3,
+                    threads=threads,
+                    cpus=cpus,
+                )
+                > 0
+            )
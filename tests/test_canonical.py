@@ -0,0 +1,124 @@
+import collections
+import io
+import itertools
+
+import pytest
+
+import alex.canonical
+import alex.definitions
+import alex.fitness
+import alex.pattern
+import alex.schema
+
+
+@pytest.fixture(scope="module")
+def hierarchy():
+    with open("caches/Intel_Xeon_E5_2660_v3.yaml", "r") as f:
+        return alex.schema.CacheHierarchy.fromYamlFile(f)
+
+
+# A hierarchy small enough that the tag rule starts within a few bits.
+SMALL_HIERARCHY = """
+caches:
+  L1:
+    sets: 4
+    ways: 2
+    line: 64
+    replacement: LRU
+    write_back: true
+    store_to: L2
+    load_from: L2
+    latency: 4
+  L2:
+    sets: 8
+    ways: 4
+    line: 64
+    replacement: LRU
+    write_back: true
+    latency: 12
+memory:
+  first: L1
+  last: L2
+  latency: 200
+"""
+
+
+@pytest.fixture(scope="module")
+def small_hierarchy():
+    return alex.schema.CacheHierarchy.fromYamlFile(io.StringIO(SMALL_HIERARCHY))
+
+
+def classes(pattern, hierarchy, precision, approximate):
+    """Return the fitness values of every layout, grouped by representative."""
+    canonical = alex.canonical.Canonicalizer(
+        pattern, hierarchy, precision, approximate=approximate
+    )
+    bits = (3, 3, 3) if pattern.dimensions == 3 else (5, 4)
+    individual = [i for (i, j) in enumerate(bits) for _ in range(j)]
+
+    # Every layout reaches beyond the start of every rule, including the tag
+    # rule, whether the canonicalizer uses it or not.
+    assert len(individual) > max(
+        r.begin for r in alex.canonical.rules(pattern, hierarchy, precision)
+    )
+    result = collections.defaultdict(set)
+
+    for layout in set(itertools.permutations(individual)):
+        representative = canonical(layout)
+
+        assert sorted(representative) == sorted(layout)
+        assert canonical(representative) == representative
+
+        result[representative].add(
+            alex.fitness.fitnessFromStats(
+                alex.pattern.runPattern(
+                    pattern,
+                    hierarchy,
+                    list(layout),
+                    precision=precision,
+                    engine=alex.definitions.Engine.Native,
+                ).stats()
+            )
+        )
+
+    return result
+
+
+@pytest.mark.parametrize("precision", list(alex.definitions.Precision))
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_exact_rules(pattern, precision, small_hierarchy):
+    for representative, fitness in classes(
+        pattern, small_hierarchy, precision, approximate=False
+    ).items():
+        assert len(fitness) == 1, representative
+
+
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_tag_rule_is_approximate(pattern, small_hierarchy):
+    (tag,) = [
+        r for r in alex.canonical.rules(pattern, small_hierarchy) if r.name == "tag"
+    ]
+
+    # No pattern has a single array, so layouts which differ only in their
+    # highest positions may differ in fitness.
+    assert not tag.exact
+    assert any(
+        len(fitness) > 1
+        for fitness in classes(
+            pattern, small_hierarchy, alex.definitions.Precision.Single, True
+        ).values()
+    )
+
+
+def test_ranges(hierarchy):
+    canonical = alex.canonical.Canonicalizer(
+        alex.definitions.Pattern.MMijk, hierarchy, approximate=True
+    )
+
+    assert [(r.name, r.exact) for r in canonical.rules] == [
+        ("offset", True),
+        ("tag", False),
+    ]
+    assert canonical.ranges(8) == [(0, 4)]
+    assert canonical.ranges(24) == [(0, 4), (19, 24)]
+    assert canonical((1, 0, 1, 0, 1, 1, 0, 0)) == (0, 0, 1, 1, 1, 1, 0, 0)
@@ -0,0 +1,66 @@
+import importlib
+import random
+
+import pytest
+
+import alex.core
+import alex.definitions
+
+
+@pytest.mark.parametrize(
+    "info,deposit",
+    [
+        ({"flags": "fpu sse2 bmi1 bmi2", "vendor_id": "GenuineIntel"}, "pdep"),
+        ({"flags": "fpu sse2 bmi1", "vendor_id": "GenuineIntel"}, "table"),
+        (
+            {"flags": "bmi2", "vendor_id": "AuthenticAMD", "cpu family": "23"},
+            "table",
+        ),
+        ({"flags": "bmi2", "vendor_id": "AuthenticAMD", "cpu family": "25"}, "pdep"),
+        ({}, "table"),
+    ],
+)
+def test_best_deposit(info, deposit):
+    assert alex.core.bestDeposit(info) == alex.definitions.Deposit(deposit)
+
+
+def test_select(monkeypatch):
+    monkeypatch.setattr(alex.core, "_module", None)
+    monkeypatch.setattr(alex.core, "_deposit", None)
+    monkeypatch.setenv(alex.core.ENVIRONMENT, "generic")
+
+    assert alex.core.select() == (
+        alex.definitions.Deposit.Generic,
+        "set in $ALEX_DEPOSIT",
+    )
+    assert alex.core.select(alex.definitions.Deposit.Table)[0] == "table"
+
+    monkeypatch.setattr(alex.core, "_module", object())
+
+    with pytest.raises(RuntimeError):
+        alex.core.select(alex.definitions.Deposit.Generic)
+
+
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_variants_agree(pattern):
+    layout = list(range(pattern.dimensions)) * 4
+    random.Random(7).shuffle(layout)
+
+    histograms = []
+
+    for deposit in alex.definitions.Deposit:
+        if deposit == alex.definitions.Deposit.Native and "bmi2" not in (
+            alex.core.cpuInfo().get("flags", "").split()
+        ):
+            continue
+
+        module = importlib.import_module("__alex_core_%s" % deposit)
+        sd = module.StackDistance([(64, 8, 0)])
+        getattr(module, "_{}_single_reuse_entry".format(pattern))(sd, layout)
+
+        (h,) = sd.histograms()
+        histograms.append(
+            {k: v.tolist() if hasattr(v, "tolist") else v for k, v in h.items()}
+        )
+
+    assert all(h == histograms[0] for h in histograms)
@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+import alex.distributed
+
+AUTHKEY = b"test"
+
+
+def square(x, delay=0.0):
+    time.sleep(delay)
+    return x * x
+
+
+def fail():
+    raise ValueError("failure")
+
+
+def crash():
+    os._exit(1)
+
+
+def worker(address, slots):
+    alex.distributed.serve(address, AUTHKEY, slots=slots, heartbeat=0.2, retry=10)
+
+
+def worker_pool(executor, count, slots=2):
+    workers = [
+        multiprocessing.Process(target=worker, args=(executor.address, slots))
+        for _ in range(count)
+    ]
+
+    for w in workers:
+        w.start()
+
+    return workers
+
+
+def test_results():
+    with alex.distributed.DistributedExecutor(("127.0.0.1", 0), AUTHKEY) as executor:
+        workers = worker_pool(executor, 3)
+
+        for _ in range(100):
+            if executor.capacity == 6:
+                break
+
+            time.sleep(0.1)
+
+        futures = [executor.submit(square, i, delay=0.01) for i in range(40)]
+
+        assert [f.result(30) for f in futures] == [i * i for i in range(40)]
+        assert executor.capacity == 6
+
+        with pytest.raises(ValueError):
+            executor.submit(fail).result(30)
+
+    for w in workers:
+        w.join(10)
+        assert w.exitcode == 0
+
+
+def test_lost_workers():
+    with alex.distributed.DistributedExecutor(
+        ("127.0.0.1", 0), AUTHKEY, retries=1
+    ) as executor:
+        workers = worker_pool(executor, 3, slots=1)
+        futures = [executor.submit(square, i, delay=0.05) for i in range(12)]
+        killer = executor.submit(crash)
+
+        assert [f.result(60) for f in futures] == [i * i for i in range(12)]
+
+        with pytest.raises(RuntimeError):
+            killer.result(60)
+
+    for w in workers:
+        w.join(10)
+
+    assert sorted(w.exitcode for w in workers) == [0, 0, 0]
@@ -0,0 +1,214 @@
+import concurrent.futures
+import io
+import random
+import unittest.mock
+
+import numpy
+
+import alex.checkpoint
+import alex.cli.evolve
+import alex.ga
+import alex.schema
+import alex.strategies
+import alex.utils
+
+
+def fitness(individual, offset=0.0):
+    return sum(i * x for i, x in enumerate(individual)) + offset
+
+
+def cheap(individual):
+    return fitness(individual[: len(individual) // 2])
+
+
+def test_shrink_layout():
+    assert alex.utils.shrinkLayout((0, 1, 0, 1, 1, 0, 1), 1) == (0, 1, 0, 1, 1)
+    assert alex.utils.shrinkLayout((0, 1, 1), 2) == (0, 1)
+
+
+def test_first_level():
+    with open("caches/Intel_Xeon_E5_2660_v3.yaml", "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f).firstLevel()
+
+    assert list(hierarchy.caches) == [hierarchy.memory.first]
+    assert hierarchy.memory.last == hierarchy.memory.first
+    assert hierarchy.caches[hierarchy.memory.first].load_from is None
+
+
+def test_fidelity_ladder():
+    random.seed(1)
+
+    ga = alex.ga.GA(
+        retained_count=4,
+        generated_count=32,
+        fitness_func=fitness,
+        crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+        mutation_func=alex.cli.evolve.mutExchangeDifferent,
+        initial_population=alex.cli.evolve.initialPop(4, 4),
+        fidelities=[alex.ga.Fidelity("half", cheap, {}, 0.25)],
+    )
+
+    ga.run(generations=4)
+
+    for r in ga.generation_log[1:]:
+        half, full = r.fidelity
+        assert (half.name, full.name) == ("half", "full")
+        assert full.evaluated <= half.promoted
+
+    assert all(i in ga.fitness_cache for i in ga.population)
+    assert len(ga.fitness_cache) < len(ga.fidelity_caches[0]) + 2
+
+    f = io.StringIO()
+    ga.write_log(f)
+    header = f.getvalue().splitlines()[0].split(",")
+
+    assert "half_threshold" in header and "full_cost" in header
+
+
+def test_fidelity_ladder_keeps_population_size():
+    random.seed(3)
+
+    # There are only six layouts of 2:2 bits, fewer than the population.
+    ga = alex.ga.GA(
+        retained_count=8,
+        generated_count=16,
+        fitness_func=fitness,
+        crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+        mutation_func=alex.cli.evolve.mutExchangeDifferent,
+        initial_population=alex.cli.evolve.initialPop(2, 2),
+        fidelities=[alex.ga.Fidelity("half", cheap, {}, 0.5)],
+    )
+
+    for _ in range(10):
+        ga.run(generations=1)
+
+        assert len(ga.population) == 8
+
+
+def make_ga():
+    return alex.ga.GA(
+        retained_count=4,
+        generated_count=8,
+        fitness_func=fitness,
+        crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+        mutation_func=alex.cli.evolve.mutExchangeDifferent,
+        initial_population=alex.cli.evolve.initialPop(4, 4),
+    )
+
+
+def test_checkpoint_resume(tmp_path):
+    random.seed(7)
+    reference = make_ga()
+    reference.run(generations=6)
+
+    random.seed(7)
+    first = make_ga()
+    first.run(generations=3)
+    alex.checkpoint.writeCheckpoint(first, tmp_path / "ga.ckpt", {"run": 1})
+
+    random.seed(0)
+    second = make_ga()
+    alex.checkpoint.readCheckpoint(second, tmp_path / "ga.ckpt", {"run": 1})
+    second.run(generations=3)
+
+    def strip(log):
+        return [r._replace(runtime=0, cpu_seconds=0) for r in log]
+
+    assert second.population == reference.population
+    assert second.fitness_cache == reference.fitness_cache
+    assert strip(second.generation_log) == strip(reference.generation_log)
+
+
+def test_steady_state():
+    random.seed(3)
+    ga = make_ga()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        ga.run_steady_state(evaluations=40, executor=executor, concurrency=4)
+
+    assert [r.generation for r in ga.generation_log] == list(range(6))
+    assert len(ga.population) == 4
+    assert all(
+        ga.fitness_cache[i] >= ga.fitness_cache[j]
+        for i, j in zip(ga.population, ga.population[1:])
+    )
+    assert (
+        min(ga.fitness_cache[i] for i in ga.population)
+        == sorted(ga.fitness_cache.values())[-4]
+    )
+
+
+def test_steady_state_counts_evaluations():
+    random.seed(3)
+    ga = make_ga()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        ga.run_steady_state(evaluations=40, executor=executor, concurrency=2)
+
+    # Every cached fitness was evaluated exactly once, most of them by futures.
+    assert ga.evaluations == len(ga.fitness_cache)
+    assert ga.generation_log[-1].evaluations > ga.generation_log[0].evaluations
+    assert ga.generation_log[-1].cpu_seconds > ga.generation_log[0].cpu_seconds
+
+
+def test_strategies_with_budget():
+    for name, strategy in alex.strategies.STRATEGIES.items():
+        random.seed(5)
+        ga = alex.ga.GA(
+            retained_count=4,
+            generated_count=8,
+            fitness_func=fitness,
+            crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+            mutation_func=alex.cli.evolve.mutExchangeDifferent,
+            initial_population=alex.cli.evolve.initialPop(8, 8),
+            strategy=strategy(),
+        )
+
+        ga.run(generations=100, budget=alex.ga.Budget(evaluations=40))
+
+        best = max(ga.fitness_cache.values())
+
+        # A run only stops short of its budget if it converged on the optimum,
+        # of which all neighbours have been evaluated already.
+        assert ga.evaluations < 40 + 8 + 2, name
+        assert ga.evaluations >= 40 or best == fitness((0,) * 8 + (1,) * 8), name
+        assert ga.generation_log[-1].evaluations == ga.evaluations
+        assert best > fitness((1,) * 8 + (0,) * 8), name
+
+
+def test_batch_operators():
+    random.seed(2)
+    numpy.random.seed(2)
+
+    layouts = [random.sample((0,) * 5 + (1,) * 4 + (2,) * 3, k=12) for _ in range(64)]
+    pop1 = numpy.array(layouts[:32])
+    pop2 = numpy.array(layouts[32:])
+    idx = numpy.random.randint(0, 13, size=32)
+    num = numpy.random.randint(1, 7, size=32)
+
+    children = alex.cli.evolve.cxGeneralizedOrderedBatch(pop1, pop2, idx, num)
+
+    for a, b, i, n, c in zip(layouts[:32], layouts[32:], idx, num, children):
+        with unittest.mock.patch("random.randint", side_effect=[i, n]):
+            assert tuple(c.tolist()) == alex.cli.evolve.cxGeneralizedOrdered(a, b)
+
+    mutants = alex.cli.evolve.mutExchangeDifferentBatch(pop1)
+
+    assert (numpy.sort(mutants, axis=1) == numpy.sort(pop1, axis=1)).all()
+
+    for strategy in alex.strategies.STRATEGIES.values():
+        ga = alex.ga.GA(
+            retained_count=16,
+            generated_count=256,
+            fitness_func=fitness,
+            crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+            mutation_func=alex.cli.evolve.mutExchangeDifferent,
+            initial_population=alex.cli.evolve.initialPop(8, 8),
+            strategy=strategy(),
+            crossover_batch_func=alex.cli.evolve.cxGeneralizedOrderedBatch,
+            mutation_batch_func=alex.cli.evolve.mutExchangeDifferentBatch,
+        )
+        ga.run(generations=5)
+
+        assert all(sorted(x) == [0] * 8 + [1] * 8 for x in ga.fitness_cache)
+        assert max(ga.fitness_cache.values()) > fitness((1,) * 8 + (0,) * 8)
@@ -0,0 +1,89 @@
+import csv
+import io
+
+import alex.cli.evolve
+import alex.islands
+
+
+def fitness(individual):
+    return float(sum(i * x for i, x in enumerate(individual)))
+
+
+def test_neighbours():
+    assert alex.islands.neighbours(alex.islands.Topology.Ring, 2, 3) == [0]
+    assert alex.islands.neighbours(alex.islands.Topology.Complete, 1, 3) == [0, 2]
+    assert alex.islands.neighbours(alex.islands.Topology.Ring, 0, 1) == []
+
+
+def test_island_model():
+    model = alex.islands.IslandModel(
+        3,
+        {
+            "retained_count": 4,
+            "generated_count": 8,
+            "fitness_func": fitness,
+            "crossover_func": alex.cli.evolve.cxGeneralizedOrdered,
+            "mutation_func": alex.cli.evolve.mutExchangeDifferent,
+            "initial_population": alex.cli.evolve.initialPop(4, 4),
+        },
+        interval=2,
+        migrants=1,
+        topology=alex.islands.Topology.Complete,
+    )
+
+    model.run(generations=6)
+
+    assert all(len(x) == 6 for x in model.island_logs)
+    assert [r.max_fitness for r in model.global_log()] == [
+        max(x[g].max_fitness for x in model.island_logs) for g in range(6)
+    ]
+
+    f = io.StringIO()
+    model.write_log(f)
+    rows = f.getvalue().splitlines()
+
+    assert rows[0].startswith("island,generation")
+    assert sum(r.startswith("all,") for r in rows) == 6
+
+
+def test_island_log_sums_evaluations():
+    model = alex.islands.IslandModel(
+        2,
+        {
+            "retained_count": 4,
+            "generated_count": 8,
+            "fitness_func": fitness,
+            "crossover_func": alex.cli.evolve.cxGeneralizedOrdered,
+            "mutation_func": alex.cli.evolve.mutExchangeDifferent,
+            "initial_population": alex.cli.evolve.initialPop(4, 4),
+        },
+        interval=2,
+        migrants=1,
+        topology=alex.islands.Topology.Ring,
+    )
+
+    model.run(generations=4)
+
+    f = io.StringIO()
+    model.write_log(f)
+    f.seek(0)
+    reader = csv.DictReader(f)
+    rows = list(reader)
+
+    assert "fidelity" not in reader.fieldnames
+    assert "surrogate" not in reader.fieldnames
+
+    for g in range(4):
+        islands = [
+            r for r in rows if r["island"] != "all" and r["generation"] == str(g)
+        ]
+        (merged,) = [
+            r for r in rows if r["island"] == "all" and r["generation"] == str(g)
+        ]
+
+        assert int(merged["evaluations"]) == sum(int(r["evaluations"]) for r in islands)
+        assert float(merged["cpu_seconds"]) == sum(
+            float(r["cpu_seconds"]) for r in islands
+        )
+
+    assert sum(int(r["evaluations"]) for r in rows if r["island"] == "all") > 0
@@ -0,0 +1,57 @@
+import alex.batch
+import alex.definitions
+import alex.fitness
+import alex.pool
+import alex.schema
+
+
+def test_warm_pool():
+    with open("caches/AMD_EPYC_7413.yaml", "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
+
+    kwargs = {
+        "hierarchy": hierarchy,
+        "pattern": alex.definitions.Pattern.MMTikj,
+        "engine": alex.definitions.Engine.Native,
+    }
+    layouts = [(0, 1) * 4, (1, 0) * 4, (0,) * 4 + (1,) * 4, (0, 1) * 4]
+
+    with alex.pool.WarmPool(2, [alex.fitness.evalFitness], kwargs) as pool:
+        warm = [pool.submit(alex.fitness.evalFitness, i, **kwargs) for i in layouts]
+        cold = pool.submit(
+            alex.fitness.evalFitness,
+            layouts[0],
+            **{**kwargs, "hierarchy": hierarchy.copy()}
+        )
+
+        assert [f.result() for f in warm] == [
+            alex.fitness.evalFitness(i, **kwargs) for i in layouts
+        ]
+        assert cold.result() == warm[0].result()
+
+
+def test_batcher():
+    with open("caches/AMD_EPYC_7413.yaml", "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
+
+    kwargs = {
+        "hierarchy": hierarchy,
+        "pattern": alex.definitions.Pattern.MMTikj,
+        "engine": alex.definitions.Engine.Native,
+    }
+    layouts = [
+        tuple((i >> j) & 1 for j in range(8)) for i in range(64) if bin(i).count("1")
+    ]
+
+    batcher = alex.batch.Batcher(alex.fitness.evalFitnessBatch, target=1.0)
+
+    fixed = {"hierarchy": hierarchy, "engine": kwargs["engine"]}
+
+    with alex.pool.WarmPool(2, [alex.fitness.evalFitnessBatch], fixed) as pool:
+        results = dict(batcher.map(pool, layouts, kwargs))
+
+    assert batcher.cost is not None
+    assert batcher.chunk_size(len(layouts), 2) > 1
+    assert results == {
+        i: f for i, f in zip(layouts, alex.fitness.evalFitnessBatch(layouts, **kwargs))
+    }
@@ -0,0 +1,85 @@
+import random
+
+import numpy
+import pytest
+
+import alex.core
+import alex.definitions
+import alex.fitness
+import alex.reuse
+import alex.schema
+
+
+def referenceHistograms(addresses, ops, lengths, line, sets, depth):
+    stacks = {}
+    hist = [{}, {}]
+    cold = [0, 0]
+    far = [0, 0]
+    seen = set()
+
+    for a, o, n in zip(addresses.tolist(), ops.tolist(), lengths.tolist()):
+        for cl in range(a // line, (a + n - 1) // line + 1):
+            stack = stacks.setdefault(cl % sets, [])
+
+            if cl in stack:
+                d = stack.index(cl)
+                stack.remove(cl)
+
+                if depth and d >= depth:
+                    far[o] += 1
+                else:
+                    hist[o][d] = hist[o].get(d, 0) + 1
+            elif cl in seen:
+                far[o] += 1
+            else:
+                cold[o] += 1
+
+            stack.insert(0, cl)
+            seen.add(cl)
+
+            if depth:
+                del stack[depth:]
+
+    return hist, cold, far
+
+
+@pytest.mark.parametrize("geometry", [(64, 1, 0), (64, 8, 0), (32, 4, 3), (64, 2, 6)])
+def test_stack_distance_matches_reference(geometry):
+    rng = numpy.random.default_rng(1)
+
+    addresses = rng.integers(0, 1 << 13, 5000).astype(numpy.uint64)
+    ops = rng.integers(0, 2, 5000).astype(numpy.uint8)
+    lengths = rng.choice([4, 8, 24], 5000).astype(numpy.uint32)
+
+    sd = alex.core.StackDistance([geometry])
+    sd.process(addresses[:2000], ops[:2000], lengths[:2000])
+    sd.process(addresses[2000:], ops[2000:], lengths[2000:])
+
+    (h,) = sd.histograms()
+    hist, cold, far = referenceHistograms(addresses, ops, lengths, *geometry)
+
+    for i, op in enumerate(["load", "store"]):
+        assert {d: c for d, c in enumerate(h[op].tolist()) if c} == hist[i]
+        assert h[op + "_cold"] == cold[i]
+        assert h[op + "_far"] == far[i]
+
+
+def test_profile_fitness_close_to_simulation():
+    with open("caches/Intel_Xeon_E5_2660_v3.yaml", "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
+
+    layout = [0] * 5 + [1] * 5
+
+    rng = random.Random(42)
+
+    for pattern in alex.definitions.Pattern:
+        if pattern.dimensions != 2:
+            continue
+
+        rng.shuffle(layout)
+
+        (estimate,) = alex.fitness.evalFitnessMulti(tuple(layout), [hierarchy], pattern)
+
+        assert estimate == pytest.approx(
+            alex.fitness.evalFitness(tuple(layout), hierarchy, pattern), rel=0.02
+        )
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+import alex.definitions
+import alex.fitness
+import alex.sampling
+import alex.schema
+import alex.trace
+
+
+@pytest.fixture(scope="module")
+def trace_store(tmp_path_factory):
+    return alex.trace.TraceStore(tmp_path_factory.mktemp("traces"))
+
+
+@pytest.fixture(scope="module")
+def hierarchy():
+    with open("caches/Intel_Xeon_E5_2660_v3.yaml", "r") as f:
+        return alex.schema.CacheHierarchy.fromYamlFile(f)
+
+
+def layout(pattern, seed):
+    bits = (3, 3, 3) if pattern.dimensions == 3 else (5, 5)
+    result = [i for (i, j) in enumerate(bits) for _ in range(j)]
+    random.Random(seed).shuffle(result)
+    return tuple(result)
+
+
+@pytest.mark.parametrize("method", list(alex.sampling.SamplingMethod))
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_full_sample_is_exact(pattern, method, hierarchy, trace_store):
+    individual = layout(pattern, 42)
+
+    estimate = alex.sampling.sampleFitness(
+        individual,
+        hierarchy,
+        pattern,
+        alex.sampling.Sampling(method=method, fraction=1.0),
+        trace_store=trace_store,
+    )
+
+    assert estimate.fraction == 1.0
+    assert estimate.fitness == estimate.low == estimate.high
+    assert estimate.fitness == pytest.approx(
+        alex.fitness.evalFitness(individual, hierarchy, pattern), rel=1e-12
+    )
+
+
+@pytest.mark.parametrize("method", list(alex.sampling.SamplingMethod))
+def test_partial_sample_has_interval(method, hierarchy, trace_store):
+    pattern = alex.definitions.Pattern.Himeno
+
+    estimate = alex.sampling.sampleFitness(
+        layout(pattern, 7),
+        hierarchy,
+        pattern,
+        alex.sampling.Sampling(method=method, fraction=0.25, groups=4),
+        trace_store=trace_store,
+    )
+
+    assert estimate.fraction < 1.0
+    assert estimate.low < estimate.fitness < estimate.high
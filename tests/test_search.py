@@ -0,0 +1,105 @@
+import concurrent.futures
+
+import pytest
+
+import alex.canonical
+import alex.definitions
+import alex.schema
+import alex.search
+
+
+@pytest.fixture(scope="module")
+def hierarchy():
+    with open("caches/AMD_EPYC_7413.yaml", "r") as f:
+        hierarchy = alex.schema.CacheHierarchy.fromYamlFile(f)
+
+    # Shrink the caches, so that the bounds would apply to short layouts.
+    return hierarchy.copy(
+        update={
+            "caches": {
+                n: c.copy(update={"sets": max(1, c.sets // 256)})
+                for n, c in hierarchy.caches.items()
+            }
+        }
+    )
+
+
+def exhaustive(bits, **kwargs):
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        return {
+            i: f
+            for r in alex.search.search(bits, executor=executor, split=2, **kwargs)
+            for i, f in r.results
+        }
+
+
+def test_lines_follow_prefix(hierarchy):
+    caches = list(hierarchy.caches.values())
+
+    assert alex.search.linesFollowPrefix([(0, 4), (1 << 20, 8)], caches)
+    assert not alex.search.linesFollowPrefix([(0, 4), (1 << 20, 12)], caches)
+    assert not alex.search.linesFollowPrefix([(0, 4), (1 << 20, 256)], caches)
+    assert not alex.search.linesFollowPrefix([(0, 4), ((1 << 32) - 1, 4)], caches)
+
+
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_bounds_for_aligned_arrays(pattern, hierarchy):
+    # By default, the simulated pointers start every array but the first just
+    # before a line boundary, so elements straddle lines.
+    arrays = alex.search.arrayPlacement(pattern)
+
+    assert arrays[0][0] == 0
+    assert all(base % 64 != 0 for base, _ in arrays[1:])
+
+    arrays = alex.search.arrayPlacement(pattern, alignment=alex.search.ALIGNMENT)
+
+    assert all(base % alex.search.ALIGNMENT == 0 for base, _ in arrays)
+
+    # Elements which are not powers of two in size still straddle lines.
+    if all(size & (size - 1) == 0 for _, size in arrays):
+        assert len(alex.search.bounds(pattern, hierarchy)) > 0
+    else:
+        assert alex.search.bounds(pattern, hierarchy) == []
+
+
+@pytest.mark.parametrize(
+    "pattern,bits",
+    [
+        (alex.definitions.Pattern.MMijk, [5, 5]),
+        (alex.definitions.Pattern.Jacobi2D, [5, 4]),
+        (alex.definitions.Pattern.MMTikj, [3, 3, 3]),
+    ],
+)
+def test_branch_and_bound(pattern, bits, hierarchy):
+    ranges = alex.canonical.Canonicalizer(pattern, hierarchy).ranges(sum(bits))
+    kwargs = {
+        "hierarchy": hierarchy,
+        "pattern": pattern,
+        "ranges": ranges,
+        "engine": alex.definitions.Engine.Native,
+    }
+
+    reference = exhaustive(bits, **kwargs)
+
+    assert len(reference) == alex.search.spaceSize(bits, ranges)
+
+    results = list(
+        alex.search.search(
+            bits, bounds=alex.search.bounds(pattern, hierarchy), **kwargs
+        )
+    )
+    bounded = {i: f for r in results for i, f in r.results}
+
+    assert sum(r.pruned for r in results) > 0
+    assert all(reference[i] == f for i, f in bounded.items())
+    assert max(bounded.values()) == max(reference.values())
+
+    # With a single position left, the completion is unique, so the full
+    # hierarchy bounds the fitness of the prefix exactly.
+    exact = [alex.search.Bound(depth=sum(bits) - 1, hierarchy=hierarchy)]
+    results = list(alex.search.search(bits, bounds=exact, **kwargs))
+    pruned = {i: f for r in results for i, f in r.results}
+
+    assert sum(r.pruned for r in results) > 0
+    assert len(pruned) < len(reference)
+    assert max(pruned.values()) == max(reference.values())
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+import alex.definitions
+import alex.pattern
+import alex.schema
+import alex.trace
+
+
+@pytest.fixture(scope="module")
+def trace_store(tmp_path_factory):
+    return alex.trace.TraceStore(tmp_path_factory.mktemp("traces"))
+
+
+def hierarchies():
+    for f in ["caches/Intel_Xeon_E5_2660_v3.yaml", "caches/AMD_EPYC_7413.yaml"]:
+        with open(f, "r") as f:
+            yield alex.schema.CacheHierarchy.fromYamlFile(f)
+
+
+@pytest.mark.parametrize("hierarchy", list(hierarchies()))
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_native_matches_pycachesim(pattern, hierarchy, trace_store):
+    bits = (3, 3, 3) if pattern.dimensions == 3 else (5, 5)
+    layout = [i for (i, j) in enumerate(bits) for _ in range(j)]
+
+    rng = random.Random(42)
+
+    for _ in range(2):
+        rng.shuffle(layout)
+
+        expected = alex.pattern.runPattern(pattern, hierarchy, tuple(layout)).stats()
+
+        for s in [None, trace_store]:
+            assert (
+                alex.pattern.runPattern(
+                    pattern,
+                    hierarchy,
+                    tuple(layout),
+                    trace_store=s,
+                    engine=alex.definitions.Engine.Native,
+                ).stats()
+                == expected
+            )
@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+import alex.cli.compile
+import alex.definitions
+import alex.specialize
+
+
+def test_masks():
+    assert alex.specialize.masks(alex.definitions.Pattern.MMijk, (0, 1, 1, 0)) == [
+        0b1001,
+        0b0110,
+    ]
+    assert alex.specialize.masks(alex.definitions.Pattern.Himeno, (2, 0, 1)) == [
+        0b010,
+        0b100,
+        0b001,
+    ]
+
+    with pytest.raises(ValueError):
+        alex.specialize.masks(alex.definitions.Pattern.MMijk, (0, 2))
+
+
+def test_build(tmp_path):
+    specializations = [
+        alex.specialize.Specialization(
+            alex.definitions.Pattern.MMijk, (0, 1, 0, 1, 0, 1)
+        ),
+        alex.specialize.Specialization(
+            alex.definitions.Pattern.Jacobi2D,
+            (0, 0, 0, 1, 1, 1),
+            alex.definitions.Precision.Double,
+        ),
+    ]
+
+    path = alex.specialize.buildModule("specialized_test", specializations, tmp_path)
+
+    for s in specializations:
+        entry = alex.specialize.lookup(path, s.pattern, s.layout, s.precision)
+        assert entry(list(s.layout)) > 0
+
+    assert (
+        alex.specialize.lookup(path, alex.definitions.Pattern.MMijk, (0, 0, 0, 1, 1, 1))
+        is None
+    )
+
+
+def test_pick_layouts():
+    rows = io.StringIO(
+        "pattern,layout,fitness,runtime\n"
+        'MMijk,"0,1,0,1",0.9,200\n'
+        'MMijk,"1,0,1,0",0.1,100\n'
+        'Jacobi2D,"0,0,1,1",0.5,300\n'
+    )
+
+    def pick(**kwargs):
+        rows.seek(0)
+        return {
+            str(p): [layout for layout, _ in picked]
+            for p, picked in alex.cli.compile.pickLayouts(rows, **kwargs).items()
+        }
+
+    assert pick(by="fitness", top=1) == {
+        "MMijk": [(0, 1, 0, 1)],
+        "Jacobi2D": [(0, 0, 1, 1)],
+    }
+    assert pick(by="runtime", top=1)["MMijk"] == [(1, 0, 1, 0)]
+    assert pick(by="runtime", top=2, descending=True)["MMijk"] == [
+        (0, 1, 0, 1),
+        (1, 0, 1, 0),
+    ]
+    assert pick(by="fitness", top=2, patterns=[alex.definitions.Pattern.Jacobi2D]) == {
+        "Jacobi2D": [(0, 0, 1, 1)]
+    }
+
+    with pytest.raises(ValueError):
+        pick(by="cycles", top=1)
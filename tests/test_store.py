@@ -0,0 +1,48 @@
+import pickle
+
+import alex.definitions
+import alex.ga
+import alex.sampling
+import alex.store
+
+
+def test_store_roundtrip(tmp_path):
+    store = alex.store.FitnessStore(tmp_path / "fitness.db")
+    table = store.table("abc", alex.definitions.Pattern.MMijk)
+
+    table.insert({(0, 1, 0, 1): 0.5, (1, 0, 1, 0): 0.25})
+
+    other = pickle.loads(pickle.dumps(store)).table("abc", "MMijk")
+
+    assert other.lookup([(0, 1, 0, 1), (0, 0, 1, 1)]) == {(0, 1, 0, 1): 0.5}
+    assert store.table("abd", "MMijk").lookup([(0, 1, 0, 1)]) == {}
+    assert (
+        store.table(
+            "abc", "MMijk", method=alex.store.methodKey(alex.sampling.Sampling())
+        ).lookup([(0, 1, 0, 1)])
+        == {}
+    )
+
+
+def test_ga_uses_store(tmp_path):
+    table = alex.store.FitnessStore(tmp_path / "fitness.db").table("abc", "MMijk")
+    calls = []
+
+    def fitness(i):
+        calls.append(i)
+        return float(i[0])
+
+    for _ in range(2):
+        ga = alex.ga.GA(
+            retained_count=2,
+            generated_count=0,
+            fitness_func=fitness,
+            crossover_func=None,
+            mutation_func=None,
+            initial_population=[(0, 1), (1, 0)],
+            fitness_store=table,
+        )
+        ga.resolve_population_fitness(None)
+
+    assert calls == [(0, 1), (1, 0)]
+    assert ga.fitness_cache == {(0, 1): 0.0, (1, 0): 1.0}
@@ -0,0 +1,53 @@
+import io
+import math
+import random
+
+import alex.cli.evolve
+import alex.ga
+import alex.surrogate
+
+
+def fitness(individual):
+    return sum(i * x for i, x in enumerate(individual))
+
+
+def test_pairwise_features():
+    features = alex.surrogate.pairwiseFeatures([(0, 1, 0, 2), (2, 1, 0, 0)])
+
+    # Bits (0, 0) and (0, 1) against bit (1, 0), against bit (2, 0), then bit
+    # (1, 0) against bit (2, 0), and the constant.
+    assert features.tolist() == [
+        [1, 0, 1, 1, 1, 1],
+        [0, 0, 0, 0, 0, 1],
+    ]
+
+
+def test_surrogate_screening():
+    random.seed(3)
+
+    ga = alex.ga.GA(
+        retained_count=4,
+        generated_count=8,
+        fitness_func=fitness,
+        crossover_func=alex.cli.evolve.cxGeneralizedOrdered,
+        mutation_func=alex.cli.evolve.mutExchangeDifferent,
+        initial_population=alex.cli.evolve.initialPop(8, 8),
+        surrogate=alex.surrogate.Surrogate(warmup=16),
+    )
+
+    ga.run(generations=10)
+
+    records = [g.surrogate for g in ga.generation_log[1:]]
+
+    assert all(r.rejected <= r.scored for r in records)
+    assert sum(r.rejected for r in records) > 0
+    assert all(r.accuracy > 0.5 for r in records if not math.isnan(r.accuracy))
+
+    f = io.StringIO()
+    ga.write_log(f)
+
+    assert (
+        f.getvalue()
+        .splitlines()[0]
+        .endswith("surrogate_scored,surrogate_rejected,surrogate_accuracy")
+    )
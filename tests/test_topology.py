@@ -0,0 +1,37 @@
+import alex.topology
+
+
+def test_topology(tmp_path):
+    # Two packages with one L3 cache and two cores of two threads each.
+    for c in range(8):
+        path = tmp_path / "cpu" / f"cpu{c}"
+        (path / "topology").mkdir(parents=True)
+        (path / "topology" / "thread_siblings_list").write_text(
+            "%d,%d\n" % (c % 4, c % 4 + 4)
+        )
+
+        for i, (level, kind, shared) in enumerate(
+            [(1, "Data", str(c)), (1, "Instruction", str(c)), (3, "Unified", "0-7")]
+        ):
+            index = path / "cache" / f"index{i}"
+            index.mkdir(parents=True)
+            (index / "level").write_text("%d\n" % level)
+            (index / "type").write_text(kind + "\n")
+            (index / "shared_cpu_list").write_text(
+                shared if level == 1 else ("0-1,4-5" if c % 4 < 2 else "2-3,6-7")
+            )
+
+    (tmp_path / "node" / "node0").mkdir(parents=True)
+    (tmp_path / "node" / "node0" / "cpulist").write_text("0-7\n")
+
+    cpus = alex.topology.readTopology(tmp_path, range(8))
+
+    assert cpus[5] == alex.topology.Cpu(cpu=5, core=1, cache=0, node=0)
+    assert [
+        c.cpu for c in alex.topology.placements(cpus, alex.topology.Domain.Core)
+    ] == [0, 1, 2, 3]
+    assert [
+        c.cpu
+        for c in alex.topology.placements(cpus, alex.topology.Domain.Cache, reserve=1)
+    ] == [2]
+    assert alex.topology.placements(cpus, alex.topology.Domain.Node, reserve=1) == []
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+import alex.definitions
+import alex.fitness
+import alex.schema
+import alex.trace
+
+
+@pytest.fixture(scope="module")
+def trace_store(tmp_path_factory):
+    return alex.trace.TraceStore(tmp_path_factory.mktemp("traces"))
+
+
+@pytest.fixture(scope="module")
+def hierarchy():
+    with open("caches/Intel_Xeon_E5_2660_v3.yaml", "r") as f:
+        return alex.schema.CacheHierarchy.fromYamlFile(f)
+
+
+@pytest.mark.parametrize("alignment", [None, 1 << 32])
+@pytest.mark.parametrize("pattern", list(alex.definitions.Pattern))
+def test_replay_matches_simulation(pattern, alignment, hierarchy, trace_store):
+    bits = (3, 3, 3) if pattern.dimensions == 3 else (5, 5)
+    layout = [i for (i, j) in enumerate(bits) for _ in range(j)]
+
+    rng = random.Random(42)
+
+    for _ in range(3):
+        rng.shuffle(layout)
+
+        assert alex.fitness.evalFitness(
+            tuple(layout), hierarchy, pattern, alignment=alignment
+        ) == alex.fitness.evalFitness(
+            tuple(layout),
+            hierarchy,
+            pattern,
+            trace_store=trace_store,
+            alignment=alignment,
+        )
+
+
+def test_replay_ranges(trace_store):
+    trace = trace_store.get(alex.definitions.Pattern.Jacobi2D, (4, 4))
+    layout = (0, 1) * 4
+
+    full = [x for c in trace.replay(layout) for x in c[0]]
+    part = [
+        x for c in trace.replay(layout, start=7, stop=301, chunk_size=13) for x in c[0]
+    ]
+
+    assert len(full) == len(trace)
+    assert part == full[7:301]